@@ -59,13 +59,41 @@ class DatabaseConfig:
     APP_DATA_FOLDER = "MiNegocio"
     CONNECTION_TIMEOUT = 30.0
     
-    # Configuraciones de SQLite
-    PRAGMA_SETTINGS = {
-        'journal_mode': 'DELETE',
-        'synchronous': 'NORMAL',
-        'temp_store': 'MEMORY',
-        'cache_size': 10000
+    # Perfiles de PRAGMA de SQLite (los aplica models.db al abrir cada conexión)
+    PRAGMA_PROFILES = {
+        # WAL: las búsquedas en segundo plano leen mientras se guarda una edición
+        'wal': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'temp_store': 'MEMORY',
+            'cache_size': 10000,
+            'mmap_size': 268435456,  # 256 MB
+            'busy_timeout': int(CONNECTION_TIMEOUT * 1000),
+        },
+        # Modo clásico, para carpetas de red o discos donde WAL no está soportado
+        'compatible': {
+            'journal_mode': 'DELETE',
+            'synchronous': 'NORMAL',
+            'temp_store': 'MEMORY',
+            'cache_size': 10000,
+            'busy_timeout': int(CONNECTION_TIMEOUT * 1000),
+        },
     }
+    # Perfil por archivo de base de datos
+    DB_PROFILES = {
+        'negocio.db': 'wal',
+    }
+    DEFAULT_PROFILE = 'compatible'
+    # Configuraciones de SQLite del perfil principal
+    PRAGMA_SETTINGS = PRAGMA_PROFILES['wal']
+
+    # Cada cuántos segundos se hace checkpoint del WAL
+    WAL_CHECKPOINT_INTERVAL = 300
+
+# Configuración de la interfaz
+class UIConfig:
+    # Pantallas del navbar que se conservan armadas (ocultas) para volver rápido a ellas
+    MAX_RESIDENT_SCREENS = 3
 
 # Configuración de validaciones
 class ValidationConfig:
@@ -105,4 +133,11 @@ class Messages:
 class DevConfig:
     DEBUG_MODE = True
     SHOW_SQL_QUERIES = False
-    LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
\ No newline at end of file
+    LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
+
+    # Perfil del arranque (ver startup_profiler.py): HUELLITAS_PROFILE_STARTUP=1 lo
+    # muestra en consola; =strict además sale con código 1 si se pasa del objetivo
+    STARTUP_PROFILE_ENV = "HUELLITAS_PROFILE_STARTUP"
+    # Objetivo de arranque en frío (segundos, sin contar lo que tarda el usuario en
+    # ingresar) medido en las PCs de caja; se puede cambiar con HUELLITAS_STARTUP_TARGET
+    STARTUP_TARGET_SECONDS = 4.0
\ No newline at end of file
@@ -1,9 +1,10 @@
 import customtkinter as ctk
 from views.app_view import AppView
-from controllers.products_controller import ProductsController
-from controllers.proveedores_controller import ProveedoresController
-from controllers.categorias_controller import CategoriasController
-from controllers.ventas_controller import VentasController
+from controllers.screen_registry import ScreenRegistry
+from config import UIConfig
+import startup_profiler
+from models.db import get_connection_manager
+from models.barcode_index import get_barcode_index
 
 
 class App_controller:
@@ -11,6 +12,12 @@ class App_controller:
         # Crear la vista principal y enlazar los comandos de los botones
         self.vista = AppView(controlador=self)
         self.vista_actual = None
+        self._build_screens()
+
+        # Checkpoint periódico del WAL mientras la aplicación está abierta
+        get_connection_manager().start_checkpoint_task()
+        # Códigos de barras en memoria para que el escáner de Ventas no espere a la base
+        get_barcode_index().warm_async()
 
         # Enlazar botones del navbar a los métodos del controlador
         self.vista.boton_productos.configure(command=self.show_productos)
@@ -19,37 +26,61 @@ class App_controller:
         self.vista.boton_ventas.configure(command=self.show_ventas)
         self.vista.boton_config.configure(command=self.show_configuracion)
 
+    def _build_screens(self):
+        """Registra las pantallas del navbar; cada una se arma la primera vez que se muestra."""
+        self.screens = ScreenRegistry(self.vista.frame_contenido, max_resident=UIConfig.MAX_RESIDENT_SCREENS)
+        self.screens.register("productos", self._crear_productos)
+        self.screens.register("categorias", self._crear_categorias)
+        self.screens.register("proveedores", self._crear_proveedores)
+        self.screens.register("ventas", self._crear_ventas)
+
+    # Cada pantalla (con sus vistas, modelos y tksheet) se importa al abrirla por primera vez
+
+    def _crear_productos(self, frame):
+        from controllers.products_controller import ProductsController
+        return ProductsController(frame, app_controller=self)
+
+    def _crear_categorias(self, frame):
+        from controllers.categorias_controller import CategoriasController
+        return CategoriasController(frame, app_controller=self)
+
+    def _crear_proveedores(self, frame):
+        from controllers.proveedores_controller import ProveedoresController
+        return ProveedoresController(frame)
+
+    def _crear_ventas(self, frame):
+        from controllers.ventas_controller import VentasController
+        return VentasController(frame, app_controller=self)
+
     def clear_contenido(self):
-        """Elimina todo el contenido actual del frame_contenido."""
+        """Elimina todo el contenido actual del frame_contenido (también las pantallas en caché)."""
+        self.screens.clear()
         for child in self.vista.frame_contenido.winfo_children():
             child.destroy()
 
     def show_productos(self):
-        self.clear_contenido()
-        # Instanciar el ProductsController para montar la vista dentro del frame_contenido
-        ProductsController(self.vista.frame_contenido, app_controller=self)
+        # La pantalla se arma una sola vez; después solo se vuelve a mostrar
+        primera_vez = self.screens.get("productos") is None
+        if primera_vez:
+            startup_profiler.begin("Productos")
+        controller = self.screens.show("productos")
+        if primera_vez:
+            startup_profiler.end_on_paint(controller.view, "Productos", then=startup_profiler.report)
         self.vista_actual = "productos"
 
     def show_categorias(self):
-        self.clear_contenido()
-        # Montar el controlador de categorías
-        self.categorias_controller = CategoriasController(self.vista.frame_contenido, app_controller=self)
+        self.categorias_controller = self.screens.show("categorias")
         self.vista_actual = "categorias"
 
     def show_proveedores(self):
-        self.clear_contenido()
-        # Montar el controlador de proveedores
-        self.proveedores_controller = ProveedoresController(self.vista.frame_contenido)
+        self.proveedores_controller = self.screens.show("proveedores")
         self.vista_actual = "proveedores"
     
     def show_ventas(self):
-        self.clear_contenido()
-        # Montar el controlador de ventas
-        self.ventas_controller = VentasController(self.vista.frame_contenido, app_controller=self)
+        self.ventas_controller = self.screens.show("ventas")
         self.vista_actual = "ventas"
     
     def show_configuracion(self):
-        self.clear_contenido()
+        self.screens.hide_current()
         # Placeholder: en el futuro montar ConfigController
         self.vista_actual = "configuracion"
-
@@ -0,0 +1,59 @@
+"""Trabajo largo (p. ej. una exportación) en un hilo propio, con avance en la vista.
+
+DbExecutor tiene un solo hilo para las consultas de las pantallas; una
+exportación de un millón de filas lo ocuparía durante segundos y demoraría las
+búsquedas. Estos trabajos corren aparte: el hilo solo deja el avance y el
+resultado en atributos, y el hilo de Tk los lee con `after()`.
+"""
+import threading
+
+
+class BackgroundJob:
+    POLL_MS = 100
+
+    def __init__(self, widget, fn, on_done, on_error=None, on_progress=None):
+        """`fn(progress)` corre en otro hilo y recibe `progress(hechas, total)`.
+
+        `on_done(resultado)`, `on_error(excepción)` y `on_progress(hechas, total)`
+        se llaman en el hilo de Tk.
+        """
+        self.widget = widget
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self._progress = None
+        self._outcome = None  # (resultado, error) al terminar
+        self._thread = threading.Thread(target=self._run, name="background-job", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self.widget.after(self.POLL_MS, self._poll)
+        return self
+
+    def _run(self):
+        try:
+            self._outcome = (self.fn(self._set_progress), None)
+        except Exception as e:
+            self._outcome = (None, e)
+
+    def _set_progress(self, done, total):
+        self._progress = (done, total)
+
+    def _poll(self):
+        try:
+            if self._progress is not None and self.on_progress:
+                self.on_progress(*self._progress)
+            if self._outcome is None:
+                self.widget.after(self.POLL_MS, self._poll)
+                return
+            result, error = self._outcome
+            if error is None:
+                self.on_done(result)
+            elif self.on_error:
+                self.on_error(error)
+            else:
+                print(f"Error en trabajo de fondo: {error}")
+        except Exception as e:
+            # p. ej. la vista se destruyó mientras se trabajaba
+            print(f"Error al informar el trabajo de fondo: {e}")
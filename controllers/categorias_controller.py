@@ -9,6 +9,8 @@ class CategoriasController:
     - Si existe `models.categorias_model.CategoriasModel` lo usa para persistencia.
     - Soporta crear/editar/eliminar desde el Sheet delegando al modelo cuando esté disponible.
     """
+    # tablas que muestra la pantalla: solo escrituras en ellas la recargan al volver (ver screen_registry)
+    TABLES = ("categorias", "subcategorias")
 
     def __init__(self, master, app_controller=None):
         self.master = master
@@ -127,6 +129,10 @@ class CategoriasController:
         # La vista ya confirma y delega a controller.delete_category
         self.view.delete_selected()
 
+    def on_show(self):
+        """Al volver a la pantalla con cambios en la base: repetir la búsqueda mostrada."""
+        self.on_search()
+
     def on_search(self):
         query = self.view.get_search_query()
         if not query:
@@ -137,7 +143,7 @@ class CategoriasController:
         # Si existe modelo, delegar búsqueda, sino filtrar localmente
         if self.model and hasattr(self.model, 'search_categories'):
             try:
-                rows = self.model.search_categories(query)
+                rows, _ = self.model.search_categories(query)
             except Exception:
                 rows = []
         else:
@@ -217,21 +223,22 @@ class CategoriasController:
             messagebox.showerror('Error', f'Error al borrar categoría: {e}')
             raise e
 
+    def _crear_ventana_subcategorias(self):
+        from views.toplevel_pool import PooledToplevel
+        from controllers.subcategorias_controller import SubcategoriasController
+        # Ventana más amplia por defecto y redimensionable
+        top = PooledToplevel(self.view, title="Subcategorías", geometry="900x600", minsize=(700, 400))
+        # crear el controlador de subcategorías dentro del toplevel
+        top.controller = SubcategoriasController(top, app_controller=self.app_controller)
+        # al reutilizarla, releer por si cambiaron desde la última apertura
+        top.on_reset = top.controller._load
+        return top
+
     def open_subcategories_window(self):
         """Abre una ventana Toplevel con la vista de subcategorías."""
         try:
-            import customtkinter as ctk
-            top = ctk.CTkToplevel(self.view)
-            top.title("Subcategorías")
-            # Ventana más amplia por defecto y redimensionable
-            top.geometry("900x600")
-            top.minsize(700, 400)
-            top.resizable(True, True)
-            # crear el controlador de subcategorías dentro del toplevel
-            from controllers.subcategorias_controller import SubcategoriasController
-            SubcategoriasController(top, app_controller=self.app_controller)
-            # centrar y mostrar modal
-            top.transient(self.view)
-            top.grab_set()
+            from views.toplevel_pool import get_toplevel_pool
+            top = get_toplevel_pool().acquire("subcategorias", self.view, self._crear_ventana_subcategorias)
+            top.mostrar()
         except Exception as e:
             messagebox.showerror('Error', f'No se pudo abrir ventana de subcategorías: {e}')
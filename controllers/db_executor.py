@@ -0,0 +1,145 @@
+"""Ejecutor único de consultas en segundo plano para las pantallas.
+
+En lugar de abrir un hilo por búsqueda, los controladores encolan el trabajo
+en un solo hilo y reciben el resultado en el hilo de Tk. Cada pantalla usa un
+canal (p. ej. "productos.search") con un número de generación: un pedido
+nuevo en el mismo canal deja obsoleto al anterior, que se aborta con
+`Connection.interrupt()` si todavía está corriendo y cuyo resultado se
+descarta antes de llegar a la vista. Un canal se olvida al entregar su último
+pedido, así los canales de un solo uso no se acumulan.
+"""
+import itertools
+import queue
+import threading
+
+from models.db import get_connection_manager
+
+
+class DbExecutor:
+    # cada cuántos ms se revisa la cola de resultados mientras hay pedidos pendientes
+    POLL_MS = 15
+
+    def __init__(self):
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._generations = {}  # canal -> última generación pedida
+        self._running = None  # (canal, generación) del pedido en curso
+        self._pending = 0  # pedidos encolados o sin entregar
+        self._counter = itertools.count(1)
+        self._poll_widget = None
+        self._poll_id = None
+        self._worker = threading.Thread(target=self._run, name="db-executor", daemon=True)
+        self._worker.start()
+
+    def submit(self, widget, channel, fn, on_done, on_error=None):
+        """Encola `fn()` en el canal; `on_done(resultado)` se llama en el hilo de Tk.
+
+        `widget` es cualquier widget vivo de la aplicación (el `after()` se
+        programa en la raíz, que vive toda la sesión). Devuelve la generación
+        asignada al pedido.
+        """
+        with self._lock:
+            generation = next(self._counter)
+            self._generations[channel] = generation
+            self._pending += 1
+            self._interrupt_if_running(channel)
+        self._tasks.put((channel, generation, fn, on_done, on_error))
+        self._schedule_poll(widget)
+        return generation
+
+    def cancel(self, channel):
+        """Descarta el pedido pendiente del canal y aborta su consulta si está corriendo."""
+        with self._lock:
+            # sin generación vigente, lo encolado o en curso del canal queda obsoleto
+            if self._generations.pop(channel, None) is not None:
+                self._interrupt_if_running(channel)
+
+    def is_current(self, channel, generation):
+        return self._generations.get(channel) == generation
+
+    def _interrupt_if_running(self, channel):
+        # se llama con self._lock tomado
+        if self._running is not None and self._running[0] == channel:
+            get_connection_manager().interrupt_reader(self._worker.ident)
+
+    def _run(self):
+        while True:
+            channel, generation, fn, on_done, on_error = self._tasks.get()
+            with self._lock:
+                if not self.is_current(channel, generation):
+                    # ya hay un pedido más nuevo en el canal: ni siquiera se ejecuta
+                    self._pending -= 1
+                    continue
+                self._running = (channel, generation)
+            try:
+                result, error = fn(), None
+            except Exception as e:
+                result, error = None, e
+            with self._lock:
+                self._running = None
+            self._results.put((channel, generation, result, error, on_done, on_error))
+
+    def _schedule_poll(self, widget):
+        if self._poll_id is not None and self._poll_alive():
+            return
+        try:
+            # la raíz y no la ventana del widget: si se cierra un Toplevel, Tk
+            # borra sus after() pendientes y la entrega quedaría cortada
+            self._poll_widget = widget._root()
+            self._poll_id = self._poll_widget.after(self.POLL_MS, self._poll)
+        except Exception as e:
+            self._poll_id = None
+            print(f"No se pudo programar la entrega de resultados: {e}")
+
+    def _poll_alive(self):
+        try:
+            return bool(self._poll_widget.winfo_exists())
+        except Exception:
+            return False
+
+    def _poll(self):
+        """Entrega en el hilo de Tk los resultados vigentes y descarta los obsoletos."""
+        self._poll_id = None
+        while True:
+            try:
+                channel, generation, result, error, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._pending -= 1
+                current = self.is_current(channel, generation)
+                if current:
+                    del self._generations[channel]
+            if not current:
+                continue
+            try:
+                if error is None:
+                    on_done(result)
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    print(f"Error en consulta de fondo ({channel}): {error}")
+            except Exception as e:
+                # p. ej. la vista se destruyó mientras se consultaba
+                print(f"Error al entregar resultado ({channel}): {e}")
+        with self._lock:
+            pending = self._pending
+        if pending > 0 and self._poll_alive():
+            try:
+                self._poll_id = self._poll_widget.after(self.POLL_MS, self._poll)
+            except Exception:
+                self._poll_id = None
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Devuelve el ejecutor compartido (se crea al primer uso)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = DbExecutor()
+        return _executor
@@ -0,0 +1,125 @@
+"""Buffer de escritura diferida para las ediciones de la grilla de Productos.
+
+Cada celda editada se guarda en memoria (la vista ya muestra el valor nuevo)
+y cada FLUSH_MS, o al cambiar de página o perder el foco, todas las
+ediciones pendientes se escriben en segundo plano en una sola transacción.
+Si un producto edita la misma columna varias veces solo se escribe el último
+valor. Los productos que no se pudieron guardar vuelven a su valor anterior
+en la vista y quedan marcados.
+
+Una escritura sincrónica (antes de un aumento masivo, por ejemplo) espera a
+que termine la escritura en segundo plano en curso: si no, esa escritura más
+vieja correría después y pisaría los valores nuevos.
+"""
+import threading
+
+
+
+class EditBuffer:
+    # espera desde la primera edición pendiente hasta escribir
+    FLUSH_MS = 600
+    # cuánto espera una escritura sincrónica a la que está en curso
+    WAIT_SECONDS = 60
+
+    def __init__(self, model, executor, widget, channel, on_saved=None, on_failed=None):
+        """`on_saved(product_ids)` y `on_failed(product_id, originals, error)` se
+        llaman en el hilo de Tk; `originals` son {columna: valor anterior}."""
+        self.model = model
+        self.executor = executor
+        self.widget = widget
+        self.channel = channel
+        self.on_saved = on_saved
+        self.on_failed = on_failed
+        self._pending = {}    # product_id -> {columna: valor nuevo}
+        self._originals = {}  # product_id -> {columna: valor antes de la primera edición}
+        self._in_flight = False  # hay una escritura en segundo plano en curso
+        self._written = threading.Event()  # se marca cuando esa escritura termina en la base
+        self._written.set()
+        self._after_id = None
+
+    def add(self, product_id, column, value, original):
+        """Registra una edición. Se escribe más tarde junto con las demás."""
+        self._pending.setdefault(product_id, {})[column] = value
+        self._originals.setdefault(product_id, {}).setdefault(column, original)
+        if self._after_id is None:
+            try:
+                self._after_id = self.widget.after(self.FLUSH_MS, self.flush)
+            except Exception:
+                self.flush(sync=True)
+
+    def discard(self, product_id):
+        """Olvida las ediciones pendientes de un producto (p. ej. porque se borró)."""
+        self._pending.pop(product_id, None)
+        self._originals.pop(product_id, None)
+
+    def has_pending(self):
+        return bool(self._pending) or self._in_flight
+
+    def flush(self, sync=False):
+        """Escribe las ediciones pendientes. Con sync=True lo hace en este hilo y
+        espera, también a la escritura en segundo plano que esté en curso."""
+        self._cancel_timer()
+        if sync:
+            self._wait_in_flight()
+        if not self._pending:
+            return
+        if self._in_flight and not sync:
+            # se escribe al terminar la escritura en curso, para no cruzarlas
+            return
+        edits, originals = self._pending, self._originals
+        self._pending, self._originals = {}, {}
+
+        if sync:
+            self._finish(edits, originals, self.model.save_edits(edits))
+            return
+
+        written = self._written = threading.Event()
+
+        def task():
+            try:
+                return self.model.save_edits(edits)
+            finally:
+                written.set()
+
+        def done(failures):
+            self._in_flight = False
+            self._finish(edits, originals, failures)
+
+        def failed(error):
+            done({product_id: str(error) for product_id in edits})
+
+        self._in_flight = True
+        self.executor.submit(self.widget, self.channel, task, done, failed)
+
+    def _wait_in_flight(self):
+        """Espera a que la escritura en segundo plano en curso quede en la base.
+
+        Su resultado se entrega después por el ejecutor, como siempre.
+        """
+        if self._in_flight and not self._written.wait(self.WAIT_SECONDS):
+            print("La escritura anterior de ediciones no terminó a tiempo; se escribe igual")
+
+    def _finish(self, edits, originals, failures):
+        for product_id, error in failures.items():
+            reverted = {}
+            for column, original in originals.get(product_id, {}).items():
+                if column in self._pending.get(product_id, {}):
+                    # se volvió a editar mientras se escribía: esa edición sigue pendiente
+                    self._originals.setdefault(product_id, {})[column] = original
+                else:
+                    reverted[column] = original
+            if reverted and self.on_failed:
+                self.on_failed(product_id, reverted, error)
+        saved = [product_id for product_id in edits if product_id not in failures]
+        if saved and self.on_saved:
+            self.on_saved(saved)
+        if self._pending and self._after_id is None and not self._in_flight:
+            self.flush()
+
+    def _cancel_timer(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
@@ -1,13 +1,14 @@
 from views.login_view import VentanaLogin
 from models.login_model import UsuarioModel
-from controllers.app_controller import App_controller
 from tkinter import messagebox
+import startup_profiler
 
 class LoginController:
     def __init__(self, master):
         self.master = master
         # ocultar la ventana principal inmediatamente para que no se muestre detrás del login
         self.master.withdraw()
+        startup_profiler.begin("login")
         self.vista = VentanaLogin(master)
         # hacer el Toplevel transitivo/modo modal con respecto a la ventana principal
         self.vista.transient(self.master)
@@ -15,7 +16,8 @@ class LoginController:
         self.model = UsuarioModel()
         self.vista.boton_ingresar.configure(command=self.ingresar)
         self.vista.boton_registrar.configure(command=self.crear_usuario)
-        self.model.crear_tabla()  # Asegura que la tabla de usuarios exista
+        # desde acá el tiempo es del usuario: no cuenta para el arranque
+        startup_profiler.end_on_paint(self.vista, "login")
 
     def ingresar(self):
         usuario = self.vista.entry_usuario.get()
@@ -25,7 +27,11 @@ class LoginController:
             self.vista.destroy()
             # Crear y mostrar la aplicación principal con su controlador
             self.master.destroy()  # destruir la ventana vacía
+            # la aplicación (y sus pantallas) se importa recién ahora, no antes del login
+            from controllers.app_controller import App_controller
+            startup_profiler.begin("ventana principal")
             app_controller = App_controller()  # esto crea VentanaPrincipal con controlador
+            startup_profiler.end_on_paint(app_controller.vista, "ventana principal")
             app_controller.vista.after(1, lambda: app_controller.vista.state('zoomed'))
             app_controller.vista.mainloop()  # iniciar bucle de eventos
         else:
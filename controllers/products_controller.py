@@ -1,25 +1,146 @@
-from models.products_model import ProductsModel
+from models.products_model import ProductsModel, IMPORT_SUSPICIOUS_RATIO
+from models import pagination
+from controllers.db_executor import get_executor
+from controllers.row_window import RowWindow
+from controllers.edit_buffer import EditBuffer
+from controllers.background_job import BackgroundJob
 from views.products_view import ProductsView
-from tkinter import simpledialog, messagebox
-import threading
+from tkinter import simpledialog, messagebox, filedialog
 
 
 class ProductsController:
 	"""Controlador de productos: monta la vista dentro de un contenedor dado."""
+	# canal del ejecutor de fondo para las búsquedas de esta pantalla
+	SEARCH_CHANNEL = "productos.search"
+	WINDOW_CHANNEL = "productos.window"
+	WRITE_CHANNEL = "productos.writes"
+	BULK_CHANNEL = "productos.bulk"
+	PREVIEW_CHANNEL = "aumentar.preview"
+	RULES_CHANNEL = "reglas.preview"
+	PRICES_CHANNEL = "productos.precios"
+	# tablas que muestra la pantalla: solo escrituras en ellas la recargan al volver (ver screen_registry)
+	TABLES = ("articulos",)
+	# búsquedas con hasta esta cantidad de resultados se guardan enteras en memoria
+	NARROW_THRESHOLD = 1000
+
 	def __init__(self, master, app_controller=None):
 		self.master = master
 		self.app_controller = app_controller
+		self._executor = get_executor()
+		# extremos de la página mostrada (paginación por clave)
+		self._page_state = None
+		# resultados completos de la última búsqueda, si son pocos: {"query", "rows"}
+		self._matches = None
+		# ventana de filas del modo scroll continuo (None = modo páginas)
+		self._window = None
+		# cada cambio masivo usa su propio canal: uno nuevo no debe descartar al anterior
+		self._bulk_counter = 0
+		# productos con el costo editado: al guardarse su precio puede salir de una regla de margen
+		self._cost_edits = set()
+		# filas de un cambio masivo que se están creando en segundo plano (todavía sin id):
+		# id(fila) -> columnas editadas mientras tanto, se guardan al recibir el id
+		self._creating = {}
 		
 		# Crear modelo y vista
 		self.model = ProductsModel()
 		self.view = ProductsView(master, controller=self)
+		# ediciones de celdas: se escriben juntas en segundo plano
+		self._edits = EditBuffer(
+			self.model, self._executor, self.view, self.WRITE_CHANNEL,
+			on_saved=self._on_edits_saved, on_failed=self._on_edit_failed,
+		)
 		
 		# Configurar comandos de los botones (Controller asigna comandos)
 		self._setup_button_commands()
 		
+		# Al salir de la pantalla, descartar la búsqueda que esté en curso
+		self.view.bind("<Destroy>", self._on_view_destroy, add="+")
+
 		# Cargar datos iniciales
 		self._load_initial_data()
 
+	def _on_view_destroy(self, event=None):
+		self._executor.cancel(self.SEARCH_CHANNEL)
+		self._executor.cancel(self.WINDOW_CHANNEL)
+		# la vista ya no está para recibir el resultado: escribir lo pendiente ahora
+		self._edits.flush(sync=True)
+
+	# === PANTALLA EN CACHÉ (ver controllers.screen_registry) ===
+
+	def on_hide(self):
+		# escribir ya lo pendiente: así las ediciones propias no cuentan como cambios al volver
+		self._edits.flush(sync=True)
+
+	def on_show(self):
+		"""Hubo cambios en la base mientras la pantalla estaba oculta: releer lo mostrado."""
+		self._matches = None
+		self._refresh_view()
+
+	# === ESCRITURA DIFERIDA ===
+
+	def flush_edits(self):
+		"""Escribe ya las ediciones pendientes (al navegar o perder el foco)."""
+		self._edits.flush()
+
+	def _on_edits_saved(self, product_ids):
+		self.view.clear_failed(product_ids)
+		repriced = self._cost_edits.intersection(product_ids)
+		if repriced:
+			self._cost_edits.difference_update(repriced)
+			self._refresh_prices(repriced)
+
+	def _on_edit_failed(self, product_id, originals, error):
+		print(f"No se pudo guardar el producto {product_id}: {error}")
+		self._cost_edits.discard(product_id)
+		self._matches = None
+		self.view.revert_product(product_id, originals)
+
+	def _refresh_prices(self, product_ids):
+		"""Trae de la base el precio de venta de estos productos (recalculado por las reglas) y lo muestra."""
+		product_ids = list(product_ids)
+
+		def task():
+			values = {}
+			for product_id in product_ids:
+				producto = self.model.get_by_id(product_id)
+				if producto is not None:
+					values[product_id] = {"precio_venta": producto["precio_venta"]}
+			return values
+
+		self._bulk_counter += 1
+		self._executor.submit(self.view, f"{self.PRICES_CHANNEL}.{self._bulk_counter}", task, self.view.set_product_values)
+
+	# === SCROLL CONTINUO ===
+
+	def set_infinite_mode(self, enabled):
+		"""Activa/desactiva el scroll continuo (ventana de filas cargada por bloques)."""
+		query = getattr(self.view, "_last_query", None)
+		if enabled:
+			self._edits.flush()
+			self._executor.cancel(self.SEARCH_CHANNEL)
+			self._window = RowWindow(self.model, self._executor, self.view, self.WINDOW_CHANNEL, self._on_window_change)
+			self._window.reset(query)
+		else:
+			if self._window is not None:
+				self._window.cancel()
+			self._window = None
+			self._page_state = None
+			self.search_products(query=query, page=0, page_size=getattr(self.view, "PAGE_SIZE", 50), async_search=True)
+
+	def _on_window_change(self, kind, count, dropped):
+		if self._window is not None:
+			self.view.apply_window_change(kind, count, dropped, self._window)
+
+	def on_window_scroll(self, first_visible, last_visible):
+		"""La vista se desplazó: cargar el bloque vecino si hace falta."""
+		if self._window is not None:
+			self._window.ensure(first_visible, last_visible)
+
+	def on_window_jump(self, fraction):
+		"""Se arrastró la barra virtual: cargar la zona correspondiente."""
+		if self._window is not None:
+			self._window.jump(fraction)
+
 	def _setup_button_commands(self):
 		"""Asigna los comandos a los botones de la vista."""
 		# Botones principales
@@ -29,6 +150,9 @@ class ProductsController:
 		# Botón Aumentar productos
 		try:
 			self.view.btn_aumentar.configure(command=self.on_aumentar_productos)
+			self.view.btn_reglas.configure(command=self.on_reglas_precios)
+			self.view.btn_importar.configure(command=self.on_import_price_list)
+			self.view.btn_exportar.configure(command=self.on_export_products)
 		except Exception:
 			pass
 		
@@ -103,15 +227,30 @@ class ProductsController:
 
 	def delete_product(self, product_id):
 		"""Elimina un producto a través del modelo."""
+		self._matches = None
+		self._edits.discard(product_id)
 		try:
 			self.model.delete_product(product_id)
 			return True
 		except Exception as e:
 			raise e
 	
-	def update_product_from_sheet(self, product_id, updated_data, row_idx=None):
-		"""Actualiza un producto editado desde el sheet."""
+	def update_product_from_sheet(self, product_id, updated_data, row_idx=None, column=None, previous=None):
+		"""Actualiza un producto editado desde el sheet.
+
+		Si se indica la columna editada (`column`, con su valor anterior en
+		`previous`) el cambio se encola en el buffer de escritura y se guarda
+		junto con las demás ediciones; si falla, la vista vuelve a `previous`.
+		"""
+		# los resultados guardados en memoria quedan viejos
+		self._matches = None
 		try:
+			fila = self.view._productos[row_idx] if product_id is None and row_idx is not None else None
+			if fila is not None and id(fila) in self._creating:
+				# se está creando en segundo plano: crearla otra vez la duplicaría
+				if column is not None:
+					self._creating[id(fila)].add(column)
+				return
 			if product_id is None:
 				# Es un producto nuevo, crear en BD solo si tiene nombre
 				if not updated_data.get("nombre"):
@@ -121,20 +260,107 @@ class ProductsController:
 				# Crear el producto en la BD
 				new_id = self.model.create_product(updated_data)
 				if new_id:
-					# Actualizar el ID en la vista
+					# Actualizar el ID en la vista: solo cambia esa celda, sin recargar la página
 					if row_idx is not None and hasattr(self.view, '_productos'):
 						self.view._productos[row_idx]["id"] = new_id
+						self.view.patch_row(row_idx)
+						self._on_product_created(self.view._productos[row_idx], row_idx)
 					messagebox.showinfo("Éxito", "Producto creado correctamente.")
-					# Refrescar para mostrar el nuevo producto con ID en la primera página
-					self.search_products(query=self.view._last_query, page=0, page_size=50, async_search=True)
 			else:
 				# Actualizar producto existente
-				self.model.update_product(product_id, updated_data)
+				if column is not None:
+					if column == "precio_costo":
+						self._cost_edits.add(product_id)
+					self._edits.add(product_id, column, updated_data.get(column), previous)
+				else:
+					self.model.update_product(product_id, updated_data)
 				# No mostrar mensaje para cada edición individual
 		except Exception as e:
 			messagebox.showerror("Error", f"Error al guardar: {e}")
 			raise e
 
+	def _on_product_created(self, row, row_idx):
+		"""Ajusta el estado de paginación a un alta hecha en la página visible."""
+		state = self._page_state
+		if state is None:
+			return
+		state["total"] += 1
+		if row_idx == 0:
+			state["first_key"] = self.model.page_key(row)
+		# las páginas siguientes se corrieron una fila
+		state["visited"] = {state["page"]: state["first_key"]} if state["first_key"] is not None else {}
+		if self.view:
+			self.view.set_total(state["total"])
+
+	def apply_bulk_changes(self, updates, creates, deleted_ids):
+		"""Guarda de una vez un cambio masivo del sheet (pegar, Supr, insertar/borrar filas).
+
+		updates son (id, data); creates son los dicts de la vista sin id (se les
+		asigna al terminar). Se escribe en segundo plano en una transacción
+		mientras la vista muestra el avance; si falla se recarga la página.
+		"""
+		self._matches = None
+		# las ediciones de celdas anteriores se escriben antes (el ejecutor respeta el orden)
+		self._edits.flush()
+		for product_id in deleted_ids:
+			self._edits.discard(product_id)
+		# filas que ya se están creando: lo cambiado se guarda cuando llegue su id
+		pendientes = [p for p in creates if id(p) in self._creating]
+		for producto in pendientes:
+			self._creating[id(producto)].update(key for key in self.model.FIELDS if key in producto)
+		creates = [p for p in creates if id(p) not in self._creating]
+		if not (updates or creates or deleted_ids):
+			return
+		for producto in creates:
+			self._creating[id(producto)] = set()
+		new_rows = [dict(p) for p in creates]
+		total = len(updates) + len(creates) + len(deleted_ids)
+		progress = {"done": 0, "running": True}
+
+		def task():
+			return self.model.apply_changes(updates, new_rows, deleted_ids, progress=lambda done: progress.update(done=done))
+
+		def done(result):
+			progress["running"] = False
+			self.view.stop_progress()
+			editadas = [self._creating.pop(id(p), set()) for p in creates]
+			if result is None:
+				messagebox.showerror("Error", "No se pudieron guardar los cambios. Se vuelve a cargar la página.")
+				self._refresh_view()
+				return
+			for producto, creado, columnas, new_id in zip(creates, new_rows, editadas, result["created_ids"]):
+				producto["id"] = new_id
+				# lo editado mientras se creaba va por el buffer, como cualquier edición
+				for column in columnas:
+					if producto.get(column) != creado.get(column):
+						if column == "precio_costo":
+							self._cost_edits.add(new_id)
+						self._edits.add(new_id, column, producto.get(column), creado.get(column))
+			if creates:
+				self.view.refresh_products(creates)
+			if result["repriced"]:
+				self.view.set_product_values({pid: {"precio_venta": precio} for pid, precio in result["repriced"].items()})
+			state = self._page_state
+			if state is not None:
+				state["total"] = max(0, state["total"] + len(result["created_ids"]) - result["deleted"])
+				# las páginas se corrieron
+				state["visited"] = {}
+				self.view.set_total(state["total"])
+
+		def failed(error):
+			print(f"Error en cambio masivo: {error}")
+			done(None)
+
+		def tick():
+			if progress["running"]:
+				self.view.set_progress(progress["done"] / total if total else 1.0)
+				self.view.after(100, tick)
+
+		self.view.start_progress(f"Guardando {total} cambios...")
+		tick()
+		self._bulk_counter += 1
+		self._executor.submit(self.view, f"{self.BULK_CHANNEL}.{self._bulk_counter}", task, done, failed)
+
 	# === MÉTODOS DE SOPORTE ===
 
 	def _schedule_search(self, delay=300):
@@ -161,26 +387,165 @@ class ProductsController:
 			query = getattr(self.view, "_last_query", None)
 			self.search_products(query=query, page=page, page_size=page_size, async_search=True)
 
-	def search_products(self, query=None, page=0, page_size=50, async_search=True):
-		"""Busca productos paginados. Si async_search es True, ejecuta en hilo y actualiza la vista con after."""
+	def search_products(self, query=None, page=0, page_size=50, async_search=True, direction=None):
+		"""Busca productos paginados. Si async_search es True, ejecuta en hilo y actualiza la vista con after.
+
+		La página se pide por clave (keyset) a partir de la página actual, así que
+		ir a la siguiente/anterior/última no recorre las filas previas. Si no se
+		indica `direction` (ver models.pagination) se deduce de `page`. Mientras
+		se navega la misma búsqueda se reutiliza el total en lugar de contar.
+		"""
+		# lo editado tiene que estar escrito antes de releer
+		self._edits.flush()
+		if self._window is not None:
+			# modo scroll continuo: la búsqueda reemplaza la ventana de filas
+			self.view._last_query = query
+			self._window.reset(query)
+			return
+		state = self._page_state
+		same_query = state is not None and state["query"] == query and state["page_size"] == page_size
+		if self._serve_from_memory(query, page, page_size, direction, same_query):
+			return
+		if direction is None:
+			if not same_query or page <= 0:
+				direction = pagination.FIRST
+			elif page == state["page"]:
+				direction = pagination.AT
+			elif page == state["page"] + 1:
+				direction = pagination.NEXT
+			elif page == state["page"] - 1:
+				direction = pagination.PREV
+			elif page >= self._total_pages(state["total"], page_size) - 1:
+				direction = pagination.LAST
+			else:
+				direction = pagination.JUMP
+
+		key = None
+		if same_query:
+			if direction == pagination.NEXT:
+				key = state["last_key"]
+			elif direction in (pagination.PREV, pagination.AT):
+				key = state["first_key"]
+		if key is None and direction in (pagination.NEXT, pagination.PREV, pagination.AT):
+			# sin página de referencia (búsqueda nueva o página vacía): empezar de nuevo
+			direction = pagination.FIRST
+
+		total_pages = self._total_pages(state["total"], page_size) if same_query else 1
+		if direction == pagination.FIRST:
+			page = 0
+		elif direction == pagination.LAST:
+			page = total_pages - 1
+		page = max(0, min(page, total_pages - 1)) if same_query else page
+		fraction = page / (total_pages - 1) if total_pages > 1 else 0.0
+		# contar solo al cambiar de búsqueda, al volver al inicio o al refrescar tras una escritura
+		with_total = not same_query or direction in (pagination.FIRST, pagination.AT)
+		visited = state["visited"] if same_query else {}
+		if direction in (pagination.NEXT, pagination.PREV, pagination.JUMP) and page in visited:
+			# página ya vista en esta búsqueda: pedirla por su primera fila la sirve la caché del catálogo
+			direction, key = pagination.AT, visited[page]
+		known_total = state["total"] if same_query else 0
+		# búsqueda nueva o refresco: intentar traer el resultado entero para refinar en memoria
+		materialize = not same_query or direction == pagination.AT
+		self.view._last_query = query
+
 		def worker():
+			if materialize:
+				rows_all, _ = self.model.search_products(query=query, limit=self.NARROW_THRESHOLD + 1, with_total=False)
+				if len(rows_all) <= self.NARROW_THRESHOLD:
+					current_page = max(0, min(page, self._total_pages(len(rows_all), page_size) - 1))
+					start = current_page * page_size
+					return rows_all[start:start + page_size], current_page, page_size, len(rows_all), query, rows_all
+			current_page, current_direction = page, direction
+			rows, total = self.model.search_products(
+				query=query, limit=page_size, offset=page * page_size,
+				direction=current_direction, key=key, fraction=fraction, with_total=with_total,
+				align_last=True,
+			)
+			if current_direction == pagination.PREV and len(rows) < page_size:
+				# se llegó al principio: completar con la primera página
+				current_page, current_direction = 0, pagination.FIRST
+				rows, _ = self.model.search_products(query=query, limit=page_size, direction=current_direction, with_total=False)
+			if total is None:
+				total = known_total
+			# False: se intentó cargar entera pero es demasiado grande
+			return rows, current_page, page_size, total, query, (False if materialize else None)
+
+		def on_error(e):
+			# En caso de error, entregar lista vacía
+			self._deliver_page([], page, page_size, 0, query)
+
+		if async_search:
+			# una búsqueda nueva deja obsoleta (y aborta) la anterior de esta pantalla
+			self._executor.submit(self.view, self.SEARCH_CHANNEL, worker, lambda result: self._deliver_page(*result), on_error)
+		else:
+			self._executor.cancel(self.SEARCH_CHANNEL)
 			try:
-				offset = page * page_size
-				rows, total = self.model.search_products(query=query, limit=page_size, offset=offset)
-				# enviar al hilo principal
-				self.master.after(0, lambda: self._deliver_page(rows, page, page_size, total))
+				self._deliver_page(*worker())
 			except Exception as e:
-				# En caso de error, entregar lista vacía
-				self.master.after(0, lambda: self._deliver_page([], page, page_size, 0))
+				on_error(e)
 
-		if async_search:
-			th = threading.Thread(target=worker, daemon=True)
-			th.start()
+	def _serve_from_memory(self, query, page, page_size, direction, same_query):
+		"""Resuelve la búsqueda sin ir a la base si sus resultados ya están en memoria.
+
+		Sirve para paginar una búsqueda chica ya cargada entera y para refinarla
+		mientras se escribe ("sie" -> "sieg"): si el texto nuevo extiende al
+		anterior, sus resultados son un subconjunto y se filtran en memoria.
+		Devuelve False si hay que consultar la base.
+		"""
+		matches = self._matches
+		if matches is None:
+			return False
+		norm = self.model.normalize_query(query)
+		if same_query and matches["query"] == norm:
+			if direction == pagination.AT:
+				# refresco después de una escritura: releer de la base
+				return False
+			rows = matches["rows"]
+		elif not same_query and len(norm) > len(matches["query"]) and norm.startswith(matches["query"]):
+			rows = [r for r in matches["rows"] if self.model.matches_query(r, norm)]
+			self._matches = {"query": norm, "rows": rows}
+			page = 0
 		else:
-			worker()
+			return False
+
+		total_pages = self._total_pages(len(rows), page_size)
+		if direction == pagination.FIRST:
+			page = 0
+		elif direction == pagination.LAST:
+			page = total_pages - 1
+		page = max(0, min(page, total_pages - 1))
+		# lo que estuviera pidiendo la base para esta pantalla ya no sirve
+		self._executor.cancel(self.SEARCH_CHANNEL)
+		self.view._last_query = query
+		start = page * page_size
+		self._deliver_page(rows[start:start + page_size], page, page_size, len(rows), query)
+		return True
 
-	def _deliver_page(self, rows, page, page_size, total):
+	@staticmethod
+	def _total_pages(total, page_size):
+		return max(1, (total + page_size - 1) // page_size)
+
+	def _deliver_page(self, rows, page, page_size, total, query=None, matches=None):
 		"""Entrega una página de resultados a la vista."""
+		if isinstance(matches, list):
+			self._matches = {"query": self.model.normalize_query(query), "rows": matches}
+		elif matches is False or (self._matches is not None and self._matches["query"] != self.model.normalize_query(query)):
+			# búsqueda grande: la próxima se resuelve con el índice
+			self._matches = None
+		# recordar los extremos de la página para pedir la siguiente/anterior por clave
+		state = self._page_state
+		visited = state["visited"] if state and state["query"] == query and state["page_size"] == page_size else {}
+		if rows:
+			visited[page] = self.model.page_key(rows[0])
+		self._page_state = {
+			"query": query,
+			"page": page,
+			"page_size": page_size,
+			"total": total,
+			"first_key": self.model.page_key(rows[0]) if rows else None,
+			"last_key": self.model.page_key(rows[-1]) if rows else None,
+			"visited": visited,
+		}
 		if self.view:
 			self.view.set_page(rows, page, page_size, total)
 
@@ -188,16 +553,314 @@ class ProductsController:
 		"""Abre la ventana de aumentar productos."""
 		try:
 			from views.aumentar_productos_view import AumentarProductosWindow
-			# Crear ventana
-			ventana = AumentarProductosWindow(self.view, controller=self)
-			# Configurar comandos de los botones
+			from views.toplevel_pool import get_toplevel_pool
+			# La ventana se arma una vez y se reutiliza (cerrarla la oculta)
+			ventana = get_toplevel_pool().acquire(
+				"aumentar", self.view,
+				lambda: AumentarProductosWindow(self.view, controller=self),
+				controller=self,
+			)
+			# Configurar comandos de los botones (el controlador puede ser otro que en la apertura anterior)
 			ventana.btn_buscar.configure(command=lambda: self._buscar_productos_aumentar(ventana))
 			ventana.btn_cargar_todos.configure(command=lambda: self._cargar_todos_productos_aumentar(ventana))
 			ventana.btn_aplicar.configure(command=lambda: self._aplicar_aumento_precios(ventana))
 			ventana.btn_eliminar.configure(command=lambda: ventana.eliminar_producto_seleccionado())
+			ventana.btn_deshacer.configure(command=lambda: self._deshacer_aumento(ventana))
+			ventana.mostrar(on_close=lambda: self._executor.cancel(self.PREVIEW_CHANNEL))
 		except Exception as e:
 			messagebox.showerror("Error", f"No se pudo abrir la ventana: {e}")
 	
+	def preview_aumento(self, ventana, porcentaje_float):
+		"""Calcula en segundo plano los precios nuevos de la ventana de aumento.
+
+		Un porcentaje nuevo deja obsoleto al cálculo anterior (mismo canal del ejecutor).
+		"""
+		precios = {p.get('id'): p.get('precio_venta') for p in ventana.productos_cargados}
+
+		def done(nuevos):
+			if self._ventana_viva(ventana):
+				ventana.mostrar_precios_nuevos(nuevos)
+
+		# se entrega en la pantalla de productos, que vive más que la ventana
+		self._executor.submit(
+			self.view, self.PREVIEW_CHANNEL,
+			lambda: ventana.precios_preview(precios, porcentaje_float),
+			done,
+		)
+
+	@staticmethod
+	def _ventana_viva(ventana):
+		"""True si la ventana todavía existe (se pudo cerrar mientras se calculaba)."""
+		try:
+			return bool(ventana.winfo_exists())
+		except Exception:
+			return False
+
+	def _deshacer_aumento(self, ventana):
+		"""Revierte el último aumento masivo que no se haya revertido."""
+		lote = next((l for l in self.model.list_price_batches() if l["revertido_en"] is None), None)
+		if lote is None:
+			messagebox.showinfo("Deshacer aumento", "No hay aumentos para deshacer", parent=ventana)
+			return
+		confirmar = messagebox.askyesno(
+			"Deshacer aumento",
+			f"¿Revertir «{lote['descripcion'] or 'aumento'}» del {lote['fecha']} ({lote['cantidad']} productos)?\n\n"
+			"Los productos cuyo precio se cambió después no se tocan.",
+			parent=ventana,
+		)
+		if not confirmar:
+			return
+		# las ediciones pendientes cuentan como "cambiado después"
+		self._edits.flush(sync=True)
+		resultado = self.model.revert_price_batch(lote["id"])
+		if resultado is None:
+			messagebox.showerror("Error", "No se pudo deshacer el aumento", parent=ventana)
+			return
+		self._matches = None
+		mensaje = f"Se restauraron {resultado['reverted']} precios"
+		if resultado["skipped"]:
+			mensaje += f"\n{resultado['skipped']} productos se dejaron como estaban porque su precio cambió después"
+		messagebox.showinfo("Deshacer aumento", mensaje, parent=ventana)
+		self._refresh_view()
+
+	def show_price_history(self, producto):
+		"""Muestra los cambios de precio por aumentos masivos de un producto."""
+		historial = self.model.get_price_history(producto["id"], limit=20)
+		if not historial:
+			messagebox.showinfo("Historial de precios", f"{producto.get('nombre', '')}\n\nSin aumentos registrados.")
+			return
+		lineas = []
+		for h in historial:
+			motivo = f"{h['porcentaje']:g}%" if h["porcentaje"] is not None else h["descripcion"] or "reglas"
+			linea = f"{h['fecha']}: ${h['precio_anterior'] or 0:,.2f} → ${h['precio_nuevo'] or 0:,.2f} ({motivo})"
+			if h["revertido_en"]:
+				linea += " [revertido]"
+			lineas.append(linea)
+		messagebox.showinfo("Historial de precios", f"{producto.get('nombre', '')}\n\n" + "\n".join(lineas))
+
+	# === IMPORTAR LISTA DE PRECIOS ===
+
+	def on_import_price_list(self):
+		"""Elige una lista de precios, muestra qué cambiaría y, si se confirma, la importa."""
+		path = filedialog.askopenfilename(
+			title="Importar lista de precios",
+			filetypes=[("Listas de precios", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx"), ("Todos", "*.*")],
+		)
+		if not path:
+			return
+		self._edits.flush()
+		self._run_import(path, True, lambda informe, reader: self._confirm_import(path, informe, reader))
+
+	def _run_import(self, path, dry_run, on_done):
+		"""Lee y procesa la lista en segundo plano mostrando el avance en la barra de la vista."""
+		from models.price_list import PriceListReader
+		reader = PriceListReader(path)
+		estado = {"etapa": "lectura", "hechas": 0, "total": None, "running": True}
+
+		def task():
+			return self.model.import_price_list(
+				reader, dry_run=dry_run,
+				progress=lambda etapa, hechas, total: estado.update(etapa=etapa, hechas=hechas, total=total),
+			)
+
+		def done(informe):
+			estado["running"] = False
+			self.view.stop_progress()
+			if informe is None:
+				messagebox.showerror("Error", "No se pudo leer o importar la lista de precios")
+				return
+			on_done(informe, reader)
+
+		def failed(error):
+			print(f"Error al importar la lista: {error}")
+			done(None)
+
+		def tick():
+			if not estado["running"]:
+				return
+			if estado["etapa"] == "lectura":
+				fraccion = reader.fraction if dry_run else reader.fraction / 2
+			else:
+				fraccion = 0.5 + estado["hechas"] / (2 * estado["total"]) if estado["total"] else 1.0
+			self.view.set_progress(fraccion)
+			self.view.after(100, tick)
+
+		self.view.start_progress("Leyendo la lista..." if dry_run else "Importando la lista...")
+		tick()
+		self._bulk_counter += 1
+		self._executor.submit(self.view, f"{self.BULK_CHANNEL}.{self._bulk_counter}", task, done, failed)
+
+	def _confirm_import(self, path, informe, reader):
+		resumen = (
+			f"Líneas: {informe['lines']}\n"
+			f"Productos nuevos: {informe['new']}\n"
+			f"Con precio distinto: {informe['changed']}\n"
+			f"Sin cambios: {informe['unchanged']}"
+		)
+		if reader.skipped:
+			resumen += f"\nLíneas ignoradas (sin código o precio): {reader.skipped}"
+		if not informe["new"] and not informe["changed"]:
+			messagebox.showinfo("Importar lista", resumen + "\n\nNo hay nada para actualizar.")
+			return
+		ejemplos = "\n".join(
+			f"{c['nombre'] or c['codigo_barras']}: costo {c['costo_anterior']} → {c['costo_nuevo']:g}"
+			for c in informe["sample"][:8]
+		)
+		if ejemplos:
+			resumen += "\n\nEjemplos:\n" + ejemplos
+		if informe["suspicious"]:
+			sospechosos = "\n".join(
+				f"{c['nombre'] or c['codigo_barras']}: costo {c['costo_anterior']:g} → {c['costo_nuevo']:g}"
+				for c in informe["suspicious_sample"][:8]
+			)
+			resumen += (
+				f"\n\n⚠️ {informe['suspicious']} productos cambian el costo más de {IMPORT_SUSPICIOUS_RATIO} veces "
+				f"(¿separador de miles o decimales mal leído?):\n{sospechosos}"
+			)
+		if not messagebox.askyesno("Importar lista", resumen + "\n\n¿Importar la lista?"):
+			return
+
+		def imported(resultado, reader):
+			self._matches = None
+			self._refresh_view()
+			messagebox.showinfo("Importar lista", f"Se actualizaron o agregaron {resultado['written']} productos")
+
+		self._run_import(path, False, imported)
+
+	def on_export_products(self):
+		"""Exporta todos los productos a CSV o XLSX en segundo plano."""
+		path = filedialog.asksaveasfilename(
+			title="Exportar productos",
+			defaultextension=".xlsx",
+			initialfile="productos.xlsx",
+			filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")],
+		)
+		if not path:
+			return
+		from models import export
+		# que el archivo incluya las ediciones que todavía no se escribieron
+		self._edits.flush(sync=True)
+		self.view.btn_exportar.configure(state="disabled")
+		self.view.start_progress("Exportando productos...")
+
+		def done(filas):
+			self.view.stop_progress()
+			self.view.btn_exportar.configure(state="normal")
+			messagebox.showinfo("Exportar", f"Se exportaron {filas} productos a\n{path}")
+
+		def failed(error):
+			self.view.stop_progress()
+			self.view.btn_exportar.configure(state="normal")
+			messagebox.showerror("Error", f"No se pudo exportar: {error}")
+
+		BackgroundJob(
+			self.view,
+			lambda progress: export.export("productos", path, progress=progress, db_path=self.model.db_path),
+			done, failed,
+			on_progress=lambda hechas, total: self.view.set_progress(hechas / total if total else 1.0),
+		).start()
+
+	# === REGLAS DE PRECIOS ===
+
+	def on_reglas_precios(self):
+		"""Abre la ventana de reglas de margen."""
+		try:
+			from views.reglas_precios_view import ReglasPreciosWindow
+			from models.categorias_model import CategoriasModel
+			from models.proveedores_model import ProveedoresModel
+			ventana = ReglasPreciosWindow(
+				self.view, controller=self,
+				categorias=CategoriasModel().list_categories(),
+				proveedores=ProveedoresModel().get_all(),
+			)
+			ventana.btn_guardar.configure(command=lambda: self._guardar_regla(ventana))
+			ventana.btn_borrar.configure(command=lambda: self._borrar_regla(ventana))
+			ventana.btn_preview.configure(command=lambda: self._preview_reglas(ventana))
+			ventana.btn_aplicar.configure(command=lambda: self._aplicar_reglas(ventana))
+			ventana.bind("<Destroy>", lambda e: self._executor.cancel(self.RULES_CHANNEL), add="+")
+			ventana.cargar_reglas(self.model.list_price_rules())
+			self._preview_reglas(ventana)
+		except Exception as e:
+			messagebox.showerror("Error", f"No se pudo abrir la ventana: {e}")
+
+	def _guardar_regla(self, ventana):
+		"""Crea o reemplaza la regla del formulario y recalcula la vista previa."""
+		categoria, proveedor, margen, redondeo = ventana.regla_ingresada()
+		try:
+			margen = float(margen.replace(",", "."))
+		except ValueError:
+			messagebox.showerror("Error", "Ingrese un margen válido", parent=ventana)
+			return
+		if self.model.save_price_rule(categoria, proveedor, margen, redondeo) is None:
+			messagebox.showerror("Error", "No se pudo guardar la regla", parent=ventana)
+			return
+		ventana.cargar_reglas(self.model.list_price_rules())
+		self._preview_reglas(ventana)
+
+	def _borrar_regla(self, ventana):
+		regla = ventana.regla_seleccionada()
+		if regla is None:
+			messagebox.showwarning("Advertencia", "Seleccione una regla para borrar", parent=ventana)
+			return
+		if not messagebox.askyesno("Borrar regla", "¿Borrar la regla seleccionada?\nLos precios ya calculados no cambian.", parent=ventana):
+			return
+		self.model.delete_price_rule(regla["id"])
+		ventana.cargar_reglas(self.model.list_price_rules())
+		self._preview_reglas(ventana)
+
+	def _preview_reglas(self, ventana):
+		"""Calcula en segundo plano qué precios cambiarían con las reglas actuales (sin escribir nada)."""
+		ventana.resumen_label.configure(text="Calculando...")
+
+		def done(resumen):
+			if self._ventana_viva(ventana):
+				ventana.mostrar_resumen(resumen)
+
+		# se entrega en la pantalla de productos: la ventana de reglas se destruye al cerrarla
+		self._executor.submit(
+			self.view, self.RULES_CHANNEL,
+			lambda: self.model.apply_price_rules(dry_run=True),
+			done,
+			lambda error: done(None),
+		)
+
+	def _aplicar_reglas(self, ventana):
+		"""Recalcula en segundo plano todos los precios de venta con las reglas de margen."""
+		if not messagebox.askyesno(
+			"Aplicar reglas",
+			"¿Recalcular el precio de venta de todos los productos con regla?\n\n"
+			"Se puede deshacer desde Aumentar productos.",
+			parent=ventana,
+		):
+			return
+		# que una edición pendiente de la grilla no pise después el precio nuevo
+		self._edits.flush(sync=True)
+		ventana.resumen_label.configure(text="Aplicando...")
+
+		def done(resumen):
+			viva = self._ventana_viva(ventana)
+			parent = ventana if viva else self.view
+			if resumen is None:
+				messagebox.showerror("Error", "No se pudieron aplicar las reglas", parent=parent)
+				return
+			self._matches = None
+			self._refresh_view()
+			messagebox.showinfo(
+				"Reglas de precios",
+				f"Se actualizaron {resumen['count']} precios\n\n"
+				f"Suma de precios: ${resumen['before']:,.2f} → ${resumen['after']:,.2f}",
+				parent=parent,
+			)
+			if viva:
+				self._preview_reglas(ventana)
+
+		# se entrega en la pantalla de productos: la ventana de reglas se puede cerrar antes
+		self._bulk_counter += 1
+		self._executor.submit(
+			self.view, f"{self.BULK_CHANNEL}.{self._bulk_counter}",
+			self.model.apply_price_rules, done, lambda error: done(None),
+		)
+
 	def _buscar_productos_aumentar(self, ventana):
 		"""Busca productos por nombre y los carga en la ventana."""
 		query = ventana.entry_buscar.get().strip()
@@ -207,12 +870,14 @@ class ProductsController:
 		
 		try:
 			# Buscar productos que contengan el texto en el nombre
-			productos, _ = self.model.search_products(query=query, limit=1000, offset=0)
+			productos, total = self.model.search_products(query=query, limit=1000, offset=0)
 			if not productos:
 				messagebox.showinfo("Sin resultados", f"No se encontraron productos con '{query}' en el nombre")
 				return
 			
-			ventana.cargar_productos(productos)
+			# si se cargaron todos los resultados, el aumento se aplica por la misma búsqueda en SQL
+			criterio = {"query": query} if total <= len(productos) else {"ids": [p["id"] for p in productos]}
+			ventana.cargar_productos(productos, criterio)
 			messagebox.showinfo("Éxito", f"Se cargaron {len(productos)} productos")
 		except Exception as e:
 			messagebox.showerror("Error", f"Error al buscar productos: {e}")
@@ -232,7 +897,7 @@ class ProductsController:
 				messagebox.showinfo("Sin datos", "No hay productos en la base de datos")
 				return
 			
-			ventana.cargar_productos(productos)
+			ventana.cargar_productos(productos, {})
 			messagebox.showinfo("Éxito", f"Se cargaron {len(productos)} productos")
 		except Exception as e:
 			messagebox.showerror("Error", f"Error al cargar productos: {e}")
@@ -248,6 +913,12 @@ class ProductsController:
 			messagebox.showwarning("Advertencia", "No hay productos cargados")
 			return
 		
+		try:
+			porcentaje_float = float(porcentaje)
+		except ValueError:
+			messagebox.showerror("Error", "Ingrese un porcentaje válido")
+			return
+		
 		# Calcular nuevos precios
 		ventana.calcular_precios_nuevos(porcentaje)
 		
@@ -260,25 +931,35 @@ class ProductsController:
 		if not confirmar:
 			return
 		
-		# Actualizar en BD
+		# Actualizar en BD: un solo UPDATE con el filtro de la ventana y el redondeo en SQL
 		try:
-			productos_actualizados = ventana.obtener_productos_actualizados()
-			exitosos = 0
-			
-			for prod_data in productos_actualizados:
-				try:
-					self.model.update_product(prod_data['id'], {'precio_venta': prod_data['precio_venta']})
-					exitosos += 1
-				except Exception as e:
-					print(f"Error actualizando producto {prod_data['id']}: {e}")
+			# que una edición pendiente de la grilla no pise después el precio nuevo
+			self._edits.flush(sync=True)
+			if ventana.criterio.get("query"):
+				descripcion = f"Aumento {porcentaje}% a '{ventana.criterio['query']}'"
+			elif ventana.criterio.get("ids"):
+				descripcion = f"Aumento {porcentaje}% a {len(ventana.criterio['ids'])} productos"
+			else:
+				descripcion = f"Aumento {porcentaje}% a todos"
+			resumen = self.model.reprice_products(
+				porcentaje_float, exclude_ids=ventana.excluidos, description=descripcion, **ventana.criterio
+			)
+			if resumen is None:
+				messagebox.showerror("Error", "No se pudo aplicar el aumento")
+				return
+			self._matches = None
 			
-			messagebox.showinfo("Éxito", f"Se actualizaron {exitosos} de {len(productos_actualizados)} productos correctamente")
+			messagebox.showinfo(
+				"Éxito",
+				f"Se actualizaron {resumen['count']} productos correctamente\n\n"
+				f"Suma de precios: ${resumen['before']:,.2f} → ${resumen['after']:,.2f}"
+			)
 			
 			# Refrescar vista principal
 			self._refresh_view()
 			
-			# Cerrar ventana
-			ventana.destroy()
+			# Cerrar ventana (queda oculta para la próxima vez)
+			ventana.ocultar()
 			
 		except Exception as e:
 			messagebox.showerror("Error", f"Error al aplicar aumento: {e}")
@@ -1,12 +1,19 @@
 import threading
-import customtkinter as ctk
 from tkinter import messagebox
 from models.proveedores_model import ProveedoresModel
+from models import pagination
+from controllers.db_executor import get_executor
 from views.proveedores_view import ProveedoresView
 
 
 class ProveedoresController:
+    # canal del ejecutor de fondo para las búsquedas de esta pantalla
+    SEARCH_CHANNEL = "proveedores.search"
+    # tablas que muestra la pantalla: solo escrituras en ellas la recargan al volver (ver screen_registry)
+    TABLES = ("proveedores",)
+
     def __init__(self, parent_frame):
+        self._executor = get_executor()
         self.model = ProveedoresModel()
         self.view = ProveedoresView(parent_frame, controller=self)
         
@@ -14,10 +21,16 @@ class ProveedoresController:
         self.current_page = 1
         self.items_per_page = 50
         self.total_items = 0
+        # claves de la primera y última fila mostradas (paginación por clave)
+        self._first_key = None
+        self._last_key = None
         
         # Configurar comandos de botones
         self._setup_button_commands()
         
+        # Al salir de la pantalla, descartar la búsqueda que esté en curso
+        self.view.bind("<Destroy>", lambda e: self._executor.cancel(self.SEARCH_CHANNEL), add="+")
+
         # Cargar datos iniciales
         self.search_proveedores()
 
@@ -28,6 +41,8 @@ class ProveedoresController:
         self.view.btn_borrar.configure(command=self.on_delete_proveedor)
         self.view.btn_ver_saldo.configure(command=self.on_ver_saldo)
         self.view.btn_search.configure(command=self.on_search)
+        self.view.prev_btn.configure(command=self.on_prev_page)
+        self.view.next_btn.configure(command=self.on_next_page)
         
         # Enter en búsqueda
         self.view.search_entry.bind("<Return>", lambda e: self.on_search())
@@ -106,19 +121,23 @@ class ProveedoresController:
             self.view.show_message("Error", "No se pudo obtener la información del proveedor", "error")
             return
         
-        # Crear ventana toplevel para saldos
-        ventana_saldos = ctk.CTkToplevel(self.view)
+        # Ventana de saldos: se arma una vez y después solo se cambia el proveedor
+        from views.toplevel_pool import get_toplevel_pool
+        ventana_saldos = get_toplevel_pool().acquire(
+            "saldos", self.view, lambda: self._crear_ventana_saldos(proveedor),
+        )
         ventana_saldos.title(f"Saldo - {proveedor.get('nombre', 'Proveedor')}")
-        ventana_saldos.geometry("1100x700")
-        ventana_saldos.minsize(900, 600)
-        
-        # Centrar ventana
-        ventana_saldos.transient(self.view)
-        ventana_saldos.grab_set()
-        
-        # Crear controller de saldos dentro de la ventana
+        if ventana_saldos.controller.proveedor_data is not proveedor:
+            ventana_saldos.controller.set_proveedor(proveedor)
+        ventana_saldos.mostrar()
+
+    def _crear_ventana_saldos(self, proveedor):
+        from views.toplevel_pool import PooledToplevel
         from controllers.saldos_proveedores_controller import SaldosProveedoresController
-        SaldosProveedoresController(ventana_saldos, proveedor, app_controller=None)
+        ventana = PooledToplevel(self.view, geometry="1100x700", minsize=(900, 600))
+        # Crear controller de saldos dentro de la ventana
+        ventana.controller = SaldosProveedoresController(ventana, proveedor, app_controller=None)
+        return ventana
 
     def on_save_proveedor(self):
         """Guarda el proveedor (nuevo o editado)."""
@@ -178,48 +197,71 @@ class ProveedoresController:
         # llamar al método de cancelar de la vista
         self.view._on_cancel()
 
+    def on_show(self):
+        """Al volver a la pantalla con cambios en la base: releer la página actual."""
+        self.search_proveedores()
+
     def on_search(self):
         """Realiza búsqueda de proveedores."""
         self.current_page = 1  # resetear a primera página
-        self.search_proveedores()
+        self.search_proveedores(pagination.FIRST)
 
     def on_prev_page(self):
         """Ir a página anterior."""
         if self.current_page > 1:
             self.current_page -= 1
-            self.search_proveedores()
+            self.search_proveedores(pagination.FIRST if self.current_page == 1 else pagination.PREV)
 
     def on_next_page(self):
         """Ir a página siguiente."""
         total_pages = max(1, (self.total_items + self.items_per_page - 1) // self.items_per_page)
         if self.current_page < total_pages:
             self.current_page += 1
-            self.search_proveedores()
+            self.search_proveedores(pagination.NEXT)
 
-    def search_proveedores(self):
-        """Busca proveedores con paginación en hilo separado."""
+    def search_proveedores(self, direction=pagination.AT):
+        """Busca proveedores con paginación en hilo separado.
+
+        Las páginas se piden por clave a partir de la página mostrada; por
+        defecto se vuelve a leer la página actual (p. ej. después de guardar).
+        """
         query = self.view.get_search_query()
-        offset = (self.current_page - 1) * self.items_per_page
+        key = {
+            pagination.NEXT: self._last_key,
+            pagination.PREV: self._first_key,
+            pagination.AT: self._first_key,
+        }.get(direction)
+        if key is None:
+            direction = pagination.FIRST
+            self.current_page = 1
+        # al avanzar/retroceder dentro de la misma búsqueda no hace falta contar
+        with_total = direction in (pagination.FIRST, pagination.AT)
+        known_total = self.total_items
         
-        def search_thread():
-            try:
-                proveedores, total = self.model.search_proveedores(
-                    query if query else None,
-                    limit=self.items_per_page,
-                    offset=offset
-                )
-                
-                # actualizar vista en hilo principal
-                self.view.after(0, lambda: self._update_search_results(proveedores, total))
-                
-            except Exception as e:
-                self.view.after(0, lambda: self.view.show_message("Error", f"Error en búsqueda: {str(e)}", "error"))
+        def search_task():
+            proveedores, total = self.model.search_proveedores(
+                query if query else None,
+                limit=self.items_per_page,
+                direction=direction,
+                key=key,
+                with_total=with_total,
+            )
+            if total is None:
+                total = known_total
+            return proveedores, total
 
-        threading.Thread(target=search_thread, daemon=True).start()
+        # el resultado vuelve por el hilo principal; una búsqueda más nueva descarta esta
+        self._executor.submit(
+            self.view, self.SEARCH_CHANNEL, search_task,
+            lambda result: self._update_search_results(*result),
+            lambda e: messagebox.showerror("Error", f"Error en búsqueda: {str(e)}"),
+        )
 
     def _update_search_results(self, proveedores, total):
         """Actualiza los resultados de búsqueda en la vista."""
         self.total_items = total
+        self._first_key = self.model.page_key(proveedores[0]) if proveedores else None
+        self._last_key = self.model.page_key(proveedores[-1]) if proveedores else None
         self.view.set_proveedores(proveedores)
         
         # actualizar info de paginación
@@ -0,0 +1,158 @@
+"""Ventana deslizante de filas para el modo de scroll continuo de Productos.
+
+En lugar de cargar la búsqueda entera, la grilla muestra una ventana de a lo
+sumo MAX_ROWS filas. Cuando la vista se acerca a un borde se pide el bloque
+siguiente (o anterior) en segundo plano, por clave desde la última (o
+primera) fila cargada, y se descartan las filas del extremo opuesto. Saltar a
+otra posición (barra de desplazamiento) reemplaza la ventana completa.
+"""
+from models import pagination
+
+
+class RowWindow:
+    BLOCK_SIZE = 200
+    # filas que se conservan en memoria (y en el sheet) como máximo
+    MAX_ROWS = 2000
+    # si faltan menos filas que esto para el borde de la ventana, pedir otro bloque
+    PREFETCH_ROWS = 60
+
+    def __init__(self, model, executor, widget, channel, on_change):
+        """`on_change(kind, count, dropped)` se llama en el hilo de Tk con kind
+        "reset", "append" o "prepend"; `count` son las filas agregadas y
+        `dropped` las descartadas del otro extremo."""
+        self.model = model
+        self.executor = executor
+        self.widget = widget
+        self.channel = channel
+        self.on_change = on_change
+        self.query = None
+        self.rows = []
+        self.start = 0  # posición (aproximada) de rows[0] en el resultado completo
+        self.total = 0
+        self._loading = None
+
+    @property
+    def end(self):
+        return self.start + len(self.rows)
+
+    def reset(self, query=None):
+        """Carga el principio de la búsqueda."""
+        self.query = query
+
+        def task():
+            return self.model.search_products(
+                query=query, limit=self.BLOCK_SIZE, offset=0, direction=pagination.FIRST
+            )
+
+        self._submit("reset", task, lambda result: self._replace(result[0], 0, result[1]))
+
+    def jump(self, fraction):
+        """Reemplaza la ventana por la zona que está en `fraction` (0.0 a 1.0) del resultado."""
+        fraction = min(1.0, max(0.0, float(fraction)))
+        start = int(round(fraction * max(0, self.total - self.BLOCK_SIZE)))
+        # en los extremos se pide la primera/última página exacta
+        if start <= 0:
+            direction = pagination.FIRST
+        elif start + self.BLOCK_SIZE >= self.total:
+            direction = pagination.LAST
+        else:
+            direction = pagination.JUMP
+        query = self.query
+        total = self.total
+
+        def task():
+            rows, _ = self.model.search_products(
+                query=query, limit=self.BLOCK_SIZE, offset=start,
+                direction=direction, fraction=fraction, with_total=False,
+            )
+            return rows
+
+        def done(rows):
+            row_start = max(0, total - len(rows)) if direction == pagination.LAST else start
+            self._replace(rows, row_start, total)
+
+        self._submit("jump", task, done)
+
+    def ensure(self, first_visible, last_visible):
+        """Pide el bloque vecino si las filas visibles (índices de la ventana) están cerca de un borde."""
+        if self._loading is not None or not self.rows:
+            return
+        if last_visible >= len(self.rows) - self.PREFETCH_ROWS and self.end < self.total:
+            self._load_below()
+        elif first_visible <= self.PREFETCH_ROWS and self.start > 0:
+            self._load_above()
+
+    def _load_below(self):
+        query, key, offset = self.query, self.model.page_key(self.rows[-1]), self.end
+
+        def task():
+            rows, _ = self.model.search_products(
+                query=query, limit=self.BLOCK_SIZE, offset=offset,
+                direction=pagination.NEXT, key=key, with_total=False,
+            )
+            return rows
+
+        self._submit("append", task, self._append)
+
+    def _load_above(self):
+        query, key = self.query, self.model.page_key(self.rows[0])
+        limit = min(self.BLOCK_SIZE, self.start)
+        offset = self.start - limit
+
+        def task():
+            rows, _ = self.model.search_products(
+                query=query, limit=limit, offset=offset,
+                direction=pagination.PREV, key=key, with_total=False,
+            )
+            return rows, limit
+
+        self._submit("prepend", task, lambda result: self._prepend(*result))
+
+    def _submit(self, kind, task, on_done):
+        self._loading = kind
+
+        def done(result):
+            self._loading = None
+            on_done(result)
+
+        def failed(error):
+            self._loading = None
+            print(f"Error cargando filas ({kind}): {error}")
+
+        self.executor.submit(self.widget, self.channel, task, done, failed)
+
+    def _replace(self, rows, start, total):
+        self.rows = list(rows)
+        self.start = start
+        self.total = total
+        self.on_change("reset", len(self.rows), 0)
+
+    def _append(self, rows):
+        if not rows:
+            # se llegó al final antes de lo que decía el total
+            self.total = self.end
+            return
+        self.rows.extend(rows)
+        dropped = max(0, len(self.rows) - self.MAX_ROWS)
+        if dropped:
+            del self.rows[:dropped]
+            self.start += dropped
+        self.on_change("append", len(rows), dropped)
+
+    def _prepend(self, rows, requested):
+        if len(rows) < requested:
+            # no hay más filas arriba: esta es la posición 0
+            self.start = len(rows)
+        if not rows:
+            self.start = 0
+            return
+        self.rows[:0] = rows
+        self.start = max(0, self.start - len(rows))
+        dropped = max(0, len(self.rows) - self.MAX_ROWS)
+        if dropped:
+            del self.rows[-dropped:]
+        self.on_change("prepend", len(rows), dropped)
+
+    def cancel(self):
+        self._loading = None
+        self.executor.cancel(self.channel)
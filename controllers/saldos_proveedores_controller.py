@@ -1,6 +1,7 @@
 from models.saldos_proveedores_model import SaldosProveedoresModel
 from views.saldos_proveedores_view import SaldosProveedoresView
-from tkinter import simpledialog, messagebox
+from controllers.background_job import BackgroundJob
+from tkinter import simpledialog, messagebox, filedialog
 import customtkinter as ctk
 
 
@@ -28,6 +29,7 @@ class SaldosProveedoresController:
         self.view.btn_agregar_pago.configure(command=self.on_agregar_pago)
         self.view.btn_crear_pedido.configure(command=self.on_crear_pedido)
         self.view.btn_exportar_pdf.configure(command=self.on_exportar_pdf)
+        self.view.btn_exportar_movimientos.configure(command=self.on_exportar_movimientos)
     
     def _cargar_movimientos(self):
         """Carga los movimientos del proveedor actual."""
@@ -77,12 +79,21 @@ class SaldosProveedoresController:
             messagebox.showwarning("Advertencia", "No hay proveedor seleccionado")
             return
         
-        # Abrir ventana de creación de boleta
+        # Abrir ventana de creación de boleta (se reutiliza entre aperturas)
         from views.crear_boleta_view import CrearBoletaWindow
-        ventana = CrearBoletaWindow(self.view, controller=self, proveedor=self.proveedor_data)
-        ventana.wait_window()
-        
-        # Recargar movimientos
+        from views.toplevel_pool import get_toplevel_pool
+        ventana = get_toplevel_pool().acquire(
+            "crear_boleta", self.view,
+            lambda: CrearBoletaWindow(self.view, controller=self, proveedor=self.proveedor_data),
+            controller=self, proveedor=self.proveedor_data,
+        )
+        # Recargar movimientos al cerrarla
+        ventana.mostrar(on_close=self._cargar_movimientos)
+
+    def set_proveedor(self, proveedor_data):
+        """Muestra el saldo de otro proveedor en la misma ventana (ventana reutilizada)."""
+        self.proveedor_data = proveedor_data
+        self.view.set_proveedor(proveedor_data)
         self._cargar_movimientos()
     
     def crear_pedido_con_items(self, items, descripcion="", fecha=None):
@@ -118,3 +129,41 @@ class SaldosProveedoresController:
         # Aquí iría la lógica para encontrar la boleta asociada y exportar a PDF
         # Por ahora, mostrar mensaje
         messagebox.showinfo("Exportar PDF", "Funcionalidad de exportación a PDF en desarrollo")
+
+    def on_exportar_movimientos(self):
+        """Exporta los movimientos y los items de boletas del proveedor (XLSX con dos hojas o dos CSV)."""
+        if not self.proveedor_data:
+            messagebox.showwarning("Advertencia", "No hay proveedor seleccionado")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Exportar movimientos",
+            defaultextension=".xlsx",
+            initialfile=f"movimientos_{self.proveedor_data['nombre']}.xlsx",
+            filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")],
+        )
+        if not path:
+            return
+        from models import export
+        boton = self.view.btn_exportar_movimientos
+        texto = boton.cget("text")
+        boton.configure(state="disabled")
+
+        def done(filas):
+            boton.configure(state="normal", text=texto)
+            messagebox.showinfo("Exportar", f"Se exportaron {filas} filas a\n{path}")
+
+        def failed(error):
+            boton.configure(state="normal", text=texto)
+            messagebox.showerror("Error", f"No se pudo exportar: {error}")
+
+        def progress(hechas, total):
+            boton.configure(text=f"Exportando... {hechas * 100 // total if total else 100}%")
+
+        BackgroundJob(
+            self.view,
+            lambda progress: export.export(
+                ["movimientos", "boletas_items"], path, proveedor_id=self.proveedor_data['id'],
+                progress=progress, db_path=self.model.db_path,
+            ),
+            done, failed, on_progress=progress,
+        ).start()
@@ -0,0 +1,133 @@
+"""Pantallas del navbar armadas una sola vez y conservadas ocultas.
+
+Antes cada clic en el navbar destruía la pantalla actual y volvía a crear
+controlador, modelo y vista, recargando todo. El registro arma cada pantalla
+la primera vez que se pide, la oculta con `pack_forget` al cambiar y la vuelve
+a mostrar con el mismo `pack`, conservando selección, búsqueda y scroll.
+
+Al volver a una pantalla solo se recarga si desde que se ocultó hubo
+escrituras en las tablas que declara su controlador en `TABLES` (sin eso,
+cualquier escritura en la base): se llama a `on_show()` del controlador. Como
+cada pantalla mantiene sus widgets (y las tablas sus filas), quedan armadas a
+lo sumo `max_resident`; la usada hace más tiempo se destruye.
+"""
+from collections import OrderedDict
+
+from models.db import get_connection_manager
+
+
+class _Screen:
+    __slots__ = ("controller", "view", "pack_info", "generation")
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.view = controller.view
+        self.pack_info = None
+        self.generation = None
+
+
+class ScreenRegistry:
+    def __init__(self, container, max_resident=3):
+        self.container = container
+        self.max_resident = max(1, max_resident)
+        self._factories = {}
+        # nombre -> _Screen, de la usada hace más tiempo a la actual
+        self._screens = OrderedDict()
+        self.current = None
+
+    def register(self, name, factory):
+        """`factory(container)` crea el controlador de la pantalla (con su `view`)."""
+        self._factories[name] = factory
+
+    def get(self, name):
+        """Controlador de una pantalla armada, o None."""
+        screen = self._screens.get(name)
+        return screen.controller if screen else None
+
+    def show(self, name):
+        """Muestra la pantalla `name`, armándola si hace falta. Devuelve su controlador."""
+        if name == self.current and name in self._screens:
+            return self._screens[name].controller
+        self.hide_current()
+        screen = self._screens.get(name)
+        if screen is None or not self._alive(screen):
+            screen = _Screen(self._factories[name](self.container))
+            # la vista se empaca sola al crearse: guardar cómo, para restaurarlo igual
+            screen.pack_info = self._pack_info(screen.view)
+            self._screens[name] = screen
+        else:
+            screen.view.pack(**screen.pack_info)
+            if screen.generation != self._generation(screen):
+                self._refresh(screen)
+        self._screens.move_to_end(name)
+        self.current = name
+        self._evict()
+        return screen.controller
+
+    def hide_current(self):
+        """Oculta la pantalla visible (sin destruirla)."""
+        screen = self._screens.get(self.current)
+        self.current = None
+        if screen is None or not self._alive(screen):
+            return
+        on_hide = getattr(screen.controller, "on_hide", None)
+        if on_hide:
+            try:
+                on_hide()
+            except Exception as e:
+                print(f"Error al ocultar la pantalla: {e}")
+        screen.view.pack_forget()
+        screen.generation = self._generation(screen)
+
+    def invalidate(self, name=None):
+        """Fuerza la recarga de una pantalla (o de todas) la próxima vez que se muestre."""
+        for key, screen in self._screens.items():
+            if name is None or key == name:
+                screen.generation = None
+
+    def destroy(self, name):
+        screen = self._screens.pop(name, None)
+        if name == self.current:
+            self.current = None
+        if screen is not None and self._alive(screen):
+            screen.view.destroy()
+
+    def clear(self):
+        for name in list(self._screens):
+            self.destroy(name)
+
+    def _evict(self):
+        while len(self._screens) > self.max_resident:
+            oldest = next(iter(self._screens))
+            if oldest == self.current:
+                break
+            self.destroy(oldest)
+
+    @staticmethod
+    def _generation(screen):
+        return get_connection_manager().generation(getattr(screen.controller, "TABLES", None))
+
+    @staticmethod
+    def _refresh(screen):
+        on_show = getattr(screen.controller, "on_show", None)
+        if on_show:
+            try:
+                on_show()
+            except Exception as e:
+                print(f"Error al recargar la pantalla: {e}")
+
+    @staticmethod
+    def _alive(screen):
+        try:
+            return bool(screen.view.winfo_exists())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _pack_info(view):
+        try:
+            info = view.pack_info()
+        except Exception:
+            return {"fill": "both", "expand": True}
+        info.pop("in", None)
+        return info
@@ -1,17 +1,29 @@
+import time
 from tkinter import messagebox
+from models.products_model import ProductsModel
 from views.ventas_view import VentasView
 
 
 class VentasController:
     """Controlador para la vista de ventas."""
+
+    # Un lector de códigos "tipea" el código entero en pocos milisegundos:
+    # teclas más seguidas que esto se consideran parte de un escaneo
+    SCANNER_MAX_INTERVAL = 0.05  # segundos
+    SCANNER_MIN_LENGTH = 4
     
     def __init__(self, master, app_controller=None):
         self.master = master
         self.app_controller = app_controller
+        self.model = ProductsModel()
         self.view = VentasView(master, controller=self)
         
         # Carrito actual
         self.carrito = []
+
+        # Detección de ráfagas del escáner
+        self._last_key_time = 0.0
+        self._burst_length = 0
         
         self._setup_button_commands()
     
@@ -24,26 +36,68 @@ class VentasController:
             
             # Enter en búsqueda
             self.view.entry_buscar_producto.bind("<Return>", lambda e: self.on_buscar_producto())
+            self.view.entry_buscar_producto.bind("<KeyPress>", self._on_key_press, add="+")
         except Exception as e:
             print(f"Error configurando botones: {e}")
     
+    def _on_key_press(self, event):
+        """Cuenta las teclas consecutivas que llegan a velocidad de escáner."""
+        if event.keysym in ("Return", "KP_Enter"):
+            return
+        now = time.perf_counter()
+        if now - self._last_key_time <= self.SCANNER_MAX_INTERVAL:
+            self._burst_length += 1
+        else:
+            self._burst_length = 1
+        self._last_key_time = now
+
+    def _is_scanner_burst(self, query):
+        """True si todo el texto del campo llegó en una sola ráfaga rápida."""
+        burst = self._burst_length
+        self._burst_length = 0
+        recent = time.perf_counter() - self._last_key_time <= self.SCANNER_MAX_INTERVAL * 4
+        return recent and burst >= self.SCANNER_MIN_LENGTH and burst >= len(query)
+
     def on_buscar_producto(self):
-        """Busca un producto y lo agrega al carrito."""
+        """Busca un producto y lo agrega al carrito.
+
+        Un escaneo va directo a la búsqueda exacta por código de barras; lo
+        tipeado a mano se busca además por ID y por nombre.
+        """
         query = self.view.entry_buscar_producto.get().strip()
         if not query:
             return
-        
-        # Aquí iría la lógica para buscar en la BD
-        # Por ahora, simulamos un producto
-        producto_ejemplo = {
-            'id': 1,
-            'nombre': f'Producto: {query}',
-            'precio_venta': 1500.00,
-            'cantidad': 10
-        }
-        
-        self.agregar_al_carrito(producto_ejemplo, cantidad=1)
+
+        if self._is_scanner_burst(query):
+            producto = self.model.get_by_barcode(query)
+            if producto is None:
+                messagebox.showwarning("Producto no encontrado", f"No hay ningún producto con el código {query}")
+                self.view.entry_buscar_producto.delete(0, 'end')
+                return
+        else:
+            producto = self._buscar_producto_manual(query)
+            if producto is None:
+                return
+
+        self.agregar_al_carrito(producto, cantidad=1)
         self.view.entry_buscar_producto.delete(0, 'end')
+
+    def _buscar_producto_manual(self, query):
+        """Busca por código de barras, ID o nombre. Devuelve el producto o None."""
+        producto = self.model.get_by_barcode(query)
+        if producto is None and query.isdigit():
+            producto = self.model.get_by_id(int(query))
+        if producto is not None:
+            return producto
+
+        productos, total = self.model.search_products(query=query, limit=2)
+        if not productos:
+            messagebox.showwarning("Producto no encontrado", f"No se encontraron productos para '{query}'")
+            return None
+        if total > 1:
+            messagebox.showinfo("Varios productos", f"Hay {total} productos que coinciden con '{query}'. Ingrese un nombre más completo o el código de barras.")
+            return None
+        return productos[0]
     
     def agregar_al_carrito(self, producto, cantidad=1):
         """Agrega un producto al carrito."""
@@ -1,9 +1,36 @@
-import customtkinter as ctk
-from views.login_view import VentanaLogin
-from controllers.login_controller import LoginController
-from views.app_view import AppView
+import startup_profiler  # primero: marca el fin del arranque del intérprete
+import sys
+
+with startup_profiler.phase("imports"):
+    # Solo lo necesario para el login: cada pantalla se importa al abrirla por primera vez
+    from controllers.login_controller import LoginController
+    from views.app_view import AppView
+    from models.migrations import run_migrations, MigrationError
+
+
+def _migracion_fallida(error):
+    """Avisa que la base no se pudo actualizar y corta el arranque."""
+    from tkinter import Tk, messagebox
+    root = Tk()
+    root.withdraw()
+    messagebox.showerror(
+        "Error al actualizar la base de datos",
+        f"{error}\n\nLa aplicación no se abrirá para no trabajar con la base a medio actualizar. "
+        "Haga una copia de database/negocio.db y avise a soporte.",
+    )
+    root.destroy()
+    sys.exit(1)
+
+
 if __name__ == "__main__":
-    app = AppView()
-    app.withdraw()  # ocultamos la ventana principal
+    with startup_profiler.phase("migraciones"):
+        try:
+            run_migrations()  # deja el esquema al día una sola vez por arranque
+        except MigrationError as e:
+            _migracion_fallida(e)
+    with startup_profiler.phase("Tk"):
+        app = AppView()
+        app.withdraw()  # ocultamos la ventana principal
     LoginController(app) # iniciamos el controlador de login
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+    startup_profiler.finish()
@@ -0,0 +1,121 @@
+"""Índice en memoria código de barras -> artículo, para el escáner de Ventas.
+
+Se precarga al iniciar la aplicación con una sola consulta y después resuelve
+cada escaneo con un acceso a diccionario. ProductsModel lo invalida por id
+cuando se modifica o borra un artículo; un código que no está en memoria se
+busca en la base (índice idx_articulos_codigo_barras) y queda guardado.
+"""
+import threading
+
+from models.db import Database, DEFAULT_DB_PATH
+
+# Mismas columnas y orden que products_model.SELECT_COLUMNS
+_COLUMNS = "id, nombre, id_categoria, subcategoria, id_proveedor, precio_costo, precio_venta, cantidad, estado, codigo_barras"
+
+
+class BarcodeIndex:
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._by_code = {}  # codigo_barras -> fila (tupla)
+        self._code_by_id = {}  # id -> codigo_barras, para invalidar por id
+        # se incrementa en cada invalidación; una precarga que se cruzó con una
+        # escritura se descarta en lugar de pisar datos más nuevos
+        self._generation = 0
+        self.warmed = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(code):
+        return str(code).strip() if code is not None else ""
+
+    def warm(self):
+        """Carga todos los códigos de barras en memoria. Devuelve la cantidad cargada."""
+        with self._lock:
+            generation = self._generation
+        try:
+            db = Database(self.db_path)
+            rows = db.execute(
+                f"SELECT {_COLUMNS} FROM articulos WHERE codigo_barras IS NOT NULL AND codigo_barras <> ''"
+            ).fetchall()
+            db.close()
+        except Exception as e:
+            print(f"Error al precargar códigos de barras: {e}")
+            return 0
+        by_code = {}
+        code_by_id = {}
+        for row in rows:
+            code = self.normalize(row[9])
+            by_code[code] = row
+            code_by_id[row[0]] = code
+        with self._lock:
+            if generation != self._generation:
+                return 0
+            self._by_code = by_code
+            self._code_by_id = code_by_id
+            self.warmed = True
+        return len(by_code)
+
+    def warm_async(self):
+        """Precarga en un hilo de fondo para no demorar el arranque."""
+        threading.Thread(target=self.warm, name="barcode-warm", daemon=True).start()
+
+    def get(self, code):
+        """Devuelve la fila del artículo con ese código, o None si no está en memoria."""
+        row = self._by_code.get(self.normalize(code))
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def put(self, row, generation=None):
+        """Guarda una fila leída de la base (después de un fallo de caché).
+
+        `generation` es el valor de `self.generation` antes de leerla: si hubo
+        una invalidación en el medio, la fila puede estar vieja y no se guarda.
+        """
+        code = self.normalize(row[9])
+        if not code:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._by_code[code] = row
+            self._code_by_id[row[0]] = code
+
+    def invalidate(self, product_ids=None):
+        """Descarta los artículos indicados, o todo si product_ids es None."""
+        with self._lock:
+            self._generation += 1
+            if product_ids is None:
+                self._by_code = {}
+                self._code_by_id = {}
+                self.warmed = False
+                return
+            for product_id in product_ids:
+                code = self._code_by_id.pop(product_id, None)
+                if code is not None:
+                    self._by_code.pop(code, None)
+
+    def stats(self):
+        return {"entries": len(self._by_code), "hits": self.hits, "misses": self.misses, "warmed": self.warmed}
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_barcode_index(db_path=DEFAULT_DB_PATH):
+    """Devuelve el índice compartido para `db_path`."""
+    with _indexes_lock:
+        index = _indexes.get(db_path)
+        if index is None:
+            index = BarcodeIndex(db_path)
+            _indexes[db_path] = index
+        return index
@@ -0,0 +1,164 @@
+"""Caché en memoria del catálogo de artículos, compartida por todo el proceso.
+
+Guarda dos cosas, ambas con límite de tamaño y desalojo LRU:
+- filas: id -> dict del artículo.
+- páginas: clave de consulta -> lista de ids (más el total por búsqueda).
+
+Una página solo se sirve si todas sus filas siguen en memoria. ProductsModel
+invalida al escribir: un cambio de precio o stock descarta solo esa fila; un
+cambio de nombre o código descarta además las páginas de búsquedas con texto;
+altas y bajas descartan las páginas (el orden se corre) pero no las filas.
+"""
+import threading
+from collections import OrderedDict
+
+from models.db import DEFAULT_DB_PATH
+
+# Columnas que deciden si un artículo aparece en una búsqueda con texto
+SEARCH_FIELDS = ("nombre", "codigo_barras")
+
+
+class CatalogCache:
+    MAX_ROWS = 20000
+    MAX_PAGES = 256
+
+    def __init__(self, max_rows=None, max_pages=None):
+        self.max_rows = max_rows or self.MAX_ROWS
+        self.max_pages = max_pages or self.MAX_PAGES
+        self._lock = threading.Lock()
+        self._rows = OrderedDict()   # id -> dict
+        self._pages = OrderedDict()  # clave -> tupla de ids
+        self._totals = {}            # texto de búsqueda -> total
+        # se incrementa en cada invalidación: lo leído antes de una escritura no se guarda
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    # --- lectura ---
+
+    def get_row(self, product_id):
+        """Devuelve una copia del artículo o None si no está en memoria."""
+        with self._lock:
+            row = self._rows.get(product_id)
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(product_id)
+            self.hits += 1
+            return dict(row)
+
+    def get_page(self, key):
+        """Devuelve copias de las filas de una página, o None si falta alguna."""
+        with self._lock:
+            ids = self._pages.get(key)
+            if ids is None or any(pid not in self._rows for pid in ids):
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            result = []
+            for pid in ids:
+                self._rows.move_to_end(pid)
+                result.append(dict(self._rows[pid]))
+            self.hits += 1
+            return result
+
+    def get_total(self, query):
+        with self._lock:
+            return self._totals.get(query)
+
+    # --- escritura (desde el modelo, después de leer la base) ---
+
+    def put_rows(self, rows, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._store_rows(rows)
+
+    def put_page(self, key, rows, generation=None):
+        """Guarda una página. Las páginas más grandes que la caché no se guardan."""
+        if len(rows) > self.max_rows:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._store_rows(rows)
+            self._pages[key] = tuple(row["id"] for row in rows)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def put_total(self, query, total, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._totals[query] = total
+
+    def _store_rows(self, rows):
+        for row in rows:
+            self._rows[row["id"]] = dict(row)
+            self._rows.move_to_end(row["id"])
+        while len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+
+    # --- invalidación ---
+
+    def invalidate_rows(self, product_ids, fields=None):
+        """Descarta los artículos modificados.
+
+        `fields` son las columnas cambiadas; si incluye alguna de SEARCH_FIELDS
+        (o no se sabe cuáles, None) también se descartan las búsquedas con texto.
+        """
+        with self._lock:
+            self._generation += 1
+            for pid in product_ids:
+                self._rows.pop(pid, None)
+            if fields is None or any(f in SEARCH_FIELDS for f in fields):
+                for key in [k for k in self._pages if k[0]]:
+                    del self._pages[key]
+                for query in [q for q in self._totals if q]:
+                    del self._totals[query]
+
+    def invalidate_pages(self, product_ids=()):
+        """Altas y bajas: descarta todas las páginas y totales (y las filas borradas)."""
+        with self._lock:
+            self._generation += 1
+            for pid in product_ids:
+                self._rows.pop(pid, None)
+            self._pages.clear()
+            self._totals.clear()
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._rows.clear()
+            self._pages.clear()
+            self._totals.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "rows": len(self._rows),
+                "pages": len(self._pages),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_catalog_cache(db_path=DEFAULT_DB_PATH):
+    """Devuelve la caché compartida para `db_path`."""
+    with _caches_lock:
+        cache = _caches.get(db_path)
+        if cache is None:
+            cache = CatalogCache()
+            _caches[db_path] = cache
+        return cache
@@ -1,64 +1,17 @@
 from models.db import Database
+from models import pagination
+
+# Orden de la grilla (usa idx_categorias_orden); el nombre NULL ordena como '', igual que en page_key
+PAGE_KEYSET = pagination.Keyset(["COALESCE(categoria, '') COLLATE NOCASE", "id"])
 
 
 class CategoriasModel:
     def __init__(self):
         self.db_path = 'database/negocio.db'
-        self._create_tables_if_needed()
 
     def _get_db_connection(self):
         return Database(self.db_path)
 
-    def _create_tables_if_needed(self):
-        try:
-            db = self._get_db_connection()
-            # Tabla de subcategorias
-            db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS subcategorias (
-                    id INTEGER PRIMARY KEY,
-                    nombre TEXT
-                )
-                """
-            )
-
-            # Tabla de categorias con ID autoincremental
-            db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS categorias (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    categoria TEXT,
-                    subcategoria TEXT,
-                    descripcion TEXT,
-                    estado TEXT NOT NULL DEFAULT 'activo',
-                    FOREIGN KEY(subcategoria) REFERENCES subcategorias(id)
-                )
-                """
-            )
-
-            # Si la tabla existía antes sin `descripcion`, agregar la columna
-            try:
-                # comprobar si la columna descripcion existe
-                info_cur = db.execute("PRAGMA table_info('categorias')")
-                cols = [r[1] for r in info_cur.fetchall() or []]
-                if 'descripcion' not in cols:
-                    try:
-                        db.execute("ALTER TABLE categorias ADD COLUMN descripcion TEXT")
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-
-            # índice para búsquedas por nombre de categoría
-            try:
-                db.execute("CREATE INDEX IF NOT EXISTS idx_categorias_nombre ON categorias (categoria COLLATE NOCASE)")
-            except Exception:
-                pass
-
-            db.close()
-        except Exception as e:
-            print(f"Error al crear tablas de categorías: {e}")
-
     # --- Operaciones sobre categorías ---
     def list_categories(self):
         """Devuelve todas las categorías como lista de dicts con keys compatibles con la vista.
@@ -84,25 +37,48 @@ class CategoriasModel:
             print(f"Error en list_categories: {e}")
             return []
 
-    def search_categories(self, query: str = None, limit: int = 50, offset: int = 0):
-        """Busca categorías por nombre (LIKE). Devuelve (rows_list, total_count)."""
+    def page_key(self, row):
+        """Clave de paginación (keyset) de una fila devuelta por search_categories."""
+        return (row["nombre"] or "", row["id"])
+
+    def search_categories(self, query: str = None, limit: int = 50, offset: int = 0,
+                          direction: str = None, key=None, with_total: bool = True,
+                          align_last: bool = False):
+        """Busca categorías por nombre (LIKE). Devuelve (rows_list, total_count).
+
+        Sin `direction` pagina con LIMIT/OFFSET; con `direction` (ver
+        models.pagination) pagina por (categoria, id) a partir de `key`.
+        Con with_total=False no se cuenta y total_count es None; align_last
+        como en ProductsModel.search_products.
+        JUMP sigue con OFFSET: la clave empieza por texto y no se puede
+        interpolar una posición como con los ids de productos. La tabla tiene
+        decenas de filas, así que recorrer las anteriores no se nota.
+        """
         try:
             db = self._get_db_connection()
             params = []
-            where = ""
+            conditions = []
             if query:
-                where = " WHERE categoria LIKE ? COLLATE NOCASE"
+                conditions.append("categoria LIKE ? COLLATE NOCASE")
                 params.append(f"%{query}%")
+            where = " WHERE " + " AND ".join(conditions) if conditions else ""
 
-            count_sql = f"SELECT COUNT(*) FROM categorias{where}"
-            cur = db.execute(count_sql, tuple(params) if params else ())
-            total = cur.fetchone()[0] if cur else 0
+            total = None
+            # la última página depende del total: se cuenta aunque no lo pidan
+            if with_total or (direction == pagination.LAST and align_last):
+                count_sql = f"SELECT COUNT(*) FROM categorias{where}"
+                cur = db.execute(count_sql, tuple(params) if params else ())
+                total = cur.fetchone()[0] if cur else 0
 
-            sql = f"SELECT id, categoria, subcategoria, IFNULL(descripcion, ''), estado FROM categorias{where} ORDER BY categoria COLLATE NOCASE LIMIT ? OFFSET ?"
-            params_page = list(params) if params else []
-            params_page.extend([limit, offset])
-            cur2 = db.execute(sql, tuple(params_page))
-            rows = cur2.fetchall() if cur2 else []
+            select_sql = "SELECT id, categoria, subcategoria, IFNULL(descripcion, ''), estado FROM categorias"
+            if direction is not None and direction != pagination.JUMP:
+                rows = pagination.fetch_page(db, select_sql, conditions, params, PAGE_KEYSET, limit, direction, key, total, align_last)
+            else:
+                sql = f"{select_sql}{where} ORDER BY {PAGE_KEYSET.order_by()} LIMIT ? OFFSET ?"
+                params_page = list(params) if params else []
+                params_page.extend([limit, offset])
+                cur2 = db.execute(sql, tuple(params_page))
+                rows = cur2.fetchall() if cur2 else []
 
             result = []
             for r in rows:
@@ -85,4 +85,40 @@ class CuentasModel:
             
         except Exception as e:
             print(f"Error al crear movimiento: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def create_movimientos(self, movimientos):
+        """Crea varios movimientos de cuenta en una sola transacción.
+
+        Devuelve la cantidad de movimientos insertados.
+        """
+        validos = [m for m in movimientos if m.get("proveedor") and m.get("fecha")]
+        if len(validos) != len(movimientos):
+            print("Error: Proveedor y fecha son requeridos")
+            return 0
+        try:
+            db = self._get_db_connection()
+            with db.transaction():
+                cur = db.executemany(
+                    """
+                    INSERT INTO cuentas (fecha, proveedor, movimiento, monto_movimiento, monto_boleta, saldo)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (
+                            data.get("fecha"),
+                            data.get("proveedor"),
+                            data.get("movimiento", 0),
+                            float(data.get("monto_movimiento", 0)) if data.get("monto_movimiento") else 0.0,
+                            float(data.get("monto_boleta", 0)) if data.get("monto_boleta") else 0.0,
+                            float(data.get("saldo", 0)) if data.get("saldo") else 0.0
+                        )
+                        for data in validos
+                    ]
+                )
+                insertados = cur.rowcount
+            db.close()
+            return insertados
+        except Exception as e:
+            print(f"Error al crear movimientos: {e}")
+            return 0
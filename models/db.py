@@ -1,9 +1,257 @@
+import os
+import re
 import sqlite3
+import threading
+from contextlib import contextmanager
 from sqlite3 import Connection, Cursor
 
+from config import DatabaseConfig
+
+DEFAULT_DB_PATH = 'database/negocio.db'
+
+# Sentencias que pueden ir a una conexión de lectura
+_READ_PREFIXES = ("SELECT", "WITH", "PRAGMA", "EXPLAIN")
+
+# Tabla que modifica una escritura (INSERT/REPLACE/UPDATE/DELETE)
+_WRITTEN_TABLE = re.compile(
+    r"\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+[\"`\[]?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def _written_table(query):
+    match = _WRITTEN_TABLE.match(query)
+    return match.group(1).lower() if match else None
+
+
+class ConnectionManager:
+    """Administra las conexiones SQLite de un archivo de base de datos.
+
+    - Lecturas: cada hilo toma una conexión del pool y la conserva mientras
+      tenga un `Database` abierto (afinidad por hilo). Al liberarla vuelve al
+      pool y la reutiliza el próximo hilo en lugar de abrir una nueva.
+    - Escrituras: una única conexión dedicada, protegida por un lock.
+    """
+
+    MAX_IDLE_READERS = 4
+
+    def __init__(self, db_path, profile=None):
+        self.db_path = db_path
+        self.pragmas = self._resolve_profile(db_path, profile)
+        self._journal_mode_set = False
+        self._checkpoint_stop = None
+        self._checkpoint_thread = None
+        self._lock = threading.Lock()
+        self._idle = []
+        self._in_use = {}  # thread ident -> [conexion, referencias]
+        self._writer = None
+        self.write_lock = threading.RLock()
+        # transacción explícita en curso sobre la conexión de escritura
+        self.tx_depth = 0
+        self.tx_thread = None
+        # sube con cada escritura confirmada: las pantallas en caché lo comparan para saber si recargar
+        self.write_generation = 0
+        # lo mismo por tabla, para las pantallas que declaran de qué tablas dependen
+        self.table_generations = {}
+        self._tx_tables = set()  # tablas escritas en la transacción en curso
+        self._closed = False
+        # contadores
+        self.connects = 0
+        self.reuses = 0
+
+    @staticmethod
+    def _resolve_profile(db_path, profile=None):
+        """Devuelve los PRAGMA del perfil indicado o del configurado para el archivo."""
+        if profile is None:
+            name = os.path.basename(db_path)
+            profile = DatabaseConfig.DB_PROFILES.get(name, DatabaseConfig.DEFAULT_PROFILE)
+        return dict(DatabaseConfig.PRAGMA_PROFILES.get(profile, {}))
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=DatabaseConfig.CONNECTION_TIMEOUT, check_same_thread=False)
+        self._apply_pragmas(conn)
+        with self._lock:
+            self.connects += 1
+        return conn
+
+    def _apply_pragmas(self, conn):
+        """Aplica el perfil de PRAGMA a una conexión nueva."""
+        for key, value in self.pragmas.items():
+            if key == 'journal_mode':
+                # es persistente en el archivo: alcanza con fijarlo una vez por proceso
+                if self._journal_mode_set:
+                    continue
+                try:
+                    conn.execute(f"PRAGMA journal_mode={value}")
+                    self._journal_mode_set = True
+                except sqlite3.OperationalError as e:
+                    print(f"No se pudo aplicar journal_mode={value}: {e}")
+                continue
+            try:
+                conn.execute(f"PRAGMA {key}={value}")
+            except sqlite3.OperationalError as e:
+                print(f"No se pudo aplicar PRAGMA {key}: {e}")
+
+    def acquire_reader(self):
+        """Devuelve la conexión de lectura del hilo actual (la crea o la toma del pool)."""
+        ident = threading.get_ident()
+        with self._lock:
+            entry = self._in_use.get(ident)
+            if entry is not None:
+                entry[1] += 1
+                self.reuses += 1
+                return entry[0]
+            if self._idle:
+                conn = self._idle.pop()
+                self._in_use[ident] = [conn, 1]
+                self.reuses += 1
+                return conn
+        conn = self._connect()
+        with self._lock:
+            self._in_use[ident] = [conn, 1]
+        return conn
+
+    def release_reader(self, conn):
+        """Devuelve la conexión al pool cuando el hilo ya no la usa."""
+        ident = threading.get_ident()
+        with self._lock:
+            entry = self._in_use.get(ident)
+            if entry is None or entry[0] is not conn:
+                # liberada desde otro hilo (p. ej. por el recolector): buscarla por conexión
+                for key, value in list(self._in_use.items()):
+                    if value[0] is conn:
+                        ident, entry = key, value
+                        break
+                else:
+                    return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._in_use[ident]
+            if not self._closed and len(self._idle) < self.MAX_IDLE_READERS:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def interrupt_reader(self, ident):
+        """Aborta la consulta de lectura en curso del hilo `ident` (lanza 'interrupted' en ese hilo)."""
+        with self._lock:
+            entry = self._in_use.get(ident)
+            if entry is not None:
+                entry[0].interrupt()
+                return True
+        return False
+
+    def get_writer(self):
+        """Devuelve la conexión de escritura compartida (usar bajo `write_lock`)."""
+        with self.write_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            else:
+                with self._lock:
+                    self.reuses += 1
+            return self._writer
+
+    def checkpoint(self, mode="PASSIVE"):
+        """Pasa las páginas del WAL al archivo principal para que no crezca sin límite."""
+        if self.pragmas.get('journal_mode', '').upper() != 'WAL':
+            return None
+        with self.write_lock:
+            if self._closed:
+                return None
+            try:
+                return self.get_writer().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            except sqlite3.Error as e:
+                print(f"Error en checkpoint del WAL: {e}")
+                return None
+
+    def start_checkpoint_task(self, interval=None):
+        """Inicia un hilo en segundo plano que hace checkpoint del WAL periódicamente."""
+        if self._checkpoint_thread is not None and self._checkpoint_thread.is_alive():
+            return
+        interval = interval or DatabaseConfig.WAL_CHECKPOINT_INTERVAL
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                self.checkpoint()
+
+        self._checkpoint_stop = stop
+        self._checkpoint_thread = threading.Thread(target=loop, name="wal-checkpoint", daemon=True)
+        self._checkpoint_thread.start()
+
+    def in_transaction(self):
+        """True si el hilo actual tiene abierta una transacción explícita."""
+        return self.tx_depth > 0 and self.tx_thread == threading.get_ident()
+
+    def mark_written(self, tables=()):
+        """Registra una escritura confirmada (llamar con `write_lock` tomado)."""
+        self.write_generation += 1
+        for table in tables:
+            if table:
+                self.table_generations[table] = self.table_generations.get(table, 0) + 1
+
+    def generation(self, tables=None):
+        """Marca de escrituras: global, o de las tablas indicadas (para comparar con una anterior)."""
+        if tables is None:
+            return self.write_generation
+        return tuple(self.table_generations.get(table, 0) for table in tables)
+
+    def stats(self):
+        """Contadores de uso: conexiones abiertas, reutilizadas, libres y en uso."""
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "reuses": self.reuses,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+            }
+
+    def close_all(self):
+        """Cierra todas las conexiones del pool y la de escritura."""
+        if self._checkpoint_stop is not None:
+            self._checkpoint_stop.set()
+        with self.write_lock:
+            with self._lock:
+                self._closed = True
+                conns = list(self._idle) + [entry[0] for entry in self._in_use.values()]
+                self._idle.clear()
+                self._in_use.clear()
+                writer, self._writer = self._writer, None
+            for conn in conns + ([writer] if writer is not None else []):
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path=DEFAULT_DB_PATH):
+    """Devuelve el administrador de conexiones compartido para `db_path`."""
+    with _managers_lock:
+        manager = _managers.get(db_path)
+        if manager is None or manager._closed:
+            manager = ConnectionManager(db_path)
+            _managers[db_path] = manager
+        return manager
+
+
+def shutdown_connections():
+    """Cierra todas las conexiones abiertas. Se llama al cerrar la aplicación."""
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.close_all()
+
+
 class Database():
-    def __init__(self, db_path = 'database/negocio.db'):
+    def __init__(self, db_path = DEFAULT_DB_PATH):
         self.db_path = db_path
+        self.manager: ConnectionManager = None
         self.connection: Connection = None
         self.cursor: Cursor = None
         self.connect()
@@ -11,25 +259,122 @@ class Database():
 
 
     def connect(self):
-        self.connection = sqlite3.connect(self.db_path)
+        # La conexión de lectura sale del pool compartido en lugar de abrirse cada vez
+        self.manager = get_connection_manager(self.db_path)
+        self.connection = self.manager.acquire_reader()
         self.cursor = self.connection.cursor()
 
     def execute(self, query, params:tuple=()):
         #Ejecuta una consulta SQL
-        self.cursor.execute(query, params)
+        if self.manager.in_transaction():
+            # dentro de una transacción todo va a la conexión de escritura (ve sus propios cambios)
+            self.cursor = self.manager.get_writer().execute(query, params)
+            self.manager._tx_tables.add(_written_table(query))
+            return self.cursor
         q = query.lstrip().upper()
-        if q.startswith("INSERT") or q.startswith("UPDATE") or q.startswith("DELETE"):
-            self.connection.commit()
+        if q.startswith(_READ_PREFIXES):
+            self.cursor = self.connection.execute(query, params)
+            return self.cursor
+        # Las escrituras van a la conexión dedicada
+        with self.manager.write_lock:
+            writer = self.manager.get_writer()
+            self.cursor = writer.execute(query, params)
+            if writer.in_transaction:
+                writer.commit()
+            self.manager.mark_written((_written_table(query),))
         return self.cursor
-    
+
+    def executemany(self, query, seq_of_params):
+        """Ejecuta la misma escritura para cada juego de parámetros con un solo commit."""
+        with self.manager.write_lock:
+            writer = self.manager.get_writer()
+            self.cursor = writer.executemany(query, seq_of_params)
+            if self.manager.in_transaction():
+                self.manager._tx_tables.add(_written_table(query))
+            else:
+                if writer.in_transaction:
+                    writer.commit()
+                self.manager.mark_written((_written_table(query),))
+        return self.cursor
+
+    def commit(self):
+        """Confirma las escrituras pendientes. Dentro de `transaction()` no hace nada:
+        el commit lo hace el bloque al terminar."""
+        if self.manager.in_transaction():
+            return
+        with self.manager.write_lock:
+            writer = self.manager.get_writer()
+            if writer.in_transaction:
+                writer.commit()
+                self.manager.mark_written()
+
+    @contextmanager
+    def transaction(self):
+        """Unidad de trabajo: todas las sentencias del bloque se confirman juntas.
+
+        Uso:
+            with db.transaction():
+                db.execute(...)
+                db.executemany(...)
+
+        Si el bloque lanza una excepción se hace rollback. Las transacciones
+        anidadas usan SAVEPOINT, de modo que un error interno solo deshace su parte.
+        """
+        manager = self.manager
+        with manager.write_lock:
+            writer = manager.get_writer()
+            depth = manager.tx_depth
+            savepoint = f"sp_{depth}"
+            if depth == 0:
+                if writer.in_transaction:
+                    writer.commit()
+                writer.execute("BEGIN")
+                manager.tx_thread = threading.get_ident()
+            else:
+                writer.execute(f"SAVEPOINT {savepoint}")
+            manager.tx_depth += 1
+            try:
+                yield self
+            except BaseException:
+                manager.tx_depth -= 1
+                if depth == 0:
+                    manager.tx_thread = None
+                    manager._tx_tables.clear()
+                    writer.rollback()
+                else:
+                    writer.execute(f"ROLLBACK TO {savepoint}")
+                    writer.execute(f"RELEASE {savepoint}")
+                raise
+            manager.tx_depth -= 1
+            if depth == 0:
+                manager.tx_thread = None
+                writer.commit()
+                tables, manager._tx_tables = manager._tx_tables, set()
+                manager.mark_written(tables)
+            else:
+                writer.execute(f"RELEASE {savepoint}")
+
     def fetchall(self):
         return self.cursor.fetchall()
     def fetchone(self):
         return self.cursor.fetchone()
-    
+
     def close(self):
         if self.connection:
-            self.connection.close()
+            self.manager.release_reader(self.connection)
             self.connection = None
             self.cursor = None
-        
\ No newline at end of file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        # Si un modelo no llegó a cerrar (p. ej. por una excepción), devolver la conexión al pool
+        try:
+            self.close()
+        except Exception:
+            pass
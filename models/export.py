@@ -0,0 +1,238 @@
+"""Exportación de productos, movimientos de proveedores e items de boletas a CSV o XLSX.
+
+Las filas se leen con `fetchmany` de a EXPORT_CHUNK y pasan por generadores
+hasta el archivo: la memoria no depende de la cantidad de filas. El XLSX se
+arma con un escritor mínimo (zipfile, celdas de texto en línea, sin tabla de
+strings compartidos) que escribe la hoja a medida que llegan las filas.
+Se escribe a un archivo temporal que reemplaza al destino al terminar.
+"""
+import csv
+import math
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from models.db import Database, DEFAULT_DB_PATH
+
+# Filas por fetchmany (y entre aviso y aviso de avance)
+EXPORT_CHUNK = 1000
+
+# nombre -> (título de la hoja, encabezados, FROM/WHERE sin filtro, filtro por proveedor, ORDER BY)
+EXPORTS = {
+    "productos": (
+        "Productos",
+        ["ID", "Nombre", "Categoría", "Subcategoría", "Proveedor", "Precio Costo", "Precio Venta", "Cantidad", "Estado", "Código de barras"],
+        "SELECT a.id, a.nombre, c.categoria, a.subcategoria, p.nombre, a.precio_costo, a.precio_venta, a.cantidad, a.estado, a.codigo_barras "
+        "FROM articulos a LEFT JOIN categorias c ON c.id = a.id_categoria LEFT JOIN proveedores p ON p.id = a.id_proveedor",
+        "a.id_proveedor = ?",
+        "a.id",
+    ),
+    "movimientos": (
+        "Movimientos",
+        ["ID", "Fecha", "Proveedor", "Tipo", "Monto", "Descripción"],
+        "SELECT m.id, m.fecha, p.nombre, m.tipo, m.monto, m.descripcion "
+        "FROM movimientos_proveedores m LEFT JOIN proveedores p ON p.id = m.proveedor_id",
+        "m.proveedor_id = ?",
+        "m.fecha, m.id",
+    ),
+    "boletas_items": (
+        "Items de boletas",
+        ["Boleta", "Fecha", "Proveedor", "ID Producto", "Producto", "Cantidad", "Precio Unitario", "Subtotal"],
+        "SELECT b.id, b.fecha, p.nombre, i.producto_id, i.producto_nombre, i.cantidad, i.precio_unitario, i.subtotal "
+        "FROM boletas_items i JOIN boletas_proveedores b ON b.id = i.boleta_id LEFT JOIN proveedores p ON p.id = b.proveedor_id",
+        "b.proveedor_id = ?",
+        "b.fecha, b.id, i.id",
+    ),
+}
+
+# caracteres de control que no se pueden escribir en XML
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _query(kind, proveedor_id=None):
+    """(sql, sql de COUNT, parámetros) de una exportación."""
+    _, _, select, filtro, order = EXPORTS[kind]
+    where, params = "", ()
+    if proveedor_id is not None:
+        where, params = f" WHERE {filtro}", (proveedor_id,)
+    from_sql = select[select.index(" FROM "):]
+    return f"{select}{where} ORDER BY {order}", f"SELECT COUNT(*){from_sql}{where}", params
+
+
+def iter_rows(sql, params=(), db_path=DEFAULT_DB_PATH, size=EXPORT_CHUNK):
+    """Recorre el resultado de una consulta de a `size` filas (fetchmany)."""
+    db = Database(db_path)
+    try:
+        cursor = db.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        db.close()
+
+
+def _with_progress(rows, progress, total):
+    done = 0
+    for row in rows:
+        yield row
+        done += 1
+        if progress and done % EXPORT_CHUNK == 0:
+            progress(done, total)
+    if progress:
+        progress(done, total)
+
+
+def write_csv(path, headers, rows):
+    """Escribe un CSV (utf-8 con BOM y `;`, como lo abre Excel en castellano). Devuelve las filas escritas."""
+    count = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int) or (isinstance(value, float) and math.isfinite(value)):
+        return f"<c><v>{value!r}</v></c>"
+    text = escape(_XML_INVALID.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def write_xlsx(path, sheets):
+    """Escribe un libro XLSX mínimo. `sheets` es una lista de (título, encabezados, filas).
+
+    Cada hoja se escribe en el zip a medida que llegan sus filas. Devuelve
+    la cantidad de filas escritas (sin contar encabezados).
+    """
+    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    rel_ns = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    count = 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + "".join(
+                f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                for i in range(1, len(sheets) + 1)
+            )
+            + "</Types>",
+        )
+        zf.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{rel_ns}/officeDocument" Target="xl/workbook.xml"/>'
+            "</Relationships>",
+        )
+        zf.writestr(
+            "xl/workbook.xml",
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><workbook xmlns="{ns}" xmlns:r="{rel_ns}"><sheets>'
+            + "".join(
+                f'<sheet name="{escape(title[:31])}" sheetId="{i}" r:id="rId{i}"/>'
+                for i, (title, _, _) in enumerate(sheets, 1)
+            )
+            + "</sheets></workbook>",
+        )
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(
+                f'<Relationship Id="rId{i}" Type="{rel_ns}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                for i in range(1, len(sheets) + 1)
+            )
+            + "</Relationships>",
+        )
+        for i, (_, headers, rows) in enumerate(sheets, 1):
+            with zf.open(f"xl/worksheets/sheet{i}.xml", "w", force_zip64=True) as f:
+                f.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><worksheet xmlns="{ns}"><sheetData>'.encode())
+                buffer = ["<row>" + "".join(_xlsx_cell(h) for h in headers) + "</row>"]
+                for row in rows:
+                    buffer.append("<row>" + "".join(_xlsx_cell(v) for v in row) + "</row>")
+                    count += 1
+                    if len(buffer) >= EXPORT_CHUNK:
+                        f.write("".join(buffer).encode())
+                        buffer = []
+                buffer.append("</sheetData></worksheet>")
+                f.write("".join(buffer).encode())
+    return count
+
+
+def export(kinds, path, proveedor_id=None, progress=None, db_path=DEFAULT_DB_PATH):
+    """Exporta uno o varios conjuntos de EXPORTS a `path` (.xlsx o .csv).
+
+    En XLSX cada conjunto va en su hoja; en CSV el primero va a `path` y los
+    demás a `<nombre>_<conjunto>.csv` al lado. `progress(hechas, total)` se
+    llama cada EXPORT_CHUNK filas (en el hilo que exporta). Devuelve las
+    filas escritas; si falla no deja archivos a medias y lanza la excepción.
+    """
+    if isinstance(kinds, str):
+        kinds = [kinds]
+    queries = [_query(kind, proveedor_id) for kind in kinds]
+    db = Database(db_path)
+    try:
+        total = sum(db.execute(count_sql, params).fetchone()[0] for _, count_sql, params in queries)
+    finally:
+        db.close()
+    done = 0
+
+    def report(hechas, _total):
+        if progress:
+            progress(done + hechas, total)
+
+    def sheet_rows(sql, params):
+        nonlocal done
+        count = 0
+        for row in _with_progress(iter_rows(sql, params, db_path), report, total):
+            count += 1
+            yield row
+        done += count
+
+    base, ext = os.path.splitext(path)
+    if ext.lower() == ".xlsx":
+        targets = [path]
+        tmp = [path + ".tmp"]
+        try:
+            written = write_xlsx(
+                tmp[0],
+                [(EXPORTS[kind][0], EXPORTS[kind][1], sheet_rows(sql, params)) for kind, (sql, _, params) in zip(kinds, queries)],
+            )
+        except BaseException:
+            _remove(tmp)
+            raise
+    else:
+        targets = [path] + [f"{base}_{kind}{ext or '.csv'}" for kind in kinds[1:]]
+        tmp = [t + ".tmp" for t in targets]
+        written = 0
+        try:
+            for kind, (sql, _, params), target in zip(kinds, queries, tmp):
+                written += write_csv(target, EXPORTS[kind][1], sheet_rows(sql, params))
+        except BaseException:
+            _remove(tmp)
+            raise
+    for source, target in zip(tmp, targets):
+        os.replace(source, target)
+    return written
+
+
+def _remove(paths):
+    for p in paths:
+        try:
+            os.remove(p)
+        except OSError:
+            pass
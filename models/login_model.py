@@ -7,16 +7,6 @@ class UsuarioModel:
         self.password = password
         self.db = Database()
 
-    def crear_tabla(self):
-        self.db.execute("""
-            CREATE TABLE IF NOT EXISTS "usuarios" (
-            "id"	INTEGER,
-            "usuario"	TEXT NOT NULL,
-            "contraseña"	TEXT NOT NULL,
-            PRIMARY KEY("id" AUTOINCREMENT)
-        );
-        """)
-
     def crear_usuario(self, username, password):
         """Crea un nuevo usuario en la tabla `usuarios`.
 
@@ -0,0 +1,361 @@
+"""Migraciones de esquema de la base de datos.
+
+Cada migración lleva la base de la versión N-1 a la N y la versión queda
+guardada en `PRAGMA user_version`. `run_migrations` se ejecuta una sola vez
+al iniciar la aplicación (ver main.py); los modelos ya no crean tablas.
+"""
+import sqlite3
+
+from models.db import Database, DEFAULT_DB_PATH
+
+
+def _columnas(db, tabla):
+    """Devuelve los nombres de columna de una tabla."""
+    cur = db.execute(f"PRAGMA table_info('{tabla}')")
+    return [r[1] for r in cur.fetchall() or []]
+
+
+def _agregar_columnas(db, tabla, columnas):
+    """Agrega las columnas que falten. `columnas` es {nombre: definición}."""
+    existentes = _columnas(db, tabla)
+    for nombre, definicion in columnas.items():
+        if nombre not in existentes:
+            db.execute(f"ALTER TABLE {tabla} ADD COLUMN {nombre} {definicion}")
+
+
+def _v1_esquema_base(db):
+    """Esquema canónico: el de negocio.db, más las columnas que usan los modelos."""
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario TEXT NOT NULL,
+            "contraseña" TEXT NOT NULL
+        )
+        """
+    )
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS proveedores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT,
+            telefono INTEGER,
+            saldo REAL,
+            estado TEXT NOT NULL DEFAULT 'activo'
+        )
+        """
+    )
+    # Bases creadas por versiones anteriores de ProveedoresModel no tienen saldo,
+    # y get_boleta_completa necesita direccion
+    _agregar_columnas(db, "proveedores", {
+        "telefono": "INTEGER",
+        "saldo": "REAL",
+        "estado": "TEXT NOT NULL DEFAULT 'activo'",
+        "direccion": "TEXT",
+    })
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS subcategorias (
+            id INTEGER PRIMARY KEY,
+            nombre TEXT
+        )
+        """
+    )
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS categorias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            categoria TEXT,
+            subcategoria TEXT,
+            estado TEXT NOT NULL DEFAULT 'activo',
+            descripcion TEXT,
+            FOREIGN KEY(subcategoria) REFERENCES subcategorias(id)
+        )
+        """
+    )
+    _agregar_columnas(db, "categorias", {
+        "estado": "TEXT NOT NULL DEFAULT 'activo'",
+        "descripcion": "TEXT",
+    })
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS articulos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            id_categoria TEXT,
+            subcategoria TEXT,
+            id_proveedor INTEGER,
+            precio_costo INTEGER NOT NULL,
+            precio_venta INTEGER NOT NULL,
+            cantidad INTEGER NOT NULL,
+            estado TEXT NOT NULL DEFAULT 'activo',
+            codigo_barras TEXT,
+            FOREIGN KEY(id_proveedor) REFERENCES proveedores(id),
+            FOREIGN KEY(id_categoria) REFERENCES categorias(id)
+        )
+        """
+    )
+    _agregar_columnas(db, "articulos", {
+        "subcategoria": "TEXT",
+        "estado": "TEXT NOT NULL DEFAULT 'activo'",
+        "codigo_barras": "TEXT",
+    })
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cuentas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha TEXT,
+            proveedor INTEGER,
+            movimiento INTEGER,
+            monto_movimiento REAL,
+            monto_boleta INTEGER,
+            saldo INTEGER,
+            FOREIGN KEY(proveedor) REFERENCES proveedores(id)
+        )
+        """
+    )
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS movimientos_proveedores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            proveedor_id INTEGER NOT NULL,
+            tipo TEXT NOT NULL,  -- 'pago' o 'pedido'
+            monto REAL NOT NULL,
+            descripcion TEXT,
+            fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (proveedor_id) REFERENCES proveedores(id)
+        )
+        """
+    )
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS boletas_proveedores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            movimiento_id INTEGER NOT NULL,
+            proveedor_id INTEGER NOT NULL,
+            fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
+            subtotal REAL NOT NULL DEFAULT 0,
+            total REAL NOT NULL DEFAULT 0,
+            estado TEXT DEFAULT 'activa',
+            FOREIGN KEY (movimiento_id) REFERENCES movimientos_proveedores(id),
+            FOREIGN KEY (proveedor_id) REFERENCES proveedores(id)
+        )
+        """
+    )
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS boletas_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            boleta_id INTEGER NOT NULL,
+            producto_id INTEGER,
+            producto_nombre TEXT NOT NULL,
+            cantidad INTEGER NOT NULL,
+            precio_unitario REAL NOT NULL,
+            subtotal REAL NOT NULL,
+            FOREIGN KEY (boleta_id) REFERENCES boletas_proveedores(id),
+            FOREIGN KEY (producto_id) REFERENCES articulos(id)
+        )
+        """
+    )
+
+    # índices para búsquedas case-insensitive y para las consultas por proveedor/boleta
+    db.execute("CREATE INDEX IF NOT EXISTS idx_articulos_nombre ON articulos (nombre COLLATE NOCASE)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_proveedores_nombre ON proveedores (nombre COLLATE NOCASE)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_categorias_nombre ON categorias (categoria COLLATE NOCASE)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_movimientos_proveedor ON movimientos_proveedores (proveedor_id, fecha)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_boletas_items_boleta ON boletas_items (boleta_id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_cuentas_proveedor ON cuentas (proveedor, fecha)")
+
+
+def _v2_busqueda_fts(db):
+    """Índice FTS5 (trigram) sobre nombre y código de barras, sincronizado con triggers.
+
+    Si el SQLite no tiene FTS5/trigram la versión avanza igual (las demás
+    migraciones no dependen del índice) y run_migrations lo vuelve a intentar
+    en cada arranque hasta que se pueda crear (ver _reintentar_fts).
+    """
+    try:
+        db.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS articulos_fts USING fts5(
+                nombre, codigo_barras,
+                content='articulos', content_rowid='id',
+                tokenize='trigram'
+            )
+            """
+        )
+    except sqlite3.OperationalError as e:
+        # SQLite sin FTS5/trigram: ProductsModel sigue buscando con LIKE
+        print(f"Índice FTS5 no disponible, se usará LIKE: {e}")
+        return False
+
+    db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS articulos_fts_ai AFTER INSERT ON articulos BEGIN
+            INSERT INTO articulos_fts (rowid, nombre, codigo_barras)
+            VALUES (new.id, new.nombre, new.codigo_barras);
+        END
+        """
+    )
+    db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS articulos_fts_ad AFTER DELETE ON articulos BEGIN
+            INSERT INTO articulos_fts (articulos_fts, rowid, nombre, codigo_barras)
+            VALUES ('delete', old.id, old.nombre, old.codigo_barras);
+        END
+        """
+    )
+    db.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS articulos_fts_au AFTER UPDATE OF nombre, codigo_barras ON articulos BEGIN
+            INSERT INTO articulos_fts (articulos_fts, rowid, nombre, codigo_barras)
+            VALUES ('delete', old.id, old.nombre, old.codigo_barras);
+            INSERT INTO articulos_fts (rowid, nombre, codigo_barras)
+            VALUES (new.id, new.nombre, new.codigo_barras);
+        END
+        """
+    )
+    # indexar los artículos existentes
+    db.execute("INSERT INTO articulos_fts (articulos_fts) VALUES ('rebuild')")
+    return True
+
+
+def _reintentar_fts(db):
+    """Crea el índice FTS5 si la migración 2 no pudo (SQLite sin FTS5 en ese momento)."""
+    existe = db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articulos_fts'").fetchone()
+    if existe:
+        return
+    with db.transaction():
+        if _v2_busqueda_fts(db):
+            print("Índice FTS5 creado")
+
+
+def _v3_indice_codigo_barras(db):
+    """Índice único (parcial) sobre el código de barras, para la búsqueda exacta del escáner."""
+    try:
+        db.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_articulos_codigo_barras ON articulos (codigo_barras) "
+            "WHERE codigo_barras IS NOT NULL AND codigo_barras <> ''"
+        )
+    except sqlite3.IntegrityError as e:
+        # hay códigos repetidos: se indexa igual, sin la restricción de unicidad
+        print(f"Hay códigos de barras repetidos, el índice no será único: {e}")
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_articulos_codigo_barras ON articulos (codigo_barras) "
+            "WHERE codigo_barras IS NOT NULL AND codigo_barras <> ''"
+        )
+
+
+def _v4_historial_precios(db):
+    """Registro de los aumentos masivos: un lote por aumento y el precio anterior/nuevo de cada artículo."""
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lotes_precios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+            descripcion TEXT,
+            porcentaje REAL,
+            cantidad INTEGER NOT NULL DEFAULT 0,
+            revertido_en TEXT
+        )
+        """
+    )
+    # solo se agrega; la clave (lote, artículo) deja revertir un lote con un recorrido por rango
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS historial_precios (
+            lote_id INTEGER NOT NULL REFERENCES lotes_precios(id),
+            articulo_id INTEGER NOT NULL,
+            precio_anterior REAL,
+            precio_nuevo REAL,
+            PRIMARY KEY (lote_id, articulo_id)
+        ) WITHOUT ROWID
+        """
+    )
+    db.execute("CREATE INDEX IF NOT EXISTS idx_historial_precios_articulo ON historial_precios (articulo_id, lote_id)")
+
+
+def _v5_reglas_precios(db):
+    """Reglas de margen: precio_venta = precio_costo + margen %, por categoría y/o proveedor."""
+    # id_categoria / id_proveedor NULL = cualquiera; redondeo NULL = escalonado (PRICE_ROUNDING),
+    # 0 = sin redondeo, N = hacia arriba al múltiplo de N
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reglas_precios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_categoria INTEGER REFERENCES categorias(id),
+            id_proveedor INTEGER REFERENCES proveedores(id),
+            margen REAL NOT NULL,
+            redondeo INTEGER
+        )
+        """
+    )
+    # una sola regla por combinación (NULL cuenta como un valor más)
+    db.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_reglas_precios_alcance "
+        "ON reglas_precios (IFNULL(id_categoria, 0), IFNULL(id_proveedor, 0))"
+    )
+
+
+def _v6_orden_por_nombre(db):
+    """Índices del orden de las grillas con nombre NULL como '' (igual que la clave de paginación)."""
+    db.execute("CREATE INDEX IF NOT EXISTS idx_proveedores_orden ON proveedores (COALESCE(nombre, '') COLLATE NOCASE)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_categorias_orden ON categorias (COALESCE(categoria, '') COLLATE NOCASE)")
+
+
+# (versión, descripción, función). Agregar siempre al final con la versión siguiente.
+MIGRATIONS = [
+    (1, "Esquema base", _v1_esquema_base),
+    (2, "Búsqueda full-text de artículos", _v2_busqueda_fts),
+    (3, "Índice de códigos de barras", _v3_indice_codigo_barras),
+    (4, "Historial de precios", _v4_historial_precios),
+    (5, "Reglas de precios", _v5_reglas_precios),
+    (6, "Orden de grillas por nombre", _v6_orden_por_nombre),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+class MigrationError(Exception):
+    """Una migración falló: la base quedó en la versión anterior a esa migración."""
+
+
+def get_schema_version(db_path=DEFAULT_DB_PATH):
+    """Devuelve la versión de esquema guardada en la base."""
+    db = Database(db_path)
+    try:
+        return db.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        db.close()
+
+
+def run_migrations(db_path=DEFAULT_DB_PATH):
+    """Aplica en orden las migraciones pendientes. Devuelve la versión final.
+
+    Cada migración corre en su propia transacción junto con el cambio de
+    `user_version`: si falla, la base queda en la versión anterior y se lanza
+    MigrationError (la aplicación no debe arrancar con el esquema a medias).
+    """
+    db = Database(db_path)
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    try:
+        for numero, descripcion, migracion in MIGRATIONS:
+            if numero <= version:
+                continue
+            with db.transaction():
+                migracion(db)
+                db.execute(f"PRAGMA user_version = {int(numero)}")
+            version = numero
+            print(f"Migración {numero} aplicada: {descripcion}")
+        if version >= 2:
+            _reintentar_fts(db)
+    except Exception as e:
+        print(f"Error al aplicar migración {version + 1}: {e}")
+        raise MigrationError(f"No se pudo aplicar la migración {version + 1}: {e}") from e
+    finally:
+        db.close()
+    return version
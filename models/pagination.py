@@ -0,0 +1,92 @@
+"""Paginación por clave (keyset / seek) para los modelos.
+
+En lugar de `LIMIT ? OFFSET ?`, que obliga a SQLite a recorrer y descartar
+todas las filas anteriores, cada página se pide a partir de la clave de orden
+de la última (o primera) fila de la página anterior, y el índice salta
+directamente ahí. El costo de ir a la página 2000 es el mismo que el de la 2.
+"""
+
+# Direcciones de navegación
+FIRST = "first"  # primera página
+NEXT = "next"    # filas posteriores a `key`
+PREV = "prev"    # filas anteriores a `key`
+LAST = "last"    # última página
+AT = "at"        # página que empieza en `key` (inclusive), para refrescar
+JUMP = "jump"    # posición aproximada, según `fraction` (0.0 a 1.0)
+
+DIRECTIONS = (FIRST, NEXT, PREV, LAST, AT, JUMP)
+
+
+class Keyset:
+    """Orden estable sobre una o más columnas, todas en el mismo sentido.
+
+    La última columna debe ser única (normalmente el id) para que no haya
+    empates entre filas.
+    """
+
+    def __init__(self, columns, descending=False):
+        self.columns = list(columns)
+        self.descending = descending
+
+    def order_by(self, reverse=False):
+        """Cláusula ORDER BY (sin la palabra clave); `reverse` invierte el sentido."""
+        direction = "DESC" if self.descending != reverse else "ASC"
+        return ", ".join(f"{col} {direction}" for col in self.columns)
+
+    def seek(self, key, reverse=False, inclusive=False):
+        """Condición WHERE para las filas que siguen a `key` en el orden. Devuelve (sql, params)."""
+        descending = self.descending != reverse
+        op = "<" if descending else ">"
+        if inclusive:
+            op += "="
+        key = list(key)
+        if len(self.columns) == 1:
+            return f"{self.columns[0]} {op} ?", key[:1]
+        placeholders = ", ".join("?" for _ in self.columns)
+        return f"({', '.join(self.columns)}) {op} ({placeholders})", key
+
+
+def last_page_size(total, limit):
+    """Filas de la última página si las páginas se cortan cada `limit` desde el principio."""
+    return (total % limit or limit) if total else limit
+
+
+def fetch_page(db, select_sql, conditions, params, keyset, limit, direction=FIRST, key=None, total=None,
+               align_last=False):
+    """Ejecuta `select_sql` (SELECT ... FROM ..., sin WHERE) paginando por `keyset`.
+
+    `conditions` son los filtros de la búsqueda (se combinan con AND).
+    LAST trae las últimas `limit` filas; con align_last=True y el `total` de
+    filas trae solo el resto de `total / limit`, para que coincida con la
+    última página numerada (grilla por páginas) y no repita filas de la
+    anteúltima. Devuelve las filas en el orden de pantalla.
+    """
+    conditions = list(conditions)
+    params = list(params)
+    reverse = direction in (PREV, LAST)
+    if direction == LAST and align_last and total is not None:
+        limit = last_page_size(total, limit)
+    if key is not None and direction in (NEXT, PREV, AT):
+        cond, cond_params = keyset.seek(key, reverse=reverse, inclusive=direction == AT)
+        conditions.append(cond)
+        params.extend(cond_params)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    sql = f"{select_sql}{where} ORDER BY {keyset.order_by(reverse)} LIMIT ?"
+    rows = db.execute(sql, tuple(params) + (limit,)).fetchall() or []
+    if reverse:
+        # se leyó hacia atrás desde la clave: devolver en el orden normal
+        rows.reverse()
+    return rows
+
+
+def interpolate_key(low, high, fraction, descending=False):
+    """Clave numérica aproximada en la posición `fraction` entre `low` y `high`.
+
+    Supone que las claves están repartidas de forma más o menos uniforme (ids
+    autoincrementales), así que sirve para saltar a una página sin contar filas.
+    """
+    fraction = min(1.0, max(0.0, float(fraction)))
+    span = high - low
+    if descending:
+        return high - round(span * fraction)
+    return low + round(span * fraction)
@@ -0,0 +1,241 @@
+"""Lectura de listas de precios de proveedores (CSV o XLSX) como un generador.
+
+Las filas se leen de a una y se devuelven ya normalizadas, sin cargar el
+archivo entero en memoria: ProductsModel.import_price_list las va pasando por
+tandas a una tabla temporal. El XLSX se lee con zipfile + iterparse (solo la
+primera hoja), sin dependencias extra.
+"""
+import codecs
+import csv
+import io
+import os
+import posixpath
+import re
+import unicodedata
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Encabezados reconocidos (normalizados: minúsculas, sin tildes ni separadores)
+HEADER_ALIASES = {
+    "codigo_barras": ("codigobarras", "codigodebarras", "codbarras", "codigo", "cod", "ean", "barras", "barcode"),
+    "nombre": ("nombre", "descripcion", "producto", "articulo", "detalle"),
+    "precio_costo": ("preciocosto", "costo", "precio", "preciounitario", "preciolista", "lista", "neto"),
+    "precio_venta": ("precioventa", "venta", "preciopublico", "pvp", "publico"),
+}
+# Sin encabezado reconocible se asume este orden de columnas
+DEFAULT_COLUMNS = ("codigo_barras", "nombre", "precio_costo", "precio_venta")
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+# "2.500", "1.234.567": puntos de miles sin decimales (así vienen los precios en pesos)
+_THOUSANDS_DOTS = re.compile(r"[1-9]\d{0,2}(\.\d{3})+")
+
+
+def _normalize_header(text):
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def map_columns(header):
+    """Índice de cada campo en la fila de encabezado, o None si no la reconoce."""
+    normalized = [_normalize_header(h) for h in header]
+    columns = {}
+    for field, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized and normalized.index(alias) not in columns.values():
+                columns[field] = normalized.index(alias)
+                break
+    if "codigo_barras" in columns and "precio_costo" in columns:
+        return columns
+    return None
+
+
+def parse_price(value):
+    """Convierte un precio de planilla ("$ 1.234,50", "1234.5", 1234.5) a float. None si no es un número.
+
+    Un punto seguido de exactamente tres dígitos ("2.500", "$ 1.234") se toma
+    como separador de miles, no como decimal.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace("$", "").replace(" ", "")
+    if not text:
+        return None
+    if "," in text and "." in text:
+        # el último separador es el decimal
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", ".") if text.count(",") == 1 else text.replace(",", "")
+    elif text.count(".") > 1 or _THOUSANDS_DOTS.fullmatch(text.lstrip("-")):
+        text = text.replace(".", "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def normalize_barcode(value):
+    """Código de barras como texto (las planillas suelen guardarlo como número)."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = str(value).strip() if value is not None else ""
+    if re.fullmatch(r"\d+\.0+", text):
+        text = text.split(".")[0]
+    return text
+
+
+class PriceListReader:
+    """Recorre una lista de precios y devuelve dicts con codigo_barras, nombre, precio_costo y precio_venta.
+
+    Las líneas sin código o sin costo válido se cuentan en `skipped`.
+    `fraction` (0 a 1) es lo leído del archivo, para mostrar el avance desde
+    otro hilo. `has_sale_price` indica si la lista trae precio de venta.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.kind = "xlsx" if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm") else "csv"
+        self.fraction = 0.0
+        self.lines = 0
+        self.skipped = 0
+        self.has_sale_price = False
+
+    def __iter__(self):
+        rows = self._xlsx_rows() if self.kind == "xlsx" else self._csv_rows()
+        columns = None
+        for row in rows:
+            if columns is None:
+                columns = map_columns(row)
+                if columns is not None:
+                    self.has_sale_price = "precio_venta" in columns
+                    continue
+                columns = {field: i for i, field in enumerate(DEFAULT_COLUMNS)}
+                self.has_sale_price = len(row) > columns["precio_venta"]
+            if not any(str(v).strip() for v in row if v is not None):
+                continue
+            self.lines += 1
+            item = {field: row[i] if i < len(row) else None for field, i in columns.items()}
+            item["codigo_barras"] = normalize_barcode(item.get("codigo_barras"))
+            item["precio_costo"] = parse_price(item.get("precio_costo"))
+            item["precio_venta"] = parse_price(item.get("precio_venta"))
+            item["nombre"] = str(item.get("nombre") or "").strip() or None
+            if not item["codigo_barras"] or item["precio_costo"] is None or item["precio_costo"] < 0:
+                self.skipped += 1
+                continue
+            yield item
+        self.fraction = 1.0
+
+    # --- CSV ---
+
+    def _csv_rows(self):
+        size = os.path.getsize(self.path) or 1
+        with open(self.path, "rb") as raw:
+            sample = raw.read(64 * 1024)
+            raw.seek(0)
+            encoding = self._detect_encoding(sample)
+            text = io.TextIOWrapper(raw, encoding=encoding, newline="")
+            try:
+                dialect = csv.Sniffer().sniff(sample.decode(encoding, errors="ignore"), delimiters=",;\t|")
+            except csv.Error:
+                dialect = csv.excel
+            for i, row in enumerate(csv.reader(text, dialect)):
+                if i % 1000 == 0:
+                    self.fraction = min(1.0, raw.tell() / size)
+                yield row
+
+    @staticmethod
+    def _detect_encoding(sample):
+        """utf-8 (con o sin BOM) si la muestra es válida; si no, la codificación de Excel en Windows."""
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        except UnicodeDecodeError:
+            return "cp1252"
+        return "utf-8-sig"
+
+    # --- XLSX ---
+
+    def _xlsx_rows(self):
+        with zipfile.ZipFile(self.path) as zf:
+            shared = self._shared_strings(zf)
+            total = None
+            sheet_data = None
+            with zf.open(self._first_sheet(zf)) as f:
+                for event, elem in ET.iterparse(f, events=("start", "end")):
+                    if event == "start":
+                        if elem.tag == _NS + "dimension":
+                            match = _CELL_REF.fullmatch(elem.get("ref", "").split(":")[-1])
+                            total = int(match.group(2)) if match else None
+                        elif elem.tag == _NS + "sheetData":
+                            sheet_data = elem
+                        continue
+                    if elem.tag != _NS + "row":
+                        continue
+                    row = self._xlsx_row(elem, shared)
+                    if total:
+                        self.fraction = min(1.0, int(elem.get("r") or 0) / total)
+                    # las filas ya leídas se sueltan: la memoria no crece con el archivo
+                    if sheet_data is not None:
+                        sheet_data.clear()
+                    yield row
+
+    @staticmethod
+    def _xlsx_row(elem, shared):
+        values = []
+        for cell in elem.iter(_NS + "c"):
+            match = _CELL_REF.fullmatch(cell.get("r", ""))
+            if match:
+                col = 0
+                for letter in match.group(1):
+                    col = col * 26 + ord(letter) - ord("A") + 1
+                # celdas vacías omitidas en el XML
+                values.extend([None] * (col - 1 - len(values)))
+            kind = cell.get("t")
+            if kind == "inlineStr":
+                value = "".join(t.text or "" for t in cell.iter(_NS + "t"))
+            else:
+                v = cell.find(_NS + "v")
+                value = v.text if v is not None else None
+                if value is not None:
+                    if kind == "s":
+                        value = shared[int(value)]
+                    elif kind in (None, "n"):
+                        value = float(value)
+            values.append(value)
+        return values
+
+    @staticmethod
+    def _shared_strings(zf):
+        try:
+            f = zf.open("xl/sharedStrings.xml")
+        except KeyError:
+            return []
+        strings = []
+        with f:
+            for _, elem in ET.iterparse(f):
+                if elem.tag == _NS + "si":
+                    strings.append("".join(t.text or "" for t in elem.iter(_NS + "t")))
+                    elem.clear()
+        return strings
+
+    @staticmethod
+    def _first_sheet(zf):
+        """Ruta dentro del zip de la primera hoja del libro."""
+        try:
+            workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+            sheet = workbook.find(f"{_NS}sheets/{_NS}sheet")
+            rel_id = sheet.get(_REL_NS + "id")
+            rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+            for rel in rels.iter(_PKG_REL_NS + "Relationship"):
+                if rel.get("Id") == rel_id:
+                    target = rel.get("Target")
+                    return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        except (KeyError, AttributeError, ET.ParseError):
+            pass
+        return "xl/worksheets/sheet1.xml"
@@ -1,89 +1,254 @@
+import json
+import math
+import sqlite3
+
 from models.db import Database
+from models import pagination
+from models.barcode_index import get_barcode_index
+from models.catalog_cache import get_catalog_cache
+
+# Las búsquedas FTS5 trigram necesitan al menos 3 caracteres por palabra
+FTS_MIN_LENGTH = 3
+
+SELECT_COLUMNS = "a.id, a.nombre, a.id_categoria, a.subcategoria, a.id_proveedor, a.precio_costo, a.precio_venta, a.cantidad, a.estado, a.codigo_barras"
+
+# Orden de la grilla: los más nuevos primero
+PAGE_KEYSET = pagination.Keyset(["a.id"], descending=True)
+
+INSERT_SQL = "INSERT INTO articulos (nombre, id_categoria, subcategoria, id_proveedor, precio_costo, precio_venta, cantidad, estado, codigo_barras) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+# Filas por executemany en los cambios masivos (entre tanda y tanda se informa el avance)
+BULK_CHUNK = 500
+
+# Filas de la lista de precios por transacción al importar (entre tanda y tanda pueden escribir otros)
+IMPORT_BATCH = 5000
+
+# Al importar, un costo nuevo que difiere del actual más de estas veces se marca como sospechoso
+# (p. ej. "1.234" leído como 1,234 en lugar de 1234)
+IMPORT_SUSPICIOUS_RATIO = 10
+
+# Redondeo escalonado de los aumentos: (precio menor a, múltiplo); el último tramo no tiene tope
+PRICE_ROUNDING = ((100, 5), (1000, 10), (10000, 100), (None, 1000))
+
+# Regla de margen de cada artículo (alias `a`): la más específica entre
+# categoría + proveedor, solo proveedor, solo categoría y la general
+RULE_MATCH_SQL = (
+    "(SELECT r.id FROM reglas_precios r "
+    "WHERE (r.id_categoria IS NULL OR r.id_categoria = a.id_categoria) "
+    "AND (r.id_proveedor IS NULL OR r.id_proveedor = a.id_proveedor) "
+    "ORDER BY (r.id_proveedor IS NOT NULL) * 2 + (r.id_categoria IS NOT NULL) DESC LIMIT 1)"
+)
+
+_fts_disponible = None
+
+
+def _insert_params(data):
+    """Parámetros de INSERT_SQL para un producto nuevo."""
+    return (
+        data.get("nombre"),
+        data.get("id_categoria"),
+        data.get("subcategoria"),
+        data.get("id_proveedor"),
+        data.get("precio_costo", 0.0),
+        data.get("precio_venta", 0.0),
+        data.get("cantidad", 0),
+        data.get("estado", "activo"),
+        data.get("codigo_barras"),
+    )
+
+
+def round_price(precio):
+    """Redondea hacia arriba al múltiplo de su tramo (ej.: 55985 -> 56000)."""
+    for limite, multiplo in PRICE_ROUNDING:
+        if limite is None or precio < limite:
+            return math.ceil(precio / multiplo) * multiplo
+
+
+def _ceil_multiple_sql(expr, multiplo):
+    """Expresión SQL: `expr` (REAL, >= 0) hacia arriba al múltiplo de `multiplo` (número o columna)."""
+    cociente = f"({expr}) / CAST({multiplo} AS REAL)"
+    # techo sin funciones matemáticas (no siempre están compiladas en SQLite)
+    return f"(CAST({cociente} AS INTEGER) + ({cociente} > CAST({cociente} AS INTEGER))) * {multiplo}"
+
+
+def _round_price_sql(expr):
+    """Misma regla que round_price, como expresión SQL sobre `expr` (REAL, siempre >= 0)."""
+    cases = []
+    for limite, multiplo in PRICE_ROUNDING:
+        techo = _ceil_multiple_sql(expr, multiplo)
+        cases.append(f"ELSE {techo}" if limite is None else f"WHEN ({expr}) < {limite} THEN {techo}")
+    return "CASE " + " ".join(cases) + " END"
+
+
+def _chunks(items, size=BULK_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _row_to_dict(r):
+    """Convierte una fila de articulos (en el orden de SELECT_COLUMNS) a dict."""
+    return {
+        "id": r[0],
+        "nombre": r[1],
+        "id_categoria": r[2],
+        "subcategoria": r[3],
+        "id_proveedor": r[4],
+        "precio_costo": r[5],
+        "precio_venta": r[6],
+        "cantidad": r[7],
+        "estado": r[8],
+        "codigo_barras": r[9],
+    }
 
 
 class ProductsModel:
+    # Columnas editables de `articulos`
+    FIELDS = ("nombre", "id_categoria", "subcategoria", "id_proveedor", "precio_costo", "precio_venta", "cantidad", "estado", "codigo_barras")
+
     def __init__(self):
         self.db_path = 'database/negocio.db'  # Guardar la ruta en lugar de la instancia
-        self._create_table_if_needed()
+        # caché compartida por todas las instancias (ver models/catalog_cache.py)
+        self._cache = get_catalog_cache(self.db_path)
 
     def _get_db_connection(self):
         """Crea una nueva conexión a la base de datos thread-safe."""
         return Database(self.db_path)
 
-    def _create_table_if_needed(self):
-        """Crea la tabla si no existe."""
-        try:
-            db = self._get_db_connection()
-            db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS articulos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    id_categoria INTEGER,
-                    subcategoria TEXT,
-                    id_proveedor INTEGER,
-                    precio_costo REAL NOT NULL,
-                    precio_venta REAL NOT NULL,
-                    cantidad INTEGER NOT NULL,
-                    estado TEXT NOT NULL DEFAULT 'activo',
-                    codigo_barras TEXT,
-                    FOREIGN KEY(id_categoria) REFERENCES categorias(id),
-                    FOREIGN KEY(id_proveedor) REFERENCES proveedores(id)
-                )
-                """
-            )
-            # crear índice en nombre para búsquedas case-insensitive más rápidas
-            try:
-                db.execute("CREATE INDEX IF NOT EXISTS idx_articulos_nombre ON articulos (nombre COLLATE NOCASE)")
-            except Exception:
-                pass
+    def _fts_available(self):
+        """Indica si existe el índice FTS5 `articulos_fts` (se consulta una vez por proceso)."""
+        global _fts_disponible
+        if _fts_disponible is None:
+            db = self._get_db_connection()
+            cur = db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articulos_fts'")
+            _fts_disponible = cur.fetchone() is not None
             db.close()
-        except Exception as e:
-            print(f"Error al crear tabla: {e}")
+        return _fts_disponible
+
+    def _uses_fts(self, query):
+        """True si la búsqueda va por el índice FTS5 (orden por relevancia)."""
+        terms = (query or "").split()
+        return bool(terms) and all(len(t) >= FTS_MIN_LENGTH for t in terms) and self._fts_available()
+
+    def _search_clauses(self, query):
+        """Arma FROM/condiciones/ORDER BY para una búsqueda. Devuelve (from_sql, conditions, params, order).
+
+        Con el índice FTS5 (trigram) cada palabra de 3+ letras se busca como
+        subcadena de nombre o código de barras y los resultados se ordenan por
+        relevancia. Si alguna palabra es más corta o no hay FTS5, se usa LIKE.
+        """
+        terms = (query or "").split()
+        if not terms:
+            return "articulos a", [], [], "a.id DESC"
+        if self._uses_fts(query):
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+            return (
+                "articulos_fts JOIN articulos a ON a.id = articulos_fts.rowid",
+                ["articulos_fts MATCH ?"],
+                [match],
+                "articulos_fts.rank, a.id DESC",
+            )
+        conditions = []
+        params = []
+        for t in terms:
+            conditions.append("(a.nombre LIKE ? COLLATE NOCASE OR a.codigo_barras LIKE ?)")
+            params.extend([f"%{t}%", f"%{t}%"])
+        return "articulos a", conditions, params, "a.id DESC"
+
+    @staticmethod
+    def normalize_query(query):
+        """Texto de búsqueda normalizado (minúsculas, un espacio entre palabras)."""
+        return " ".join((query or "").split()).lower()
+
+    @staticmethod
+    def matches_query(row, query):
+        """Indica, en memoria, si un producto coincide con la búsqueda.
+
+        Misma regla que search_products: cada palabra debe estar en el nombre
+        o en el código de barras, sin distinguir mayúsculas.
+        """
+        nombre = str(row.get("nombre") or "").lower()
+        codigo = str(row.get("codigo_barras") or "").lower()
+        return all(t in nombre or t in codigo for t in query.lower().split())
 
-    def search_products(self, query: str = None, limit: int = 50, offset: int = 0):
-        """Busca productos en la BD aplicando LIMIT/OFFSET. Devuelve (rows_list, total_count).
+    def page_key(self, row):
+        """Clave de paginación (keyset) de una fila devuelta por search_products."""
+        return (row["id"],)
+
+    def search_products(self, query: str = None, limit: int = 50, offset: int = 0,
+                        direction: str = None, key=None, fraction: float = None, with_total: bool = True,
+                        align_last: bool = False):
+        """Busca productos en la BD. Devuelve (rows_list, total_count).
 
         Si query es None o vacía, devuelve todos (paginados).
+        Sin `direction` pagina con LIMIT/OFFSET. Con `direction` (ver
+        models.pagination) pagina por id a partir de `key`, sin recorrer las
+        filas anteriores; las búsquedas por relevancia (FTS) no tienen un orden
+        por clave y siguen usando `offset`.
+        Con with_total=False no se cuenta y total_count es None. Con
+        align_last=True la página LAST es la última de la numeración por
+        `limit` (puede traer menos filas); para eso se cuenta siempre.
+        Las páginas ya leídas se sirven desde la caché del catálogo.
         """
+        cache_query = self.normalize_query(query)
+        seekable = direction is not None and not self._uses_fts(query)
+        if not seekable:
+            page_key = (cache_query, limit, "offset", offset)
+        elif direction == pagination.JUMP:
+            page_key = (cache_query, limit, direction, fraction)
+        elif direction == pagination.LAST and align_last:
+            page_key = (cache_query, limit, "last_aligned", None)
+        else:
+            page_key = (cache_query, limit, direction, tuple(key) if key is not None else None)
+        generation = self._cache.generation
+        cached_total = self._cache.get_total(cache_query) if with_total else None
+        if not with_total or cached_total is not None:
+            cached = self._cache.get_page(page_key)
+            if cached is not None:
+                return cached, cached_total
         try:
             db = self._get_db_connection()
-            params = []
-            where = ""
-            if query:
-                where = " WHERE nombre LIKE ? COLLATE NOCASE"
-                params.append(f"%{query}%")
+            from_sql, conditions, params, order = self._search_clauses(query)
+            where = " WHERE " + " AND ".join(conditions) if conditions else ""
 
             # total count
-            count_sql = f"SELECT COUNT(*) FROM articulos{where}"
-            cur = db.execute(count_sql, tuple(params) if params else ())
-            total = cur.fetchone()[0] if cur else 0
+            total = None
+            # la última página depende del total: se cuenta aunque no lo pidan
+            if with_total or (seekable and direction == pagination.LAST and align_last):
+                if from_sql.startswith("articulos_fts"):
+                    count_sql = f"SELECT COUNT(*) FROM articulos_fts{where}"
+                else:
+                    count_sql = f"SELECT COUNT(*) FROM {from_sql}{where}"
+                cur = db.execute(count_sql, tuple(params))
+                total = cur.fetchone()[0] if cur else 0
 
-            sql = (
-                "SELECT id, nombre, id_categoria, subcategoria, id_proveedor, precio_costo, precio_venta, cantidad, estado, codigo_barras "
-                f"FROM articulos{where} ORDER BY id DESC LIMIT ? OFFSET ?"
-            )
-            params_page = list(params) if params else []
-            params_page.extend([limit, offset])
-            cur2 = db.execute(sql, tuple(params_page))
-            rows = cur2.fetchall() if cur2 else []
-
-            result = []
-            for r in rows:
-                result.append({
-                    "id": r[0],
-                    "nombre": r[1],
-                    "id_categoria": r[2],
-                    "subcategoria": r[3],
-                    "id_proveedor": r[4],
-                    "precio_costo": r[5],
-                    "precio_venta": r[6],
-                    "cantidad": r[7],
-                    "estado": r[8],
-                    "codigo_barras": r[9],
-                })
+            if seekable:
+                if direction == pagination.JUMP:
+                    cur = db.execute(f"SELECT MIN(a.id), MAX(a.id) FROM {from_sql}{where}", tuple(params))
+                    low, high = cur.fetchone()
+                    if low is None:
+                        direction, key = pagination.FIRST, None
+                    else:
+                        direction = pagination.AT
+                        key = (pagination.interpolate_key(low, high, fraction or 0.0, descending=True),)
+                rows = pagination.fetch_page(
+                    db, f"SELECT {SELECT_COLUMNS} FROM {from_sql}", conditions, params,
+                    PAGE_KEYSET, limit, direction, key, total, align_last,
+                )
+            else:
+                sql = f"SELECT {SELECT_COLUMNS} FROM {from_sql}{where} ORDER BY {order} LIMIT ? OFFSET ?"
+                cur2 = db.execute(sql, tuple(params) + (limit, offset))
+                rows = cur2.fetchall() if cur2 else []
+
+            result = [_row_to_dict(r) for r in rows]
 
             db.close()
+            self._cache.put_page(page_key, result, generation)
+            if seekable and result:
+                # también por su primera fila: volver a esta página con AT la sirve desde memoria
+                self._cache.put_page((cache_query, limit, pagination.AT, self.page_key(result[0])), result, generation)
+            if total is not None:
+                self._cache.put_total(cache_query, total, generation)
             return result, total
         except Exception as e:
             print(f"Error en search_products: {e}")
@@ -94,80 +259,98 @@ class ProductsModel:
         """Devuelve la lista de productos.
 
         Si use_db es True intentará leer desde la base de datos.
-        Por defecto usa la base de datos.
+        Por defecto usa la base de datos (o la caché del catálogo si ya se leyó).
         """
+        cached = self._cache.get_page(("", "all"))
+        if cached is not None:
+            return cached
         try:
+            generation = self._cache.generation
             db = self._get_db_connection()
             cursor = db.execute(
-                "SELECT id, nombre, id_categoria, subcategoria, id_proveedor, precio_costo, precio_venta, cantidad, estado, codigo_barras FROM articulos ORDER BY id DESC"
+                f"SELECT {SELECT_COLUMNS} FROM articulos a ORDER BY a.id DESC"
             )
-            rows = cursor.fetchall()
-            result = []
-            for r in rows:
-                result.append({
-                    "id": r[0],
-                    "nombre": r[1],
-                    "id_categoria": r[2],
-                    "subcategoria": r[3],
-                    "id_proveedor": r[4],
-                    "precio_costo": r[5],
-                    "precio_venta": r[6],
-                    "cantidad": r[7],
-                    "estado": r[8],
-                    "codigo_barras": r[9],
-                })
+            result = [_row_to_dict(r) for r in cursor.fetchall()]
             db.close()
+            self._cache.put_page(("", "all"), result, generation)
             return result
         except Exception as e:
             print(f"Error en get_all: {e}")
             return []
 
     def get_by_id(self, product_id):
+        cached = self._cache.get_row(product_id)
+        if cached is not None:
+            return cached
         try:
+            generation = self._cache.generation
             db = self._get_db_connection()
             cursor = db.execute(
-                "SELECT id, nombre, id_categoria, subcategoria, id_proveedor, precio_costo, precio_venta, cantidad, estado, codigo_barras FROM articulos WHERE id = ?",
+                f"SELECT {SELECT_COLUMNS} FROM articulos a WHERE a.id = ?",
                 (product_id,)
             )
             r = cursor.fetchone()
             db.close()
             if not r:
                 return None
-            return {
-                "id": r[0],
-                "nombre": r[1],
-                "id_categoria": r[2],
-                "subcategoria": r[3],
-                "id_proveedor": r[4],
-                "precio_costo": r[5],
-                "precio_venta": r[6],
-                "cantidad": r[7],
-                "estado": r[8],
-                "codigo_barras": r[9],
-            }
+            product = _row_to_dict(r)
+            self._cache.put_rows([product], generation)
+            return product
         except Exception as e:
             print(f"Error en get_by_id: {e}")
             return None
 
-    def create_product(self, data: dict):
-        """Inserta un nuevo producto en la base de datos. Devuelve el id insertado o None."""
+    def get_by_barcode(self, codigo_barras):
+        """Busca un producto por código de barras exacto. Devuelve dict o None.
+
+        Primero consulta el índice en memoria (models.barcode_index); si no
+        está, lo lee por el índice único de la base y lo agrega a memoria.
+        """
+        index = get_barcode_index(self.db_path)
+        codigo = index.normalize(codigo_barras)
+        if not codigo:
+            return None
+        row = index.get(codigo)
+        if row is not None:
+            return _row_to_dict(row)
         try:
+            generation = index.generation
             db = self._get_db_connection()
             cursor = db.execute(
-                "INSERT INTO articulos (nombre, id_categoria, subcategoria, id_proveedor, precio_costo, precio_venta, cantidad, estado, codigo_barras) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    data.get("nombre"),
-                    data.get("id_categoria"),
-                    data.get("subcategoria"),
-                    data.get("id_proveedor"),
-                    data.get("precio_costo", 0.0),
-                    data.get("precio_venta", 0.0),
-                    data.get("cantidad", 0),
-                    data.get("estado", "activo"),
-                    data.get("codigo_barras"),
-                ),
+                # la condición <> '' repite la del índice parcial para que SQLite lo use
+                f"SELECT {SELECT_COLUMNS} FROM articulos a WHERE a.codigo_barras = ? AND a.codigo_barras <> ''",
+                (codigo,)
             )
+            row = cursor.fetchone()
+            db.close()
+            if not row:
+                return None
+            index.put(row, generation)
+            return _row_to_dict(row)
+        except Exception as e:
+            print(f"Error en get_by_barcode: {e}")
+            return None
+
+    def _invalidate(self, product_ids, fields=None, added_or_removed=False):
+        """Quita de las cachés (catálogo y códigos de barras) los productos modificados.
+
+        `fields` son las columnas cambiadas (None si no se sabe); con
+        `added_or_removed` se descartan también las páginas, porque el orden se corre.
+        """
+        if added_or_removed:
+            self._cache.invalidate_pages(product_ids)
+        else:
+            self._cache.invalidate_rows(product_ids, fields)
+        if product_ids:
+            get_barcode_index(self.db_path).invalidate(product_ids)
+
+    def create_product(self, data: dict):
+        """Inserta un nuevo producto en la base de datos. Devuelve el id insertado o None."""
+        try:
+            db = self._get_db_connection()
+            cursor = db.execute(INSERT_SQL, _insert_params(data))
             product_id = cursor.lastrowid
+            self._invalidate([], added_or_removed=True)
             db.close()
             return product_id
         except Exception as e:
@@ -181,7 +364,7 @@ class ProductsModel:
             # construir SET dinámico
             fields = []
             values = []
-            for key in ("nombre", "id_categoria", "subcategoria", "id_proveedor", "precio_costo", "precio_venta", "cantidad", "estado", "codigo_barras"):
+            for key in self.FIELDS:
                 if key in data:
                     fields.append(f"{key} = ?")
                     values.append(data[key])
@@ -194,6 +377,7 @@ class ProductsModel:
             sql = f"UPDATE articulos SET {', '.join(fields)} WHERE id = ?"
             cursor = db.execute(sql, tuple(values))
             result = cursor.rowcount > 0
+            self._invalidate([product_id], [key for key in self.FIELDS if key in data])
             db.close()
             return result
         except Exception as e:
@@ -206,12 +390,697 @@ class ProductsModel:
             db = self._get_db_connection()
             cursor = db.execute("DELETE FROM articulos WHERE id = ?", (product_id,))
             result = cursor.rowcount > 0
+            self._invalidate([product_id], added_or_removed=True)
             db.close()
             return result
         except Exception as e:
             print(f"Error en delete_product: {e}")
             return False
 
+    def create_products(self, items):
+        """Inserta varios productos en una sola transacción (executemany).
+
+        Devuelve la cantidad de filas insertadas o 0 si hubo un error.
+        """
+        if not items:
+            return 0
+        try:
+            db = self._get_db_connection()
+            with db.transaction():
+                cursor = db.executemany(INSERT_SQL, [_insert_params(data) for data in items])
+                inserted = cursor.rowcount
+            self._invalidate([], added_or_removed=True)
+            db.close()
+            return inserted
+        except Exception as e:
+            print(f"Error en create_products: {e}")
+            return 0
+
+    def _update_groups(self, updates):
+        """Agrupa (product_id, data) por columnas cambiadas: {columnas: [parámetros]}."""
+        groups = {}
+        for product_id, data in updates:
+            keys = tuple(key for key in self.FIELDS if key in data)
+            if keys:
+                groups.setdefault(keys, []).append(tuple(data[key] for key in keys) + (product_id,))
+        return groups
+
+    def update_products(self, updates):
+        """Actualiza varios productos en una sola transacción.
+
+        updates: lista de tuplas (product_id, data). Las filas que modifican las
+        mismas columnas se agrupan en un único executemany.
+        Devuelve la cantidad de filas actualizadas.
+        """
+        groups = self._update_groups(updates)
+        if not groups:
+            return 0
+        try:
+            db = self._get_db_connection()
+            updated = 0
+            with db.transaction():
+                for keys, rows in groups.items():
+                    sql = f"UPDATE articulos SET {', '.join(f'{key} = ?' for key in keys)} WHERE id = ?"
+                    cursor = db.executemany(sql, rows)
+                    updated += cursor.rowcount
+            self._invalidate([product_id for product_id, _ in updates], {key for keys in groups for key in keys})
+            db.close()
+            return updated
+        except Exception as e:
+            print(f"Error en update_products: {e}")
+            return 0
+
+    def apply_changes(self, updates=(), creates=(), deletes=(), progress=None):
+        """Aplica un cambio masivo de la grilla (pegar, borrar, insertar filas) en una sola transacción.
+
+        updates: (product_id, data); creates: dicts de productos nuevos;
+        deletes: ids. Todo va con executemany de a BULK_CHUNK filas y después
+        de cada tanda se llama `progress(filas_hechas)` (en el hilo que ejecuta).
+        Si algo falla no se aplica nada y devuelve None; si no, un dict con
+        "updated", "created_ids" (en el orden de `creates`), "deleted" y
+        "repriced" ({id: precio_venta} de los que cambiaron de costo y tienen
+        regla de margen, ver apply_price_rules).
+        """
+        updates, creates, deletes = list(updates), list(creates), list(deletes)
+        groups = self._update_groups(updates)
+        result = {"updated": 0, "created_ids": [], "deleted": 0, "repriced": {}}
+        done = 0
+        try:
+            db = self._get_db_connection()
+            with db.transaction():
+                for chunk in _chunks(deletes):
+                    cursor = db.executemany("DELETE FROM articulos WHERE id = ?", [(pid,) for pid in chunk])
+                    result["deleted"] += cursor.rowcount
+                    done += len(chunk)
+                    if progress:
+                        progress(done)
+                for keys, rows in groups.items():
+                    sql = f"UPDATE articulos SET {', '.join(f'{key} = ?' for key in keys)} WHERE id = ?"
+                    for chunk in _chunks(rows):
+                        cursor = db.executemany(sql, chunk)
+                        result["updated"] += cursor.rowcount
+                        done += len(chunk)
+                        if progress:
+                            progress(done)
+                for chunk in _chunks(creates):
+                    db.executemany(INSERT_SQL, [_insert_params(data) for data in chunk])
+                    # misma transacción y tabla AUTOINCREMENT: los ids de la tanda son consecutivos
+                    last_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    result["created_ids"].extend(range(last_id - len(chunk) + 1, last_id + 1))
+                    done += len(chunk)
+                    if progress:
+                        progress(done)
+                result["repriced"] = self._reprice_from_rules(
+                    db, [pid for pid, data in updates if "precio_costo" in data and "precio_venta" not in data]
+                )
+            changed_ids = deletes + [product_id for product_id, _ in updates]
+            fields = {key for keys in groups for key in keys}
+            if result["repriced"]:
+                fields.add("precio_venta")
+            self._invalidate(changed_ids, fields, added_or_removed=bool(creates or deletes))
+            db.close()
+            return result
+        except Exception as e:
+            print(f"Error en apply_changes: {e}")
+            return None
+
+    def _reprice_scope(self, query=None, category_id=None, supplier_id=None, ids=None, exclude_ids=(),
+                       numeric_price=False):
+        """FROM y WHERE (alias `a`) de los artículos alcanzados por un aumento. Devuelve (from_sql, where, params).
+
+        Con numeric_price=True quedan afuera los precio_venta que no son números
+        (texto como "Bonificado" o NULL): un aumento los dejaría en 0.
+        """
+        from_sql, conditions, params, _ = self._search_clauses(query)
+        conditions, params = list(conditions), list(params)
+        if numeric_price:
+            conditions.append("typeof(a.precio_venta) IN ('integer', 'real')")
+        if category_id is not None:
+            # articulos.id_categoria es TEXT ('005') y categorias.id INTEGER (5): comparar como número
+            conditions.append("CAST(a.id_categoria AS INTEGER) = CAST(? AS INTEGER)")
+            params.append(category_id)
+        if supplier_id is not None:
+            conditions.append("a.id_proveedor = ?")
+            params.append(supplier_id)
+        if ids is not None:
+            conditions.append("a.id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(ids)))
+        if exclude_ids:
+            conditions.append("a.id NOT IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(exclude_ids)))
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return from_sql, where, params
+
+    def reprice_products(self, percentage, query=None, category_id=None, supplier_id=None,
+                         ids=None, exclude_ids=(), rounding=True, dry_run=False, description=None):
+        """Aumenta precio_venta un `percentage` % en una sola transacción.
+
+        Los filtros (texto como en search_products, categoría, proveedor, ids a
+        incluir o excluir) se resuelven en SQL, igual que el redondeo escalonado
+        de round_price. El aumento queda registrado como un lote en
+        lotes_precios/historial_precios (un INSERT…SELECT) y los precios se
+        copian de ahí con un solo UPDATE, así que se puede revertir con
+        revert_price_batch. Con dry_run=True solo calcula el resumen.
+        Devuelve {"count", "before", "after", "batch_id"} (cantidad y sumas de
+        precios) o None si hubo un error.
+        """
+        percentage = float(percentage)
+        if not math.isfinite(percentage):
+            return None
+        # es un float: se puede escribir literal en la expresión y usarla varias veces
+        nuevo = f"CAST({{col}} AS REAL) * {1 + percentage / 100!r}"
+        from_sql, where, params = self._reprice_scope(
+            query, category_id, supplier_id, ids, exclude_ids, numeric_price=True
+        )
+
+        def precio_nuevo(col):
+            expr = nuevo.format(col=col)
+            return _round_price_sql(expr) if rounding else expr
+
+        try:
+            db = self._get_db_connection()
+            if dry_run:
+                # solo lectura: fuera de una transacción va por la conexión de lectura, sin
+                # tomar el lock de escritura, y el ejecutor de fondo la puede interrumpir
+                count, before, after = db.execute(
+                    f"SELECT COUNT(*), COALESCE(SUM(a.precio_venta), 0), COALESCE(SUM({precio_nuevo('a.precio_venta')}), 0) "
+                    f"FROM {from_sql}{where}",
+                    tuple(params),
+                ).fetchone()
+                db.close()
+                return {"count": count, "before": before, "after": after, "batch_id": None}
+            changed = []
+            batch_id = None
+            with db.transaction():
+                batch_id = db.execute(
+                    "INSERT INTO lotes_precios (descripcion, porcentaje) VALUES (?, ?)",
+                    (description, percentage),
+                ).lastrowid
+                db.execute(
+                    "INSERT INTO historial_precios (lote_id, articulo_id, precio_anterior, precio_nuevo) "
+                    f"SELECT ?, a.id, a.precio_venta, {precio_nuevo('a.precio_venta')} FROM {from_sql}{where}",
+                    (batch_id, *params),
+                )
+                changed, before, after = self._apply_batch(db, batch_id)
+                if not changed:
+                    batch_id = None
+            if changed:
+                self._invalidate(changed, ["precio_venta"])
+            db.close()
+            return {"count": len(changed), "before": before, "after": after, "batch_id": batch_id}
+        except Exception as e:
+            print(f"Error en reprice_products: {e}")
+            return None
+
+    def _apply_batch(self, db, batch_id):
+        """Copia a articulos los precios de un lote ya cargado en historial_precios (un solo UPDATE).
+
+        Se llama dentro de la transacción que creó el lote. Devuelve (ids
+        cambiados, suma de precios anteriores, suma de precios nuevos); un lote
+        que no alcanzó a ningún artículo se borra.
+        """
+        count, before, after = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(precio_anterior), 0), COALESCE(SUM(precio_nuevo), 0) "
+            "FROM historial_precios WHERE lote_id = ?",
+            (batch_id,),
+        ).fetchone()
+        if not count:
+            db.execute("DELETE FROM lotes_precios WHERE id = ?", (batch_id,))
+            return [], before, after
+        changed = db.execute(
+            "UPDATE articulos SET precio_venta = h.precio_nuevo FROM historial_precios h "
+            "WHERE h.lote_id = ? AND h.articulo_id = articulos.id RETURNING articulos.id",
+            (batch_id,),
+        ).fetchall()
+        db.execute("UPDATE lotes_precios SET cantidad = ? WHERE id = ?", (len(changed), batch_id))
+        return [r[0] for r in changed], before, after
+
+    def revert_price_batch(self, batch_id):
+        """Deshace un aumento: cada artículo del lote vuelve a su precio anterior con un solo UPDATE.
+
+        Los artículos cuyo precio se cambió después del aumento quedan como están.
+        Devuelve {"reverted", "skipped"} o None si el lote no existe, ya se revirtió o hubo un error.
+        """
+        try:
+            db = self._get_db_connection()
+            reverted = []
+            with db.transaction():
+                lote = db.execute("SELECT cantidad, revertido_en FROM lotes_precios WHERE id = ?", (batch_id,)).fetchone()
+                pendiente = lote is not None and lote[1] is None
+                if pendiente:
+                    reverted = db.execute(
+                        "UPDATE articulos SET precio_venta = h.precio_anterior FROM historial_precios h "
+                        "WHERE h.lote_id = ? AND h.articulo_id = articulos.id AND articulos.precio_venta = h.precio_nuevo "
+                        "RETURNING articulos.id",
+                        (batch_id,),
+                    ).fetchall()
+                    db.execute("UPDATE lotes_precios SET revertido_en = datetime('now', 'localtime') WHERE id = ?", (batch_id,))
+            if reverted:
+                self._invalidate([r[0] for r in reverted], ["precio_venta"])
+            db.close()
+            if not pendiente:
+                return None
+            return {"reverted": len(reverted), "skipped": lote[0] - len(reverted)}
+        except Exception as e:
+            print(f"Error en revert_price_batch: {e}")
+            return None
+
+    def list_price_batches(self, limit=20):
+        """Últimos aumentos masivos, del más nuevo al más viejo."""
+        try:
+            db = self._get_db_connection()
+            rows = db.execute(
+                "SELECT id, fecha, descripcion, porcentaje, cantidad, revertido_en FROM lotes_precios ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+            db.close()
+            return [
+                {"id": r[0], "fecha": r[1], "descripcion": r[2], "porcentaje": r[3], "cantidad": r[4], "revertido_en": r[5]}
+                for r in rows
+            ]
+        except Exception as e:
+            print(f"Error en list_price_batches: {e}")
+            return []
+
+    def get_price_history(self, product_id, limit=50):
+        """Cambios de precio de un artículo por aumentos masivos, del más nuevo al más viejo."""
+        try:
+            db = self._get_db_connection()
+            rows = db.execute(
+                "SELECT l.id, l.fecha, l.descripcion, l.porcentaje, h.precio_anterior, h.precio_nuevo, l.revertido_en "
+                "FROM historial_precios h JOIN lotes_precios l ON l.id = h.lote_id "
+                "WHERE h.articulo_id = ? ORDER BY h.lote_id DESC LIMIT ?",
+                (product_id, limit),
+            ).fetchall()
+            db.close()
+            return [
+                {
+                    "lote_id": r[0], "fecha": r[1], "descripcion": r[2], "porcentaje": r[3],
+                    "precio_anterior": r[4], "precio_nuevo": r[5], "revertido_en": r[6],
+                }
+                for r in rows
+            ]
+        except Exception as e:
+            print(f"Error en get_price_history: {e}")
+            return []
+
+    def list_price_rules(self):
+        """Reglas de margen con los nombres de su categoría y proveedor (None = cualquiera)."""
+        try:
+            db = self._get_db_connection()
+            rows = db.execute(
+                "SELECT r.id, r.id_categoria, c.categoria, r.id_proveedor, p.nombre, r.margen, r.redondeo "
+                "FROM reglas_precios r "
+                "LEFT JOIN categorias c ON c.id = r.id_categoria "
+                "LEFT JOIN proveedores p ON p.id = r.id_proveedor "
+                "ORDER BY r.id_categoria IS NOT NULL, c.categoria COLLATE NOCASE, r.id_proveedor IS NOT NULL, p.nombre COLLATE NOCASE"
+            ).fetchall()
+            db.close()
+            return [
+                {
+                    "id": r[0], "id_categoria": r[1], "categoria": r[2], "id_proveedor": r[3],
+                    "proveedor": r[4], "margen": r[5], "redondeo": r[6],
+                }
+                for r in rows
+            ]
+        except Exception as e:
+            print(f"Error en list_price_rules: {e}")
+            return []
+
+    def save_price_rule(self, category_id, supplier_id, margin, rounding=None):
+        """Crea o reemplaza la regla de una categoría/proveedor (None = cualquiera).
+
+        `margin` es el % sobre precio_costo; `rounding` None usa el redondeo
+        escalonado, 0 no redondea y N redondea hacia arriba al múltiplo de N.
+        Devuelve el id de la regla o None. No cambia precios: ver apply_price_rules.
+        """
+        margin = float(margin)
+        if not math.isfinite(margin) or margin <= -100:
+            return None
+        try:
+            db = self._get_db_connection()
+            with db.transaction():
+                row = db.execute(
+                    "UPDATE reglas_precios SET margen = ?, redondeo = ? "
+                    "WHERE id_categoria IS ? AND id_proveedor IS ? RETURNING id",
+                    (margin, rounding, category_id, supplier_id),
+                ).fetchone()
+                if row is None:
+                    rule_id = db.execute(
+                        "INSERT INTO reglas_precios (id_categoria, id_proveedor, margen, redondeo) VALUES (?, ?, ?, ?)",
+                        (category_id, supplier_id, margin, rounding),
+                    ).lastrowid
+                else:
+                    rule_id = row[0]
+            db.close()
+            return rule_id
+        except Exception as e:
+            print(f"Error en save_price_rule: {e}")
+            return None
+
+    def delete_price_rule(self, rule_id):
+        """Borra una regla de margen. Los precios ya calculados no cambian."""
+        try:
+            db = self._get_db_connection()
+            cursor = db.execute("DELETE FROM reglas_precios WHERE id = ?", (rule_id,))
+            result = cursor.rowcount > 0
+            db.close()
+            return result
+        except Exception as e:
+            print(f"Error en delete_price_rule: {e}")
+            return False
+
+    def _rule_prices_sql(self, from_sql, where):
+        """SELECT (id, nombre, regla_id, anterior, nuevo) del precio según su regla de cada artículo alcanzado.
+
+        Los artículos sin costo numérico o sin ninguna regla que les corresponda no aparecen.
+        """
+        bruto = "CAST(a.precio_costo AS REAL) * (1 + r.margen / 100.0)"
+        nuevo = (
+            f"CASE WHEN r.redondeo IS NULL THEN {_round_price_sql(bruto)} "
+            f"WHEN r.redondeo <= 0 THEN {bruto} "
+            f"ELSE {_ceil_multiple_sql(bruto, 'r.redondeo')} END"
+        )
+        # hay costos cargados como texto ("Bonificado"): esos no se tocan
+        where = (where + " AND " if where else " WHERE ") + "typeof(a.precio_costo) IN ('integer', 'real') AND a.precio_costo > 0"
+        return (
+            f"SELECT a.id AS id, a.nombre AS nombre, r.id AS regla_id, a.precio_venta AS anterior, {nuevo} AS nuevo "
+            f"FROM {from_sql} JOIN reglas_precios r ON r.id = {RULE_MATCH_SQL}{where}"
+        )
+
+    def apply_price_rules(self, ids=None, category_id=None, supplier_id=None, dry_run=False,
+                          description="Reglas de precios", sample=50):
+        """Recalcula precio_venta desde precio_costo con las reglas de margen, en una sola transacción.
+
+        Sin filtros recorre todo el catálogo; con `category_id`/`supplier_id`
+        (p. ej. el alcance de una regla recién cambiada) o `ids`, solo esos
+        artículos. Solo se tocan los precios que cambian y quedan registrados
+        como un lote (se puede revertir con revert_price_batch). Con
+        dry_run=True no escribe nada y devuelve la diferencia.
+        Devuelve {"count", "matched", "before", "after", "by_rule", "sample",
+        "batch_id"}: precios que cambian, artículos con regla, sumas de los
+        precios que cambian, lo mismo por regla y hasta `sample` cambios de
+        ejemplo; o None si hubo un error.
+        """
+        from_sql, where, params = self._reprice_scope(category_id=category_id, supplier_id=supplier_id, ids=ids)
+        objetivo = self._rule_prices_sql(from_sql, where)
+        try:
+            db = self._get_db_connection()
+            changed = []
+            batch_id = None
+            ejemplos = []
+
+            def por_regla():
+                rows = db.execute(
+                    f"WITH objetivo AS ({objetivo}) "
+                    "SELECT regla_id, COUNT(*), SUM(nuevo IS NOT anterior), "
+                    "COALESCE(SUM(CASE WHEN nuevo IS NOT anterior THEN anterior END), 0), "
+                    "COALESCE(SUM(CASE WHEN nuevo IS NOT anterior THEN nuevo END), 0) "
+                    "FROM objetivo GROUP BY regla_id",
+                    tuple(params),
+                ).fetchall()
+                return {r[0]: {"matched": r[1], "count": r[2], "before": r[3], "after": r[4]} for r in rows}
+
+            if dry_run:
+                # solo lectura: fuera de una transacción va por la conexión de lectura, sin
+                # tomar el lock de escritura, y el ejecutor de fondo la puede interrumpir
+                by_rule = por_regla()
+                if sample:
+                    ejemplos = db.execute(
+                        f"WITH objetivo AS ({objetivo}) "
+                        "SELECT id, nombre, anterior, nuevo FROM objetivo WHERE nuevo IS NOT anterior LIMIT ?",
+                        (*params, sample),
+                    ).fetchall()
+            else:
+                with db.transaction():
+                    by_rule = por_regla()
+                    if any(r["count"] for r in by_rule.values()):
+                        batch_id = db.execute(
+                            "INSERT INTO lotes_precios (descripcion, porcentaje) VALUES (?, NULL)",
+                            (description,),
+                        ).lastrowid
+                        db.execute(
+                            "INSERT INTO historial_precios (lote_id, articulo_id, precio_anterior, precio_nuevo) "
+                            f"SELECT ?, id, anterior, nuevo FROM ({objetivo}) WHERE nuevo IS NOT anterior",
+                            (batch_id, *params),
+                        )
+                        changed, _, _ = self._apply_batch(db, batch_id)
+                        if not changed:
+                            batch_id = None
+            if changed:
+                self._invalidate(changed, ["precio_venta"])
+            db.close()
+            return {
+                "count": sum(r["count"] for r in by_rule.values()),
+                "matched": sum(r["matched"] for r in by_rule.values()),
+                "before": sum(r["before"] for r in by_rule.values()),
+                "after": sum(r["after"] for r in by_rule.values()),
+                "by_rule": by_rule,
+                "sample": [
+                    {"id": r[0], "nombre": r[1], "precio_anterior": r[2], "precio_nuevo": r[3]} for r in ejemplos
+                ],
+                "batch_id": batch_id,
+            }
+        except Exception as e:
+            print(f"Error en apply_price_rules: {e}")
+            return None
+
+    def _reprice_from_rules(self, db, product_ids):
+        """Aplica las reglas de margen a productos cuyo costo acaba de cambiar (sin registrar lote).
+
+        Se llama dentro de la transacción que cambió el costo. Devuelve
+        {product_id: precio_venta nuevo} de los que cambiaron.
+        """
+        if not product_ids:
+            return {}
+        from_sql, where, params = self._reprice_scope(ids=product_ids)
+        rows = db.execute(
+            f"UPDATE articulos SET precio_venta = o.nuevo FROM ({self._rule_prices_sql(from_sql, where)}) o "
+            "WHERE o.id = articulos.id AND o.nuevo IS NOT o.anterior RETURNING articulos.id, articulos.precio_venta",
+            tuple(params),
+        ).fetchall()
+        return dict(rows)
+
+    def _barcode_unique(self, db):
+        """True si idx_articulos_codigo_barras es único (la migración 3 lo deja común si había repetidos)."""
+        row = db.execute(
+            "SELECT \"unique\" FROM pragma_index_list('articulos') WHERE name = 'idx_articulos_codigo_barras'"
+        ).fetchone()
+        return bool(row and row[0])
+
+    def import_price_list(self, items, supplier_id=None, dry_run=False, progress=None):
+        """Importa una lista de precios de proveedor, por código de barras.
+
+        items: dicts con codigo_barras, nombre, precio_costo y precio_venta
+        (ver models/price_list.PriceListReader); se recorren una sola vez y se
+        copian de a BULK_CHUNK a una tabla temporal (si un código se repite
+        vale la última línea). Desde ahí, de a IMPORT_BATCH filas por
+        transacción, un INSERT … ON CONFLICT agrega los códigos nuevos y
+        actualiza el costo de los existentes. Si la línea trae precio de venta
+        también se actualiza; si no, el precio sale de las reglas de margen
+        (ver apply_price_rules). Con dry_run=True solo arma el informe.
+        `progress(etapa, hechas, total)` se llama con etapa "lectura" (total
+        None) y "escritura". Si falla a mitad de camino quedan aplicadas las
+        tandas anteriores: importar de nuevo la misma lista completa el resto.
+        Devuelve {"lines", "new", "changed", "unchanged", "sample", "suspicious",
+        "suspicious_sample", "written"} o None si hubo un error; "suspicious"
+        cuenta los costos que cambian más de IMPORT_SUSPICIOUS_RATIO veces.
+        """
+        # las comparaciones por código llevan `<> ''` para poder usar el índice parcial idx_articulos_codigo_barras
+        try:
+            db = self._get_db_connection()
+            # la tabla temporal es de la conexión de escritura: todo va en transacciones
+            with db.transaction():
+                db.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS importacion_precios ("
+                    "codigo_barras TEXT NOT NULL UNIQUE, nombre TEXT, precio_costo REAL, precio_venta REAL)"
+                )
+                db.execute("DELETE FROM importacion_precios")
+            staged = 0
+            batch = []
+            stage_sql = (
+                "INSERT INTO importacion_precios (codigo_barras, nombre, precio_costo, precio_venta) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (codigo_barras) DO UPDATE SET nombre = excluded.nombre, "
+                "precio_costo = excluded.precio_costo, precio_venta = excluded.precio_venta"
+            )
+            for item in items:
+                batch.append((item["codigo_barras"], item.get("nombre"), item["precio_costo"], item.get("precio_venta")))
+                if len(batch) >= BULK_CHUNK:
+                    with db.transaction():
+                        db.executemany(stage_sql, batch)
+                    staged += len(batch)
+                    batch = []
+                    if progress:
+                        progress("lectura", staged, None)
+            if batch:
+                with db.transaction():
+                    db.executemany(stage_sql, batch)
+                staged += len(batch)
+
+            with db.transaction():
+                # con códigos repetidos en articulos (índice no único) cada línea cuenta una vez
+                new, changed, unchanged = db.execute(
+                    "SELECT COALESCE(SUM(estado = 0), 0), COALESCE(SUM(estado = 1), 0), COALESCE(SUM(estado = 2), 0) FROM ("
+                    "SELECT CASE WHEN NOT EXISTS (SELECT 1 FROM articulos a WHERE a.codigo_barras = s.codigo_barras AND a.codigo_barras <> '') THEN 0 "
+                    "WHEN EXISTS (SELECT 1 FROM articulos a WHERE a.codigo_barras = s.codigo_barras AND a.codigo_barras <> '' "
+                    "AND (a.precio_costo IS NOT s.precio_costo OR (s.precio_venta IS NOT NULL AND a.precio_venta IS NOT s.precio_venta))) THEN 1 "
+                    "ELSE 2 END AS estado FROM importacion_precios s)"
+                ).fetchone()
+                sample = db.execute(
+                    "SELECT s.codigo_barras, a.nombre, a.precio_costo, s.precio_costo, a.precio_venta, s.precio_venta "
+                    "FROM importacion_precios s JOIN articulos a ON a.codigo_barras = s.codigo_barras AND a.codigo_barras <> '' "
+                    "WHERE a.precio_costo IS NOT s.precio_costo OR (s.precio_venta IS NOT NULL AND a.precio_venta IS NOT s.precio_venta) "
+                    "LIMIT 50"
+                ).fetchall()
+                sospechosos_sql = (
+                    "FROM importacion_precios s JOIN articulos a ON a.codigo_barras = s.codigo_barras AND a.codigo_barras <> '' "
+                    "WHERE a.precio_costo > 0 AND s.precio_costo > 0 "
+                    "AND (s.precio_costo > a.precio_costo * ? OR s.precio_costo * ? < a.precio_costo)"
+                )
+                ratio = (IMPORT_SUSPICIOUS_RATIO, IMPORT_SUSPICIOUS_RATIO)
+                suspicious = db.execute(f"SELECT COUNT(DISTINCT s.codigo_barras) {sospechosos_sql}", ratio).fetchone()[0]
+                suspicious_sample = db.execute(
+                    f"SELECT s.codigo_barras, a.nombre, a.precio_costo, s.precio_costo, a.precio_venta, s.precio_venta {sospechosos_sql} LIMIT 50",
+                    ratio,
+                ).fetchall()
+                last_rowid = db.execute("SELECT COALESCE(MAX(rowid), 0) FROM importacion_precios").fetchone()[0]
+                unique = self._barcode_unique(db)
+            def cambios(rows):
+                return [
+                    {
+                        "codigo_barras": r[0], "nombre": r[1], "costo_anterior": r[2], "costo_nuevo": r[3],
+                        "venta_anterior": r[4], "venta_nueva": r[5],
+                    }
+                    for r in rows
+                ]
+
+            report = {
+                "lines": staged, "new": new, "changed": changed, "unchanged": unchanged, "written": 0,
+                "sample": cambios(sample),
+                "suspicious": suspicious, "suspicious_sample": cambios(suspicious_sample),
+            }
+            if not dry_run and (new or changed):
+                report["written"] = self._upsert_price_list(db, supplier_id, last_rowid, unique, new, progress)
+            with db.transaction():
+                db.execute("DROP TABLE IF EXISTS importacion_precios")
+            db.close()
+            return report
+        except Exception as e:
+            print(f"Error en import_price_list: {e}")
+            return None
+
+    def _upsert_price_list(self, db, supplier_id, last_rowid, unique, new, progress=None):
+        """Pasa importacion_precios a articulos de a IMPORT_BATCH filas. Devuelve las filas escritas."""
+        rango = "s.rowid > ? AND s.rowid <= ?"
+        cambio = "articulos.precio_costo IS NOT excluded.precio_costo"
+        nuevos = (
+            "SELECT COALESCE(s.nombre, s.codigo_barras), ?, s.precio_costo, COALESCE(s.precio_venta, 0), 0, 'activo', s.codigo_barras "
+            f"FROM importacion_precios s WHERE {rango}"
+        )
+        columnas = "INSERT INTO articulos (nombre, id_proveedor, precio_costo, precio_venta, cantidad, estado, codigo_barras) "
+        written = 0
+        for start in range(0, last_rowid, IMPORT_BATCH):
+            params = (supplier_id, start, start + IMPORT_BATCH)
+            with db.transaction():
+                if unique:
+                    touched = db.execute(
+                        f"{columnas}{nuevos} ON CONFLICT (codigo_barras) WHERE codigo_barras IS NOT NULL AND codigo_barras <> '' "
+                        f"DO UPDATE SET precio_costo = excluded.precio_costo WHERE {cambio} RETURNING id",
+                        params,
+                    ).fetchall()
+                else:
+                    touched = db.execute(
+                        "UPDATE articulos SET precio_costo = s.precio_costo FROM importacion_precios s "
+                        f"WHERE {rango} AND articulos.codigo_barras = s.codigo_barras AND articulos.codigo_barras <> '' "
+                        "AND articulos.precio_costo IS NOT s.precio_costo RETURNING articulos.id",
+                        params[1:],
+                    ).fetchall()
+                    touched += db.execute(
+                        f"{columnas}{nuevos} AND NOT EXISTS (SELECT 1 FROM articulos a WHERE a.codigo_barras = s.codigo_barras AND a.codigo_barras <> '') "
+                        "RETURNING id",
+                        params,
+                    ).fetchall()
+                # precio de venta de la lista para los que ya existían
+                touched += db.execute(
+                    "UPDATE articulos SET precio_venta = s.precio_venta FROM importacion_precios s "
+                    f"WHERE {rango} AND s.precio_venta IS NOT NULL AND articulos.codigo_barras = s.codigo_barras AND articulos.codigo_barras <> '' "
+                    "AND articulos.precio_venta IS NOT s.precio_venta RETURNING articulos.id",
+                    params[1:],
+                ).fetchall()
+                touched = {r[0] for r in touched}
+                # sin precio de venta en la lista: lo calculan las reglas de margen
+                sin_venta = db.execute(
+                    "SELECT a.id FROM importacion_precios s JOIN articulos a ON a.codigo_barras = s.codigo_barras AND a.codigo_barras <> '' "
+                    f"WHERE {rango} AND s.precio_venta IS NULL",
+                    params[1:],
+                ).fetchall()
+                self._reprice_from_rules(db, [r[0] for r in sin_venta if r[0] in touched])
+            written += len(touched)
+            self._invalidate(list(touched), ["precio_costo", "precio_venta"])
+            if progress:
+                progress("escritura", min(start + IMPORT_BATCH, last_rowid), last_rowid)
+        if new:
+            self._invalidate([], added_or_removed=True)
+        return written
+
+    def save_edits(self, edits):
+        """Guarda ediciones por columna de varios productos en una sola transacción.
+
+        edits: dict product_id -> {columna: valor}. Cada producto va en su propio
+        SAVEPOINT, así que si uno falla (código de barras repetido, producto
+        borrado) se descarta solo ese. Devuelve dict product_id -> error de los
+        que no se guardaron (vacío si se guardaron todos).
+        """
+        failed = {}
+        saved = []
+        fields = set()
+        try:
+            db = self._get_db_connection()
+            with db.transaction():
+                for product_id, data in edits.items():
+                    keys = [key for key in self.FIELDS if key in data]
+                    if not keys:
+                        continue
+                    sql = f"UPDATE articulos SET {', '.join(f'{key} = ?' for key in keys)} WHERE id = ?"
+                    try:
+                        with db.transaction():
+                            cursor = db.execute(sql, tuple(data[key] for key in keys) + (product_id,))
+                    except sqlite3.DatabaseError as e:
+                        failed[product_id] = str(e)
+                        continue
+                    if cursor.rowcount == 0:
+                        failed[product_id] = "El producto ya no existe"
+                        continue
+                    saved.append(product_id)
+                    fields.update(keys)
+                # costo cambiado a mano (sin tocar el precio): el precio sale de su regla de margen
+                costos = [pid for pid in saved if "precio_costo" in edits[pid] and "precio_venta" not in edits[pid]]
+                if self._reprice_from_rules(db, costos):
+                    fields.add("precio_venta")
+            if saved:
+                self._invalidate(saved, fields)
+            db.close()
+            return failed
+        except Exception as e:
+            print(f"Error en save_edits: {e}")
+            return {product_id: str(e) for product_id in edits}
+
+    def delete_products(self, product_ids):
+        """Borra varios productos por id en una sola transacción. Devuelve las filas borradas."""
+        if not product_ids:
+            return 0
+        try:
+            db = self._get_db_connection()
+            with db.transaction():
+                cursor = db.executemany("DELETE FROM articulos WHERE id = ?", [(pid,) for pid in product_ids])
+                deleted = cursor.rowcount
+            self._invalidate(product_ids, added_or_removed=True)
+            db.close()
+            return deleted
+        except Exception as e:
+            print(f"Error en delete_products: {e}")
+            return 0
+
     def add_product(self, data: dict):
         """Alias para create_product para compatibilidad con el controller."""
         return self.create_product(data)
@@ -1,68 +1,60 @@
 from models.db import Database
+from models import pagination
+
+# Orden de la grilla (usa idx_proveedores_orden); el nombre NULL ordena como '', igual que en page_key
+PAGE_KEYSET = pagination.Keyset(["COALESCE(nombre, '') COLLATE NOCASE", "id"])
 
 
 class ProveedoresModel:
     def __init__(self):
         self.db_path = 'database/negocio.db'  # Guardar la ruta en lugar de la instancia
-        self._create_table_if_needed()
 
     def _get_db_connection(self):
         """Crea una nueva conexión a la base de datos thread-safe."""
         return Database(self.db_path)
 
-    def _create_table_if_needed(self):
-        """Crea la tabla de proveedores si no existe."""
-        try:
-            db = self._get_db_connection()
-            db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS proveedores (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    contacto TEXT,
-                    telefono TEXT,
-                    email TEXT,
-                    direccion TEXT,
-                    ciudad TEXT,
-                    estado TEXT NOT NULL DEFAULT 'activo',
-                    fecha_registro DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            # crear índice en nombre para búsquedas case-insensitive más rápidas
-            try:
-                db.execute("CREATE INDEX IF NOT EXISTS idx_proveedores_nombre ON proveedores (nombre COLLATE NOCASE)")
-            except Exception:
-                pass
-            db.close()
-        except Exception as e:
-            print(f"Error al crear tabla proveedores: {e}")
+    def page_key(self, row):
+        """Clave de paginación (keyset) de una fila devuelta por search_proveedores."""
+        return (row["nombre"] or "", row["id"])
 
-    def search_proveedores(self, query: str = None, limit: int = 50, offset: int = 0):
-        """Busca proveedores en la BD aplicando LIMIT/OFFSET. Devuelve (rows_list, total_count).
+    def search_proveedores(self, query: str = None, limit: int = 50, offset: int = 0,
+                           direction: str = None, key=None, with_total: bool = True,
+                           align_last: bool = False):
+        """Busca proveedores en la BD ordenados por nombre. Devuelve (rows_list, total_count).
 
         Si query es None o vacía, devuelve todos (paginados).
+        Sin `direction` pagina con LIMIT/OFFSET; con `direction` (ver
+        models.pagination) pagina por (nombre, id) a partir de `key`.
+        Con with_total=False no se cuenta y total_count es None; align_last
+        como en ProductsModel.search_products.
+        JUMP sigue con OFFSET: la clave empieza por texto y no se puede
+        interpolar una posición como con los ids de productos. La tabla tiene
+        decenas de filas, así que recorrer las anteriores no se nota.
         """
         try:
             db = self._get_db_connection()
             params = []
-            where = ""
+            conditions = []
             if query:
-                where = " WHERE nombre LIKE ? COLLATE NOCASE"
+                conditions.append("nombre LIKE ? COLLATE NOCASE")
                 params.append(f"%{query}%")
+            where = " WHERE " + " AND ".join(conditions) if conditions else ""
 
             # total count
-            count_sql = f"SELECT COUNT(*) FROM proveedores{where}"
-            cur = db.execute(count_sql, tuple(params) if params else ())
-            total = cur.fetchone()[0] if cur else 0
-
-            sql = (
-                "SELECT id, nombre, telefono, saldo "
-                f"FROM proveedores{where} LIMIT ? OFFSET ?"
-            )
-            params.extend([limit, offset])
-            cur = db.execute(sql, tuple(params))
-            rows = cur.fetchall() or []
+            total = None
+            # la última página depende del total: se cuenta aunque no lo pidan
+            if with_total or (direction == pagination.LAST and align_last):
+                count_sql = f"SELECT COUNT(*) FROM proveedores{where}"
+                cur = db.execute(count_sql, tuple(params) if params else ())
+                total = cur.fetchone()[0] if cur else 0
+
+            select_sql = "SELECT id, nombre, telefono, saldo FROM proveedores"
+            if direction is not None and direction != pagination.JUMP:
+                rows = pagination.fetch_page(db, select_sql, conditions, params, PAGE_KEYSET, limit, direction, key, total, align_last)
+            else:
+                sql = f"{select_sql}{where} ORDER BY {PAGE_KEYSET.order_by()} LIMIT ? OFFSET ?"
+                cur = db.execute(sql, tuple(params) + (limit, offset))
+                rows = cur.fetchall() or []
 
             # convertir a dict (incluyendo id para operaciones internas)
             columnas = ["id", "nombre", "telefono", "saldo"]
@@ -5,70 +5,11 @@ from datetime import datetime
 class SaldosProveedoresModel:
     def __init__(self):
         self.db_path = 'database/negocio.db'
-        self._create_tables_if_needed()
 
     def _get_db_connection(self):
         """Crea una nueva conexión a la base de datos thread-safe."""
         return Database(self.db_path)
 
-    def _create_tables_if_needed(self):
-        """Crea las tablas necesarias para el sistema de saldos."""
-        try:
-            db = self._get_db_connection()
-            
-            # Tabla de movimientos (pagos y pedidos)
-            db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS movimientos_proveedores (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    proveedor_id INTEGER NOT NULL,
-                    tipo TEXT NOT NULL,  -- 'pago' o 'pedido'
-                    monto REAL NOT NULL,
-                    descripcion TEXT,
-                    fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (proveedor_id) REFERENCES proveedores(id)
-                )
-                """
-            )
-            
-            # Tabla de boletas (asociadas a pedidos)
-            db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS boletas_proveedores (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    movimiento_id INTEGER NOT NULL,
-                    proveedor_id INTEGER NOT NULL,
-                    fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    subtotal REAL NOT NULL DEFAULT 0,
-                    total REAL NOT NULL DEFAULT 0,
-                    estado TEXT DEFAULT 'activa',
-                    FOREIGN KEY (movimiento_id) REFERENCES movimientos_proveedores(id),
-                    FOREIGN KEY (proveedor_id) REFERENCES proveedores(id)
-                )
-                """
-            )
-            
-            # Tabla de items de boleta
-            db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS boletas_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    boleta_id INTEGER NOT NULL,
-                    producto_id INTEGER,
-                    producto_nombre TEXT NOT NULL,
-                    cantidad INTEGER NOT NULL,
-                    precio_unitario REAL NOT NULL,
-                    subtotal REAL NOT NULL,
-                    FOREIGN KEY (boleta_id) REFERENCES boletas_proveedores(id),
-                    FOREIGN KEY (producto_id) REFERENCES articulos(id)
-                )
-                """
-            )
-            
-            db.close()
-        except Exception as e:
-            print(f"Error al crear tablas de saldos: {e}")
-
     def get_movimientos_proveedor(self, proveedor_id):
         """Obtiene todos los movimientos de un proveedor."""
         try:
@@ -93,32 +34,40 @@ class SaldosProveedoresModel:
 
     def agregar_pago(self, proveedor_id, monto, descripcion=""):
         """Agrega un pago (disminuye el saldo)."""
+        return self.agregar_pagos([(proveedor_id, monto, descripcion)])[0]
+
+    def agregar_pagos(self, pagos):
+        """Registra varios pagos en una sola transacción.
+
+        pagos: lista de tuplas (proveedor_id, monto, descripcion).
+        Devuelve la lista de ids de movimiento creados.
+        """
         try:
             db = self._get_db_connection()
-            
-            # Insertar movimiento
-            cur = db.execute(
-                """
-                INSERT INTO movimientos_proveedores (proveedor_id, tipo, monto, descripcion)
-                VALUES (?, 'pago', ?, ?)
-                """,
-                (proveedor_id, float(monto), descripcion)
-            )
-            movimiento_id = cur.lastrowid
-            
-            # Actualizar saldo del proveedor (restar)
-            db.execute(
-                """
-                UPDATE proveedores
-                SET saldo = saldo - ?
-                WHERE id = ?
-                """,
-                (float(monto), proveedor_id)
-            )
-            
-            db.commit()
+            movimiento_ids = []
+            with db.transaction():
+                for proveedor_id, monto, descripcion in pagos:
+                    # Insertar movimiento
+                    cur = db.execute(
+                        """
+                        INSERT INTO movimientos_proveedores (proveedor_id, tipo, monto, descripcion)
+                        VALUES (?, 'pago', ?, ?)
+                        """,
+                        (proveedor_id, float(monto), descripcion or "")
+                    )
+                    movimiento_ids.append(cur.lastrowid)
+
+                # Actualizar saldo de los proveedores (restar)
+                db.executemany(
+                    """
+                    UPDATE proveedores
+                    SET saldo = IFNULL(saldo, 0) - ?
+                    WHERE id = ?
+                    """,
+                    [(float(monto), proveedor_id) for proveedor_id, monto, _ in pagos]
+                )
             db.close()
-            return movimiento_id
+            return movimiento_ids
         except Exception as e:
             print(f"Error al agregar pago: {e}")
             raise
@@ -128,6 +77,9 @@ class SaldosProveedoresModel:
         
         items: lista de dicts con keys: producto_id, producto_nombre, cantidad, precio_unitario
         fecha: fecha de llegada del pedido (formato YYYY-MM-DD)
+
+        Movimiento, boleta, items y saldo se escriben en una sola transacción:
+        si algo falla no queda una boleta a medias.
         """
         try:
             db = self._get_db_connection()
@@ -136,79 +88,84 @@ class SaldosProveedoresModel:
             subtotal = sum(item['cantidad'] * item['precio_unitario'] for item in items)
             total = subtotal
             
-            # Insertar movimiento de tipo pedido con fecha opcional
-            if fecha:
-                cur = db.execute(
-                    """
-                    INSERT INTO movimientos_proveedores (proveedor_id, tipo, monto, descripcion, fecha)
-                    VALUES (?, 'pedido', ?, ?, ?)
-                    """,
-                    (proveedor_id, total, descripcion, fecha)
-                )
-            else:
-                cur = db.execute(
-                    """
-                    INSERT INTO movimientos_proveedores (proveedor_id, tipo, monto, descripcion)
-                    VALUES (?, 'pedido', ?, ?)
-                    """,
-                    (proveedor_id, total, descripcion)
-                )
-            movimiento_id = cur.lastrowid
-            
-            # Crear boleta con fecha opcional
-            if fecha:
-                cur = db.execute(
-                    """
-                    INSERT INTO boletas_proveedores (movimiento_id, proveedor_id, subtotal, total, fecha)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (movimiento_id, proveedor_id, subtotal, total, fecha)
-                )
-            else:
-                cur = db.execute(
-                    """
-                    INSERT INTO boletas_proveedores (movimiento_id, proveedor_id, subtotal, total)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (movimiento_id, proveedor_id, subtotal, total)
-                )
-            boleta_id = cur.lastrowid
-            
-            # Insertar items de la boleta
-            for item in items:
-                subtotal_item = item['cantidad'] * item['precio_unitario']
+            with db.transaction():
+                # Insertar movimiento de tipo pedido con fecha opcional
+                if fecha:
+                    cur = db.execute(
+                        """
+                        INSERT INTO movimientos_proveedores (proveedor_id, tipo, monto, descripcion, fecha)
+                        VALUES (?, 'pedido', ?, ?, ?)
+                        """,
+                        (proveedor_id, total, descripcion, fecha)
+                    )
+                else:
+                    cur = db.execute(
+                        """
+                        INSERT INTO movimientos_proveedores (proveedor_id, tipo, monto, descripcion)
+                        VALUES (?, 'pedido', ?, ?)
+                        """,
+                        (proveedor_id, total, descripcion)
+                    )
+                movimiento_id = cur.lastrowid
+                
+                # Crear boleta con fecha opcional
+                if fecha:
+                    cur = db.execute(
+                        """
+                        INSERT INTO boletas_proveedores (movimiento_id, proveedor_id, subtotal, total, fecha)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        (movimiento_id, proveedor_id, subtotal, total, fecha)
+                    )
+                else:
+                    cur = db.execute(
+                        """
+                        INSERT INTO boletas_proveedores (movimiento_id, proveedor_id, subtotal, total)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        (movimiento_id, proveedor_id, subtotal, total)
+                    )
+                boleta_id = cur.lastrowid
+                
+                # Insertar items de la boleta en lote
+                self._insertar_items_boleta(db, boleta_id, items)
+                
+                # Actualizar saldo del proveedor (sumar)
                 db.execute(
                     """
-                    INSERT INTO boletas_items (boleta_id, producto_id, producto_nombre, cantidad, precio_unitario, subtotal)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    UPDATE proveedores
+                    SET saldo = IFNULL(saldo, 0) + ?
+                    WHERE id = ?
                     """,
-                    (
-                        boleta_id,
-                        item.get('producto_id'),
-                        item['producto_nombre'],
-                        item['cantidad'],
-                        item['precio_unitario'],
-                        subtotal_item
-                    )
+                    (total, proveedor_id)
                 )
             
-            # Actualizar saldo del proveedor (sumar)
-            db.execute(
-                """
-                UPDATE proveedores
-                SET saldo = saldo + ?
-                WHERE id = ?
-                """,
-                (total, proveedor_id)
-            )
-            
-            db.commit()
             db.close()
             return boleta_id
         except Exception as e:
             print(f"Error al crear pedido con boleta: {e}")
             raise
 
+    def _insertar_items_boleta(self, db, boleta_id, items):
+        """Inserta todos los items de una boleta con un único executemany."""
+        db.executemany(
+            """
+            INSERT INTO boletas_items (boleta_id, producto_id, producto_nombre, cantidad, precio_unitario, subtotal)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    boleta_id,
+                    item.get('producto_id'),
+                    item['producto_nombre'],
+                    item['cantidad'],
+                    item['precio_unitario'],
+                    item['cantidad'] * item['precio_unitario']
+                )
+                for item in items
+            ]
+        )
+
     def get_boleta_completa(self, boleta_id):
         """Obtiene una boleta completa con sus items."""
         try:
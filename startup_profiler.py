@@ -0,0 +1,147 @@
+"""Perfil del arranque: cuánto tarda cada fase hasta ver Productos.
+
+Se activa con la variable de entorno DevConfig.STARTUP_PROFILE_ENV; si no está,
+todas las funciones vuelven enseguida. Fases (tiempo de reloj):
+
+    intérprete -> imports -> migraciones -> Tk -> login (incluye decodificar
+    imágenes) -> ventana principal -> Productos
+
+El tiempo que la pantalla de login espera al usuario no se cuenta. El total se
+compara con DevConfig.STARTUP_TARGET_SECONDS para detectar regresiones en las
+PCs de caja lentas.
+
+Este módulo se importa primero en main.py: el momento de su import marca el
+fin de la fase "intérprete".
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from config import DevConfig
+
+_MODE = os.environ.get(DevConfig.STARTUP_PROFILE_ENV, "").strip().lower()
+ENABLED = _MODE not in ("", "0", "no", "false")
+STRICT = _MODE == "strict"
+
+_phases = []  # [nombre, segundos, profundidad]
+_open = {}  # nombre -> (inicio, índice en _phases)
+_depth = 0
+_reported = False
+_over_target = False
+
+
+def _process_age():
+    """Segundos desde que se creó el proceso, o None si no se puede saber."""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/stat") as f:
+                start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+            with open("/proc/uptime") as f:
+                uptime = float(f.read().split()[0])
+            return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            creation, exit_, kernel, user, now = (wintypes.FILETIME() for _ in range(5))
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetProcessTimes(
+                kernel32.GetCurrentProcess(),
+                ctypes.byref(creation), ctypes.byref(exit_), ctypes.byref(kernel), ctypes.byref(user),
+            )
+            kernel32.GetSystemTimeAsFileTime(ctypes.byref(now))
+
+            def ticks(ft):
+                return (ft.dwHighDateTime << 32) | ft.dwLowDateTime
+
+            return (ticks(now) - ticks(creation)) / 1e7  # unidades de 100 ns
+    except Exception:
+        pass
+    return None
+
+
+if ENABLED:
+    _age = _process_age()
+    if _age is not None:
+        _phases.append(["intérprete", _age, 0])
+
+
+def begin(name):
+    global _depth
+    if not ENABLED or name in _open:
+        return
+    _phases.append([name, None, _depth])
+    _open[name] = (time.perf_counter(), len(_phases) - 1)
+    _depth += 1
+
+
+def end(name):
+    global _depth
+    if not ENABLED or name not in _open:
+        return
+    start, idx = _open.pop(name)
+    _phases[idx][1] = time.perf_counter() - start
+    _depth = max(0, _depth - 1)
+
+
+@contextmanager
+def phase(name):
+    begin(name)
+    try:
+        yield
+    finally:
+        end(name)
+
+
+def end_on_paint(widget, name, then=None):
+    """Cierra la fase `name` cuando `widget` ya se dibujó (primer momento ocioso del bucle de Tk)."""
+    if not ENABLED or name not in _open:
+        return
+
+    def painted():
+        try:
+            widget.update_idletasks()
+        except Exception:
+            pass
+        end(name)
+        if then:
+            then()
+
+    widget.after_idle(painted)
+
+
+def target_seconds():
+    try:
+        return float(os.environ.get("HUELLITAS_STARTUP_TARGET", DevConfig.STARTUP_TARGET_SECONDS))
+    except ValueError:
+        return DevConfig.STARTUP_TARGET_SECONDS
+
+
+def report():
+    """Imprime las fases y el total contra el objetivo. Devuelve True si está dentro del objetivo."""
+    global _reported, _over_target
+    if not ENABLED:
+        return True
+    _reported = True
+    total = sum(secs for _, secs, depth in _phases if depth == 0 and secs is not None)
+    target = target_seconds()
+    print("⏱️ Arranque:")
+    for name, secs, depth in _phases:
+        shown = f"{secs * 1000:8.0f} ms" if secs is not None else "     sin medir"
+        print(f"   {'  ' * depth}{name:<{24 - 2 * depth}} {shown}")
+    print(f"   {'Total':<24} {total * 1000:8.0f} ms (objetivo {target * 1000:.0f} ms)")
+    _over_target = total > target
+    if _over_target:
+        print(f"⚠️ El arranque superó el objetivo por {(total - target) * 1000:.0f} ms")
+    return not _over_target
+
+
+def finish():
+    """Al cerrar la aplicación: informa si no se informó y, en modo estricto, sale con 1 ante una regresión."""
+    if not ENABLED:
+        return
+    if not _reported:
+        report()
+    if STRICT and _over_target:
+        sys.exit(1)
@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from models.db import shutdown_connections
 
 class AppView(ctk.CTk):
     def __init__(self, controlador=None):
@@ -32,8 +33,16 @@ class AppView(ctk.CTk):
         self.frame_contenido = ctk.CTkFrame(self, corner_radius=0)
         self.frame_contenido.pack(fill="both", expand=True)
 
+        # Cerrar las conexiones compartidas de la base al cerrar la ventana
+        self.protocol("WM_DELETE_WINDOW", self.cerrar_aplicacion)
+
        
     
+    def cerrar_aplicacion(self):
+        """Libera las conexiones a la base de datos y cierra la ventana."""
+        shutdown_connections()
+        self.destroy()
+
     def cerrar_sesion(self):
         from controllers.login_controller import LoginController
         self.withdraw()
@@ -0,0 +1,112 @@
+"""Imágenes de la interfaz ya escaladas al tamaño en que se muestran.
+
+CTkImage guarda la imagen original y la reescala al crear cada ventana; los
+PNG del login son grandes (el logo pesa 350 KB) y se decodificaban y
+reescalaban en cada login y en cada cierre de sesión. Acá cada imagen se
+decodifica una sola vez por proceso y se guardan sus variantes escaladas:
+
+- en memoria, por (ruta, tamaño, escala);
+- en disco (carpeta de la aplicación del usuario), con el mtime del original
+  en el nombre: si el PNG cambia, la miniatura vieja deja de usarse y se borra.
+
+A CTkImage le llega la imagen del tamaño exacto ya multiplicado por la escala,
+así que no tiene que reescalar. Los CTkImage no se comparten entre ventanas:
+sus PhotoImage quedan atados al intérprete de Tk que los creó.
+"""
+import glob
+import os
+
+import customtkinter as ctk
+from PIL import Image
+
+from config import DatabaseConfig
+
+_LANCZOS = getattr(Image, "Resampling", Image).LANCZOS
+
+
+def _default_cache_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, DatabaseConfig.APP_DATA_FOLDER, "miniaturas")
+
+
+class AssetManager:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self._originals = {}  # ruta -> imagen PIL decodificada
+        self._scaled = {}  # (ruta, tamaño, escala) -> imagen PIL escalada
+        # contadores
+        self.decoded = 0
+        self.disk_hits = 0
+
+    def image(self, path, size, widget=None):
+        """CTkImage de `path` para mostrar a `size` (ancho, alto) en la ventana de `widget`."""
+        scaling = ctk.ScalingTracker.get_widget_scaling(widget) if widget is not None else 1.0
+        return ctk.CTkImage(dark_image=self.scaled(path, size, scaling), size=size)
+
+    def scaled(self, path, size, scaling=1.0):
+        """Imagen PIL de `path` escalada a `size` * `scaling`."""
+        key = (os.path.normpath(path), tuple(size), round(scaling, 3))
+        image = self._scaled.get(key)
+        if image is None:
+            image = self._load_scaled(key[0], (round(size[0] * scaling), round(size[1] * scaling)))
+            self._scaled[key] = image
+        return image
+
+    def _load_scaled(self, path, pixels):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = 0
+        stem = os.path.splitext(os.path.basename(path))[0]
+        prefix = os.path.join(self.cache_dir, f"{stem}_{pixels[0]}x{pixels[1]}_")
+        cached = f"{prefix}{mtime}.png"
+        if os.path.exists(cached):
+            try:
+                with Image.open(cached) as image:
+                    image.load()
+                    self.disk_hits += 1
+                    return image.copy()
+            except OSError as e:
+                print(f"Miniatura dañada {cached}: {e}")
+        image = self._original(path).resize(pixels, _LANCZOS)
+        self._save(image, cached, prefix)
+        return image
+
+    def _original(self, path):
+        image = self._originals.get(path)
+        if image is None:
+            with Image.open(path) as opened:
+                opened.load()
+                image = opened.copy()
+            self.decoded += 1
+            self._originals[path] = image
+        return image
+
+    def _save(self, image, cached, prefix):
+        """Guarda la miniatura y borra las de versiones anteriores del archivo. Si falla, solo se pierde el caché."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for old in glob.glob(glob.escape(prefix) + "*.png"):
+                if old != cached:
+                    os.remove(old)
+            tmp = cached + ".tmp"
+            image.save(tmp, format="PNG", compress_level=1)
+            os.replace(tmp, cached)
+        except OSError as e:
+            print(f"No se pudo guardar la miniatura {cached}: {e}")
+
+    def clear(self):
+        """Suelta las imágenes en memoria (las miniaturas en disco se conservan)."""
+        self._originals.clear()
+        self._scaled.clear()
+
+
+_assets = None
+
+
+def get_assets():
+    """Administrador de imágenes compartido por todas las ventanas del proceso."""
+    global _assets
+    if _assets is None:
+        _assets = AssetManager()
+    return _assets
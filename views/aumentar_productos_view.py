@@ -1,10 +1,16 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import math
+from tksheet import Sheet
 
+from models.products_model import round_price
+from views.toplevel_pool import PooledWindow
 
-class AumentarProductosWindow(ctk.CTkToplevel):
-    """Ventana para aumentar precios de productos de forma masiva."""
+
+class AumentarProductosWindow(PooledWindow, ctk.CTkToplevel):
+    """Ventana para aumentar precios de productos de forma masiva.
+
+    Se reutiliza entre aperturas (ver views.toplevel_pool): Cerrar la oculta.
+    """
     
     def __init__(self, parent, controller=None):
         super().__init__(parent)
@@ -14,16 +20,17 @@ class AumentarProductosWindow(ctk.CTkToplevel):
         self.geometry("1000x700")
         self.minsize(900, 600)
         self.resizable(True, True)
-        
-        # Centrar ventana
-        self.transient(parent)
-        self.grab_set()
+        self._init_pool()
         
         # Variables
         self.productos_cargados = []
-        self.productos_widgets = []
+        # filas mostradas en el sheet, alineadas con productos_cargados: [id, nombre, actual, nuevo]
+        self._filas = []
         self.producto_seleccionado_idx = None
         self._calculo_timer = None
+        # filtro con el que se cargó la lista (ver ProductsModel.reprice_products) y ids quitados a mano
+        self.criterio = {}
+        self.excluidos = set()
         
         self._setup_ui()
     
@@ -116,6 +123,17 @@ class AumentarProductosWindow(ctk.CTkToplevel):
         )
         self.btn_aplicar.grid(row=0, column=3, padx=20, pady=5)
         
+        # Deshacer el último aumento aplicado (ver historial de precios)
+        self.btn_deshacer = ctk.CTkButton(
+            porcentaje_frame,
+            text="↶ Deshacer último aumento",
+            width=180,
+            fg_color="#9e9e9e",
+            hover_color="#7e7e7e",
+            font=ctk.CTkFont(size=12)
+        )
+        self.btn_deshacer.grid(row=0, column=4, padx=5, pady=5)
+        
         # Separador
         separator = ctk.CTkFrame(self, height=2, fg_color="#cccccc")
         separator.pack(fill="x", padx=20, pady=10)
@@ -145,31 +163,20 @@ class AumentarProductosWindow(ctk.CTkToplevel):
         )
         self.btn_eliminar.pack(side="right")
         
-        # Frame con scroll para la lista de productos
-        productos_container = ctk.CTkFrame(self)
-        productos_container.pack(fill="both", expand=True, padx=20, pady=(0, 10))
-        
-        # Canvas y scrollbar
-        canvas = ctk.CTkCanvas(productos_container, bg="#2b2b2b", highlightthickness=0)
-        scrollbar = ctk.CTkScrollbar(productos_container, command=canvas.yview)
-        self.scrollable_frame = ctk.CTkFrame(canvas, fg_color="transparent")
-        
-        # Configure grid to expand
-        self.scrollable_frame.grid_columnconfigure(0, weight=1)
-        
-        self.scrollable_window = canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        self.canvas = canvas
-        # Ajustar tamaño del frame al canvas
-        def resize_scrollable_frame(event):
-            canvas.itemconfig(self.scrollable_window, width=event.width, height=event.height)
-            canvas.configure(scrollregion=canvas.bbox("all"))
-        canvas.bind("<Configure>", resize_scrollable_frame)
-        
-        # Header de la lista (grid)
-        self._create_list_header()
+        # Lista de productos: el sheet dibuja solo las filas visibles
+        self.sheet = Sheet(
+            self,
+            headers=["ID", "Nombre", "Precio Actual", "Precio Nuevo"],
+            theme="dark",
+            height=350,
+        )
+        self.sheet.enable_bindings("single_select", "row_select", "arrowkeys", "column_width_resize", "copy")
+        self.sheet.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+        self.sheet.column_width(column=0, width=80)
+        self.sheet.column_width(column=1, width=480)
+        self.sheet.column_width(column=2, width=150)
+        self.sheet.column_width(column=3, width=150)
+        self.sheet.bind("<<SheetSelect>>", self._on_sheet_select)
         
         # Frame de botones inferiores
         botones_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -181,102 +188,75 @@ class AumentarProductosWindow(ctk.CTkToplevel):
             width=100,
             fg_color="#9e9e9e",
             hover_color="#7e7e7e",
-            command=self.destroy
+            command=self.ocultar
         )
         btn_cerrar.pack(side="right")
     
-    def _create_list_header(self):
-        """Crea el encabezado de la lista con grid."""
-        header_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#424242", corner_radius=5)
-        header_frame.grid(row=0, column=0, sticky="ew", padx=5, pady=(5, 2))
-        header_frame.grid_columnconfigure(0, minsize=80)  # ID
-        header_frame.grid_columnconfigure(1, weight=1)  # Nombre (expandible)
-        header_frame.grid_columnconfigure(2, minsize=150)  # Precio Actual
-        header_frame.grid_columnconfigure(3, minsize=150)  # Precio Nuevo
-        
-        headers = ["ID", "Nombre", "Precio Actual", "Precio Nuevo"]
-        for i, header_text in enumerate(headers):
-            lbl = ctk.CTkLabel(
-                header_frame,
-                text=header_text,
-                font=ctk.CTkFont(size=12, weight="bold"),
-                text_color="white"
-            )
-            lbl.grid(row=0, column=i, padx=10, pady=8, sticky="w")
+    def reset(self):
+        """Vacía la lista y los campos para una apertura nueva."""
+        if self._calculo_timer is not None:
+            self.after_cancel(self._calculo_timer)
+            self._calculo_timer = None
+        self.entry_buscar.delete(0, "end")
+        self.entry_porcentaje.delete(0, "end")
+        self.criterio = {}
+        self.excluidos = set()
+        self.productos_cargados = []
+        self.producto_seleccionado_idx = None
+        self.sheet.deselect("all")
+        self._filas = self.sheet.set_sheet_data([], reset_col_positions=False)
+        self._actualizar_info()
     
-    def cargar_productos(self, productos):
-        """Carga productos en la lista visual con grid."""
-        # Limpiar productos anteriores
-        for widget in self.productos_widgets:
-            widget.destroy()
-        self.productos_widgets.clear()
-        
-        self.productos_cargados = productos
-        self.info_label.configure(text=f"Productos cargados: {len(productos)}")
+    def cargar_productos(self, productos, criterio=None):
+        """Carga productos en la lista.
+
+        `criterio` es el filtro que los seleccionó; None conserva el actual
+        (p. ej. al recargar después de quitar uno).
+        """
+        if criterio is not None:
+            self.criterio = criterio
+            self.excluidos = set()
         
-        # Crear fila para cada producto
-        for idx, producto in enumerate(productos, start=1):
-            fila_frame = ctk.CTkFrame(
-                self.scrollable_frame,
-                fg_color="#3a3a3a",
-                corner_radius=3
-            )
-            fila_frame.grid(row=idx, column=0, sticky="ew", padx=5, pady=1)
-            fila_frame.grid_columnconfigure(0, minsize=80)
-            fila_frame.grid_columnconfigure(1, weight=1)
-            fila_frame.grid_columnconfigure(2, minsize=150)
-            fila_frame.grid_columnconfigure(3, minsize=150)
-            
-            # Bind click para seleccionar
-            fila_idx = idx - 1
-            fila_frame.bind("<Button-1>", lambda e, i=fila_idx: self._seleccionar_producto(i))
-            
-            # ID
-            lbl_id = ctk.CTkLabel(
-                fila_frame,
-                text=str(producto.get('id', '')),
-                font=ctk.CTkFont(size=11),
-                text_color="#ffffff"
-            )
-            lbl_id.grid(row=0, column=0, padx=10, pady=8, sticky="w")
-            lbl_id.bind("<Button-1>", lambda e, i=fila_idx: self._seleccionar_producto(i))
-            
-            # Nombre
-            lbl_nombre = ctk.CTkLabel(
-                fila_frame,
-                text=producto.get('nombre', ''),
-                font=ctk.CTkFont(size=11),
-                text_color="#ffffff",
-                anchor="w"
-            )
-            lbl_nombre.grid(row=0, column=1, padx=10, pady=8, sticky="ew")
-            lbl_nombre.bind("<Button-1>", lambda e, i=fila_idx: self._seleccionar_producto(i))
-            
-            # Precio Actual
-            precio_actual = float(producto.get('precio_venta', 0))
-            lbl_precio_actual = ctk.CTkLabel(
-                fila_frame,
-                text=f"${precio_actual:,.2f}",
-                font=ctk.CTkFont(size=11),
-                text_color="#66BB6A"
-            )
-            lbl_precio_actual.grid(row=0, column=2, padx=10, pady=8, sticky="w")
-            lbl_precio_actual.bind("<Button-1>", lambda e, i=fila_idx: self._seleccionar_producto(i))
-            
-            # Precio Nuevo (placeholder)
-            lbl_precio_nuevo = ctk.CTkLabel(
-                fila_frame,
-                text="--",
-                font=ctk.CTkFont(size=11, weight="bold"),
-                text_color="#FFA726"
-            )
-            lbl_precio_nuevo.grid(row=0, column=3, padx=10, pady=8, sticky="w")
-            lbl_precio_nuevo.bind("<Button-1>", lambda e, i=fila_idx: self._seleccionar_producto(i))
-            
-            # Guardar referencias
-            self.productos_widgets.append(fila_frame)
-            producto['_fila_frame'] = fila_frame
-            producto['_label_nuevo'] = lbl_precio_nuevo
+        self.productos_cargados = list(productos)
+        self.producto_seleccionado_idx = None
+        filas = [
+            [
+                str(producto.get('id', '')),
+                producto.get('nombre', '') or '',
+                f"${float(producto.get('precio_venta') or 0):,.2f}",
+                "--",
+            ]
+            for producto in self.productos_cargados
+        ]
+        # el sheet usa esta misma lista como sus datos: cambiar una fila la cambia en pantalla
+        self._filas = self.sheet.set_sheet_data(filas, reset_col_positions=False)
+        self._actualizar_info()
+        # si ya hay un porcentaje escrito, calcular la vista previa para la lista nueva
+        self._calcular_automatico()
+    
+    def _actualizar_info(self):
+        self.info_label.configure(text=f"Productos cargados: {len(self.productos_cargados)}")
+    
+    @staticmethod
+    def precios_preview(precios, porcentaje_float):
+        """Precios nuevos con redondeo para `precios` ({id: precio}). Devuelve {id: (precio, texto)}.
+
+        No toca widgets: se puede ejecutar fuera del hilo de Tk.
+        """
+        resultado = {}
+        for producto_id, precio in precios.items():
+            precio_final = round_price(float(precio or 0) * (1 + porcentaje_float / 100))
+            resultado[producto_id] = (precio_final, f"${precio_final:,.2f}")
+        return resultado
+    
+    def mostrar_precios_nuevos(self, precios):
+        """Vuelca en la lista los precios calculados por `precios_preview`."""
+        for producto, fila in zip(self.productos_cargados, self._filas):
+            nuevo = precios.get(producto.get('id'))
+            if nuevo is not None:
+                producto['precio_nuevo'] = nuevo[0]
+                fila[3] = nuevo[1]
+        self.sheet.redraw()
     
     def calcular_precios_nuevos(self, porcentaje):
         """Calcula y muestra los nuevos precios con redondeo inteligente."""
@@ -286,36 +266,16 @@ class AumentarProductosWindow(ctk.CTkToplevel):
             messagebox.showerror("Error", "Ingrese un porcentaje válido")
             return
         
-        for producto in self.productos_cargados:
-            precio_actual = float(producto.get('precio_venta', 0))
-            precio_aumentado = precio_actual * (1 + porcentaje_float / 100)
-            
-            # Redondeo inteligente
-            precio_final = self._redondear_inteligente(precio_aumentado)
-            
-            producto['precio_nuevo'] = precio_final
-            
-            # Actualizar label
-            if '_label_nuevo' in producto:
-                producto['_label_nuevo'].configure(text=f"${precio_final:,.2f}")
+        precios = {p.get('id'): p.get('precio_venta') for p in self.productos_cargados}
+        self.mostrar_precios_nuevos(self.precios_preview(precios, porcentaje_float))
     
     def _redondear_inteligente(self, precio):
         """Redondea el precio de forma inteligente.
         
         Ejemplo: 55985 -> 56000
         """
-        if precio < 100:
-            # Precios bajos: redondear a 5
-            return math.ceil(precio / 5) * 5
-        elif precio < 1000:
-            # Precios medios: redondear a 10
-            return math.ceil(precio / 10) * 10
-        elif precio < 10000:
-            # Precios altos: redondear a 100
-            return math.ceil(precio / 100) * 100
-        else:
-            # Precios muy altos: redondear a 1000
-            return math.ceil(precio / 1000) * 1000
+        # mismos tramos que el UPDATE de ProductsModel.reprice_products
+        return round_price(precio)
     
     def obtener_productos_actualizados(self):
         """Retorna la lista de productos con precios actualizados."""
@@ -328,37 +288,29 @@ class AumentarProductosWindow(ctk.CTkToplevel):
             if 'precio_nuevo' in p
         ]
     
-    def _seleccionar_producto(self, idx):
-        """Selecciona un producto de la lista."""
-        # Deseleccionar anterior
-        if self.producto_seleccionado_idx is not None:
-            if self.producto_seleccionado_idx < len(self.productos_cargados):
-                producto_anterior = self.productos_cargados[self.producto_seleccionado_idx]
-                if '_fila_frame' in producto_anterior:
-                    producto_anterior['_fila_frame'].configure(fg_color="#3a3a3a")
-        
-        # Seleccionar nuevo
-        self.producto_seleccionado_idx = idx
-        producto = self.productos_cargados[idx]
-        if '_fila_frame' in producto:
-            producto['_fila_frame'].configure(fg_color="#1976D2")
+    def _on_sheet_select(self, event=None):
+        """Recuerda la fila seleccionada en la lista."""
+        selected = self.sheet.get_currently_selected()
+        if selected and selected.row is not None and 0 <= selected.row < len(self.productos_cargados):
+            self.producto_seleccionado_idx = selected.row
     
     def eliminar_producto_seleccionado(self):
-        """Elimina el producto seleccionado de la lista."""
+        """Quita el producto seleccionado de la lista (solo esa fila, sin reconstruir)."""
         if self.producto_seleccionado_idx is None:
             messagebox.showwarning("Advertencia", "Seleccione un producto para eliminar")
             return
         
-        if self.producto_seleccionado_idx >= len(self.productos_cargados):
+        idx = self.producto_seleccionado_idx
+        if idx >= len(self.productos_cargados):
             return
         
-        # Eliminar producto
-        producto = self.productos_cargados[self.producto_seleccionado_idx]
-        self.productos_cargados.pop(self.producto_seleccionado_idx)
-        
-        # Actualizar vista
+        producto = self.productos_cargados.pop(idx)
+        self.excluidos.add(producto.get('id'))
+        # también la quita de self._filas, que es la lista de datos del sheet
+        self.sheet.del_rows(idx, undo=False)
+        self.sheet.deselect("all")
         self.producto_seleccionado_idx = None
-        self.cargar_productos(self.productos_cargados)
+        self._actualizar_info()
     
     def _on_porcentaje_change(self, event):
         """Maneja el evento de cambio en el entry de porcentaje."""
@@ -382,7 +334,11 @@ class AumentarProductosWindow(ctk.CTkToplevel):
             porcentaje_float = float(porcentaje)
             if porcentaje_float <= 0:
                 return
-            self.calcular_precios_nuevos(porcentaje)
         except ValueError:
             # Si no es un número válido, no hacer nada
-            pass
+            return
+        if self.controller and hasattr(self.controller, "preview_aumento"):
+            # en segundo plano: con miles de productos no trabar la escritura
+            self.controller.preview_aumento(self, porcentaje_float)
+        else:
+            self.calcular_precios_nuevos(porcentaje)
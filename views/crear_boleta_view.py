@@ -2,22 +2,21 @@ import customtkinter as ctk
 from tkinter import messagebox, simpledialog
 from datetime import datetime
 
+from views.toplevel_pool import PooledWindow
 
-class CrearBoletaWindow(ctk.CTkToplevel):
-    """Ventana para crear una boleta de pedido con productos."""
+
+class CrearBoletaWindow(PooledWindow, ctk.CTkToplevel):
+    """Ventana para crear una boleta de pedido con productos.
+
+    Se reutiliza entre aperturas (ver views.toplevel_pool): Cancelar la oculta.
+    """
     
     def __init__(self, parent, controller=None, proveedor=None):
         super().__init__(parent)
-        self.controller = controller
-        self.proveedor = proveedor
-        
-        self.title(f"Crear Boleta - {proveedor.get('nombre', 'Proveedor')}")
         self.geometry("900x750")
         self.minsize(800, 650)
-        
-        # Centrar ventana
-        self.transient(parent)
-        self.grab_set()
+        self._init_pool()
+        self.bind_context(controller=controller, proveedor=proveedor)
         
         # Variables
         self.items_boleta = []
@@ -209,7 +208,7 @@ class CrearBoletaWindow(ctk.CTkToplevel):
             fg_color="#9e9e9e",
             hover_color="#7e7e7e",
             width=120,
-            command=self.destroy
+            command=self.ocultar
         )
         btn_cancelar.pack(side="right", padx=5)
         
@@ -224,6 +223,21 @@ class CrearBoletaWindow(ctk.CTkToplevel):
         )
         self.btn_guardar.pack(side="right", padx=5)
     
+    def reset(self):
+        """Vacía los items y los campos; la fecha vuelve a ser la de hoy."""
+        self.items_boleta = []
+        self._actualizar_grid()
+        self.canvas.yview_moveto(0)
+        for entry in (self.entry_producto, self.entry_cantidad, self.entry_precio, self.entry_fecha):
+            entry.delete(0, 'end')
+        self.entry_fecha.insert(0, datetime.now().strftime("%Y-%m-%d"))
+    
+    def bind_context(self, controller=None, proveedor=None):
+        """Proveedor y controlador de saldos de esta boleta."""
+        self.controller = controller
+        self.proveedor = proveedor or {}
+        self.title(f"Crear Boleta - {self.proveedor.get('nombre', 'Proveedor')}")
+    
     def _create_items_header(self):
         """Crea el encabezado de la lista de items con grid."""
         header_frame = ctk.CTkFrame(self.scrollable_items, fg_color="#424242", corner_radius=5)
@@ -381,6 +395,6 @@ class CrearBoletaWindow(ctk.CTkToplevel):
         try:
             boleta_id = self.controller.crear_pedido_con_items(self.items_boleta, descripcion, fecha)
             messagebox.showinfo("Éxito", f"Boleta #{boleta_id} creada correctamente para la fecha {fecha}")
-            self.destroy()
+            self.ocultar()
         except Exception as e:
             messagebox.showerror("Error", f"Error al crear boleta: {e}")
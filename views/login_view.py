@@ -1,6 +1,7 @@
 import customtkinter as ctk
-from PIL import Image
 from tkinter import PhotoImage
+import startup_profiler
+from views.assets import get_assets
 class VentanaLogin(ctk.CTkToplevel):
     def __init__(self, master):
         #El super es para que herede de ctk.CTkToplevel
@@ -26,12 +27,12 @@ class VentanaLogin(ctk.CTkToplevel):
         frame_derecha.pack_propagate(False)
 
         # Logo
-        logo = Image.open("assets/images/huellitasLogo.png")
-        self.img_logo = ctk.CTkImage(dark_image=logo, size=(250,200))
-        logo_letras = Image.open("assets/images/huellitas_titulo.png")
-        self.img_logo_letras = ctk.CTkImage(dark_image=logo_letras, size=(200,100))
-        person = Image.open("assets/images/persona.png")
-        self.img_person = ctk.CTkImage(dark_image=person, size=(80,80))
+        with startup_profiler.phase("imágenes"):
+            # ya escaladas y en caché: no se decodifican los PNG en cada login
+            assets = get_assets()
+            self.img_logo = assets.image("assets/images/huellitasLogo.png", (250,200), self)
+            self.img_logo_letras = assets.image("assets/images/huellitas_titulo.png", (200,100), self)
+            self.img_person = assets.image("assets/images/persona.png", (80,80), self)
         self.label_footer = ctk.CTkLabel(frame_izq, text="Desarrollado por Ignacio Fernandez © 2025", font=ctk.CTkFont(size=12), fg_color="transparent")
         self.label_logo = ctk.CTkLabel(frame_izq, text="", image=self.img_logo)
         self.label_logo_letras = ctk.CTkLabel(frame_izq, text="", image=self.img_logo_letras)
@@ -1,3 +1,5 @@
+import difflib
+
 import customtkinter as ctk
 from tkinter import messagebox
 from tksheet import Sheet
@@ -52,6 +54,13 @@ class ProductsView(ctk.CTkFrame):
     HEADER_TEXT_COLOR = "#000000"  # texto negro sobre fondo verde
     # Row selection: un verde más pastel
     ROW_HIGHLIGHT = "#dff3df"
+    # filas formateadas que se recuerdan (por id) para no volver a formatearlas
+    DISPLAY_CACHE_MAX = 5000
+    # filas cuyo último cambio no se pudo guardar
+    FAILED_ROW_BG = "#f8d7da"
+    # columnas numéricas (ver _parse_value)
+    PRICE_KEYS = ("precio_costo", "precio_venta")
+    INT_KEYS = ("id_categoria", "id_proveedor", "cantidad")
 
     def __init__(self, master, controller=None, productos=None):
         super().__init__(master)
@@ -63,6 +72,15 @@ class ProductsView(ctk.CTkFrame):
         self._selected_widget = None
         self._search_after_id = None
         self._last_query = None
+        # id -> (valores, textos mostrados) y copia de lo que hay en el sheet
+        self._display_cache = {}
+        self._shown = []
+        self._nombre_width = 0
+        # ids de productos cuya edición falló (filas marcadas) y filas marcadas en el sheet
+        self._failed_ids = set()
+        self._flagged_rows = []
+        # >0 mientras el propio código inserta/borra filas (no son cambios del usuario)
+        self._applying = 0
         
         # mantener la lista local completa y una lista filtrada para la vista
         self._all_products = list(productos or [])
@@ -100,6 +118,17 @@ class ProductsView(ctk.CTkFrame):
         self.btn_aumentar = ctk.CTkButton(toolbar, text="Aumentar productos", width=160, fg_color="#FF9800", hover_color="#F57C00", text_color="#ffffff")
         self.btn_aumentar.pack(side="left", padx=6)
 
+        # Reglas de margen: precio de venta calculado desde el costo
+        self.btn_reglas = ctk.CTkButton(toolbar, text="Reglas de precios", width=150, fg_color="#3F51B5", hover_color="#303F9F", text_color="#ffffff")
+        self.btn_reglas.pack(side="left", padx=6)
+
+        # Importar una lista de precios de proveedor (CSV o XLSX)
+        self.btn_importar = ctk.CTkButton(toolbar, text="Importar lista", width=130, fg_color="#607D8B", hover_color="#546E7A", text_color="#ffffff")
+        self.btn_importar.pack(side="left", padx=6)
+
+        self.btn_exportar = ctk.CTkButton(toolbar, text="Exportar", width=110, fg_color="#607D8B", hover_color="#546E7A", text_color="#ffffff")
+        self.btn_exportar.pack(side="left", padx=6)
+
         # inicialmente deshabilitado borrar
         self.btn_borrar.configure(state="disabled")
 
@@ -169,11 +198,24 @@ class ProductsView(ctk.CTkFrame):
             outline_color="#cccccc",
             outline_thickness=1
         )
+        # alineación fija: se configura una vez y set_sheet_data la conserva
+        self.sheet.align_columns(columns=list(range(len(self.COLUMNS))), align="w")
         
         # Bind para detectar selección
         self.sheet.bind("<<SheetSelect>>", self._on_sheet_select)
         # Bind para detectar cuando se termina de editar una celda
         self.sheet.extra_bindings("end_edit_cell", self._on_cell_edit)
+        # al salir de la grilla se escriben las ediciones pendientes
+        self.sheet.bind("<FocusOut>", self._on_sheet_focus_out, add="+")
+        # historial de precios del producto desde el menú contextual
+        self.sheet.popup_menu_add_command("Historial de precios", self._on_price_history, index_menu=False, header_menu=False, empty_space_menu=False)
+        # pegar, Supr e insertar/borrar filas llegan como un solo cambio
+        self.sheet.extra_bindings([
+            ("end_paste", self._on_bulk_change),
+            ("end_delete", self._on_bulk_change),
+            ("end_insert_rows", self._on_bulk_change),
+            ("end_delete_rows", self._on_bulk_change),
+        ])
 
         # paginado: número de filas por página
         self.PAGE_SIZE = 50
@@ -183,12 +225,31 @@ class ProductsView(ctk.CTkFrame):
         # frame de paginación (Prev / Page / Next)
         self.pagination_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.pagination_frame.pack(fill="x", padx=10, pady=(0, 10))
+        self.first_btn = ctk.CTkButton(self.pagination_frame, text="Primera", width=80, command=lambda: self._change_page(page=0), fg_color="#9e9e9e", hover_color="#7e7e7e", text_color="#ffffff")
+        self.first_btn.pack(side="left", padx=(0, 6))
         self.prev_btn = ctk.CTkButton(self.pagination_frame, text="Anterior", width=100, command=lambda: self._change_page(-1), fg_color="#9e9e9e", hover_color="#7e7e7e", text_color="#ffffff")
         self.prev_btn.pack(side="left", padx=(0, 6))
         self.page_label = ctk.CTkLabel(self.pagination_frame, text="Página 0 / 0")
         self.page_label.pack(side="left")
         self.next_btn = ctk.CTkButton(self.pagination_frame, text="Siguiente", width=100, command=lambda: self._change_page(1), fg_color="#4CAF50", hover_color="#43A047", text_color="#ffffff")
         self.next_btn.pack(side="left", padx=(6, 0))
+        self.last_btn = ctk.CTkButton(self.pagination_frame, text="Última", width=80, command=lambda: self._change_page(page=-1), fg_color="#4CAF50", hover_color="#43A047", text_color="#ffffff")
+        self.last_btn.pack(side="left", padx=(6, 0))
+        # salto a una página (posición aproximada, sin recorrer las anteriores)
+        self.goto_entry = ctk.CTkEntry(self.pagination_frame, width=60, placeholder_text="Ir a")
+        self.goto_entry.pack(side="left", padx=(12, 0))
+        self.goto_entry.bind("<Return>", lambda e: self._on_goto_page())
+        # avance de los cambios masivos (se muestra solo mientras se guardan)
+        self.progress_bar = ctk.CTkProgressBar(self.pagination_frame, width=160)
+        self.progress_label = ctk.CTkLabel(self.pagination_frame, text="")
+        # scroll continuo: la grilla se desplaza por todo el catálogo cargando bloques a demanda
+        self.infinite_switch = ctk.CTkSwitch(self.pagination_frame, text="Scroll continuo", command=self._on_toggle_infinite)
+        self.infinite_switch.pack(side="right")
+        self._infinite = False
+        self._jump_after_id = None
+        # barra que representa la posición en el resultado completo (no solo en las filas cargadas)
+        self.virtual_scroll = ctk.CTkScrollbar(self, orientation="vertical", command=self._on_virtual_scroll)
+        self.sheet.bind("<<SheetRedrawn>>", self._on_sheet_redrawn)
 
         # paginado: número de filas por página
         self.PAGE_SIZE = 50
@@ -198,79 +259,200 @@ class ProductsView(ctk.CTkFrame):
         # construir filas desde la lista local (vista inicial vacía o con página inicial)
         self.build_rows()
 
+    def _display_row(self, p):
+        """Valores a mostrar en el sheet para un producto.
+
+        El formateo se guarda por id y solo se rehace si cambió algún valor.
+        """
+        source = tuple(p.get(key, "") for key, _ in self.COLUMNS)
+        product_id = p.get("id")
+        cached = self._display_cache.get(product_id) if product_id is not None else None
+        if cached is not None and cached[0] == source:
+            return list(cached[1])
+        row = [self._format_value(key, value) for (key, _), value in zip(self.COLUMNS, source)]
+        if product_id is not None:
+            if len(self._display_cache) >= self.DISPLAY_CACHE_MAX:
+                self._display_cache.clear()
+            self._display_cache[product_id] = (source, row)
+        return list(row)
+
+    @staticmethod
+    def _format_value(key, value):
+        # Manejo especial de valores None o vacíos
+        if value is None:
+            return ""
+        if key in ("precio_costo", "precio_venta") and str(value).strip() != "":
+            try:
+                return f"${float(value):.2f}"
+            except Exception:
+                return str(value)
+        if key in ("id_categoria", "id_proveedor", "cantidad"):
+            # Para campos numéricos, mostrar como entero o vacío
+            try:
+                return str(int(value)) if str(value).strip() != "" else ""
+            except Exception:
+                return str(value)
+        if key == "codigo_barras":
+            # Para código de barras, mantener como texto exacto para preservar ceros
+            return str(value) if str(value).strip() != "" else ""
+        # Para texto normal
+        return str(value)
+
     def build_rows(self, productos=None):
         """Construye la vista con las filas actualmente en `self._productos`.
         Espera que la lista ya contenga solo la página solicitada.
+
+        Reemplaza todos los datos del sheet; para cambios parciales usar `apply_rows`.
         """
-        # Limpiar datos previos del sheet
-        self.sheet.set_sheet_data([[]])
-        
-        # Preparar los datos para tksheet
-        data = []
-        for p in self._productos:
-            row = []
-            for key, _ in self.COLUMNS:
-                value = p.get(key, "")
-                
-                # Manejo especial de valores None o vacíos
-                if value is None:
-                    display_value = ""
-                elif key in ("precio_costo", "precio_venta") and str(value).strip() != "":
-                    try:
-                        display_value = f"${float(value):.2f}"
-                    except Exception:
-                        display_value = str(value) if value is not None else ""
-                elif key in ("id_categoria", "id_proveedor", "cantidad"):
-                    # Para campos numéricos, mostrar como entero o vacío
-                    try:
-                        display_value = str(int(value)) if value is not None and str(value).strip() != "" else ""
-                    except Exception:
-                        display_value = str(value) if value is not None else ""
-                elif key == "codigo_barras":
-                    # Para código de barras, mantener como texto exacto para preservar ceros
-                    display_value = str(value) if value is not None and str(value).strip() != "" else ""
-                else:
-                    # Para texto normal
-                    display_value = str(value) if value is not None else ""
-                
-                row.append(display_value)
-            data.append(row)
-        
-        # Establecer los datos en el sheet
-        if data:
-            self.sheet.set_sheet_data(data)
-            
-            # Ajustar automáticamente el ancho de la columna "Nombre" (índice 1)
+        data = [self._display_row(p) for p in self._productos]
+        # los anchos y la alineación de columnas se conservan
+        self.sheet.set_sheet_data(data, reset_col_positions=False, redraw=False)
+        self._shown = data
+        self._nombre_width = 0
+        self._fit_nombre_width(data, redraw=False)
+        self._refresh_failed_rows(redraw=False)
+        self.sheet.redraw()
+
+    def apply_rows(self, productos):
+        """Muestra `productos` tocando solo las filas y celdas que cambiaron.
+
+        Las filas se comparan por id con las que ya están en el sheet: las que
+        siguen se actualizan celda por celda, las nuevas se insertan y las que
+        ya no están se borran, con un solo redibujado al final. Si no queda
+        ninguna fila en común (otra página) se reconstruye entera.
+        """
+        productos = list(productos or [])
+        old_ids = [p.get("id") for p in self._productos]
+        new_ids = [p.get("id") for p in productos]
+        if len(self._shown) != self.sheet.get_total_rows():
+            old_ids = []
+        opcodes = difflib.SequenceMatcher(None, old_ids, new_ids, autojunk=False).get_opcodes()
+        if not any(tag == "equal" for tag, *_ in opcodes):
+            self._productos = productos
+            self.build_rows()
+            return
+        new_shown = [self._display_row(p) for p in productos]
+        changed = []
+        # de atrás hacia adelante, para que los índices de lo que falta sigan valiendo
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag == "equal" or (tag == "replace" and i2 - i1 == j2 - j1):
+                for old_r, new_r in zip(range(i1, i2), range(j1, j2)):
+                    if self._patch_cells(old_r, new_shown[new_r]):
+                        changed.append(new_shown[new_r])
+                continue
+            if tag in ("delete", "replace"):
+                self._delete_sheet_rows(range(i1, i2))
+            if tag in ("insert", "replace"):
+                self._insert_sheet_rows([list(r) for r in new_shown[j1:j2]], idx=i1)
+                changed.extend(new_shown[j1:j2])
+        self._productos = productos
+        self._shown = new_shown
+        self._fit_nombre_width(changed, redraw=False)
+        self._refresh_failed_rows(redraw=False)
+        self.sheet.redraw()
+
+    def patch_row(self, row_idx, redraw=True):
+        """Vuelve a mostrar `self._productos[row_idx]` cambiando solo sus celdas distintas."""
+        if not 0 <= row_idx < len(self._productos) or row_idx >= len(self._shown):
+            return
+        row = self._display_row(self._productos[row_idx])
+        if self._patch_cells(row_idx, row):
+            self._fit_nombre_width([row], redraw=False)
+            if redraw:
+                self.sheet.redraw()
+
+    def revert_product(self, product_id, values):
+        """Vuelve a mostrar los valores anteriores de un producto que no se pudo guardar y marca su fila."""
+        self._failed_ids.add(product_id)
+        for row_idx, p in enumerate(self._productos):
+            if p.get("id") == product_id:
+                p.update(values)
+                self.patch_row(row_idx, redraw=False)
+                break
+        self._refresh_failed_rows()
+
+    def clear_failed(self, product_ids):
+        """Quita la marca de error de los productos que se guardaron bien."""
+        if self._failed_ids.intersection(product_ids):
+            self._failed_ids.difference_update(product_ids)
+            self._refresh_failed_rows()
+
+    def _refresh_failed_rows(self, redraw=True):
+        """Resalta las filas de `_failed_ids` (las filas se corren al cambiar de página)."""
+        if not self._failed_ids and not self._flagged_rows:
+            return
+        if self._flagged_rows:
+            # insert_rows/del_rows corren los resaltados: borrar todos y volver a marcar
+            self.sheet.dehighlight_rows("all", redraw=False)
+        self._flagged_rows = [i for i, p in enumerate(self._productos) if p.get("id") in self._failed_ids]
+        if self._flagged_rows:
+            self.sheet.highlight_rows(self._flagged_rows, bg=self.FAILED_ROW_BG, redraw=False)
+        if redraw:
+            self.sheet.redraw()
+
+    def _on_price_history(self, event=None):
+        selected = self.sheet.get_currently_selected()
+        if not selected or selected.row is None or not 0 <= selected.row < len(self._productos):
+            return
+        producto = self._productos[selected.row]
+        if producto.get("id") is not None and self.controller and hasattr(self.controller, "show_price_history"):
+            self.controller.show_price_history(producto)
+
+    def _on_sheet_focus_out(self, event=None):
+        # el editor de celdas también toma el foco: mirar a dónde fue después de que se asiente
+        self.after(50, self._check_focus_left)
+
+    def _check_focus_left(self):
+        try:
+            focused = self.focus_get()
+        except Exception:
+            focused = None
+        if focused is not None and str(focused).startswith(str(self.sheet)):
+            return
+        if self.controller and hasattr(self.controller, "flush_edits"):
+            self.controller.flush_edits()
+
+    def _insert_sheet_rows(self, rows, idx=None):
+        self._applying += 1
+        try:
+            self.sheet.insert_rows(rows, idx=idx, undo=False, redraw=False)
+        finally:
+            self._applying -= 1
+
+    def _delete_sheet_rows(self, rows):
+        self._applying += 1
+        try:
+            self.sheet.del_rows(rows, undo=False, redraw=False)
+        finally:
+            self._applying -= 1
+
+    def _patch_cells(self, row_idx, row):
+        """Escribe en el sheet las celdas de `row` que difieren de lo mostrado. Devuelve si hubo cambios."""
+        shown = self._shown[row_idx]
+        changed = False
+        for col_idx, value in enumerate(row):
+            if col_idx >= len(shown) or shown[col_idx] != value:
+                self.sheet.set_cell_data(row_idx, col_idx, value, redraw=False)
+                changed = True
+        self._shown[row_idx] = list(row)
+        return changed
+
+    def _fit_nombre_width(self, rows, redraw=True):
+        """Ensancha la columna "Nombre" si alguna de `rows` lo necesita."""
+        nombre_col_idx = 1  # La columna "Nombre" es la segunda (índice 1)
+        max_length = len(self.COLUMNS[nombre_col_idx][1])  # Empezar con el ancho del header
+        for row in rows:
+            if nombre_col_idx < len(row):
+                max_length = max(max_length, len(str(row[nombre_col_idx])))
+        # aproximadamente 8 píxeles por carácter más 20 de margen
+        optimal_width = max(200, min(500, max_length * 8 + 20))
+        if optimal_width > self._nombre_width:
+            self._nombre_width = optimal_width
             try:
-                # Calcular el ancho máximo necesario para la columna "Nombre"
-                nombre_col_idx = 1  # La columna "Nombre" es la segunda (índice 1)
-                max_length = len(self.COLUMNS[nombre_col_idx][1])  # Empezar con el ancho del header
-                
-                # Verificar el largo de cada nombre en los datos
-                for row in data:
-                    if nombre_col_idx < len(row):
-                        cell_length = len(str(row[nombre_col_idx]))
-                        if cell_length > max_length:
-                            max_length = cell_length
-                
-                # Calcular el ancho en píxeles (aproximadamente 8 píxeles por carácter)
-                # Agregar un margen de 20 píxeles para el padding
-                optimal_width = max(200, min(500, max_length * 8 + 20))
-                
-                # Establecer el ancho de la columna "Nombre"
-                self.sheet.column_width(column=nombre_col_idx, width=optimal_width)
-                
-                # Alinear todas las columnas a la izquierda
-                for col_idx in range(len(self.COLUMNS)):
-                    self.sheet.align_columns(columns=[col_idx], align="w")
+                self.sheet.column_width(column=nombre_col_idx, width=optimal_width, redraw=redraw)
             except Exception as e:
                 print(f"Error ajustando ancho de columnas: {e}")
-        else:
-            self.sheet.set_sheet_data([[""] * len(self.COLUMNS)])
 
-        
-    
-    
     def _on_sheet_select(self, event):
         """Maneja la selección de filas en el sheet."""
         selected = self.sheet.get_currently_selected()
@@ -299,6 +481,7 @@ class ProductsView(ctk.CTkFrame):
                 # Obtener el key de la columna editada
                 if col_idx < len(self.COLUMNS):
                     key, _ = self.COLUMNS[col_idx]
+                    previous = producto.get(key)
                     
                     # No actualizar el ID
                     if key == "id":
@@ -308,35 +491,158 @@ class ProductsView(ctk.CTkFrame):
                     updated_data = dict(producto)  # Copiar todo el producto
                     
                     # Formatear el nuevo valor según el tipo
-                    if key in ("precio_costo", "precio_venta"):
-                        try:
-                            clean_value = str(new_value).replace("$", "").replace(",", "").strip()
-                            updated_data[key] = float(clean_value) if clean_value else 0.0
-                            # Actualizar la celda con formato de precio
-                            if clean_value:
-                                self.sheet.set_cell_data(row_idx, col_idx, f"${float(clean_value):.2f}")
-                        except:
-                            updated_data[key] = 0.0
-                    elif key in ("id_categoria", "id_proveedor", "cantidad"):
-                        try:
-                            updated_data[key] = int(new_value) if new_value and str(new_value).strip() else None
-                        except:
-                            updated_data[key] = None
-                    else:
-                        updated_data[key] = str(new_value) if new_value else ""
+                    try:
+                        updated_data[key] = self._parse_value(key, new_value)
+                    except ValueError:
+                        updated_data[key] = 0.0 if key in self.PRICE_KEYS else None
                     
                     # Actualizar el producto local primero
                     self._productos[row_idx].update(updated_data)
+                    # la celda tiene lo que se escribió; reformatear solo esa fila (p. ej. "$12.00")
+                    if row_idx < len(self._shown):
+                        self._shown[row_idx][col_idx] = new_value
+                    self.patch_row(row_idx)
                     
                     # Llamar al controller para actualizar en BD
                     if self.controller and hasattr(self.controller, "update_product_from_sheet"):
-                        self.controller.update_product_from_sheet(producto_id, updated_data, row_idx)
+                        self.controller.update_product_from_sheet(producto_id, updated_data, row_idx, column=key, previous=previous)
         except Exception as e:
             print(f"Error al guardar edición: {e}")
             import traceback
             traceback.print_exc()
 
-    # removed _append_rows (we render page-sized product lists directly)
+    @classmethod
+    def _parse_value(cls, key, raw):
+        """Convierte el texto de una celda al valor de la columna. Lanza ValueError si no es válido."""
+        text = "" if raw is None else str(raw).strip()
+        if key in cls.PRICE_KEYS:
+            clean_value = text.replace("$", "").replace(",", "")
+            return float(clean_value) if clean_value else 0.0
+        if key in cls.INT_KEYS:
+            return int(text) if text else None
+        return str(raw) if raw else ""
+
+    def _on_bulk_change(self, event):
+        """Pegar, Supr o insertar/borrar filas desde el menú.
+
+        El sheet ya muestra el cambio: se reflejan las filas en `_productos`,
+        se validan todas las celdas en una pasada (las inválidas vuelven a su
+        valor) y el controller guarda todo junto en segundo plano.
+        """
+        if self._applying:
+            return
+        deleted_rows = [i for i in sorted(event["deleted"]["rows"] or {}) if i < len(self._productos)]
+        guardados = [i for i in deleted_rows if self._productos[i].get("id") is not None]
+        if guardados and not messagebox.askyesno(
+            "Confirmar borrado", f"¿Eliminar {len(guardados)} producto(s) de la base de datos?"
+        ):
+            # el sheet ya las sacó: volver a ponerlas donde estaban
+            for row_idx in deleted_rows:
+                self._insert_sheet_rows([list(self._shown[row_idx])], idx=row_idx)
+            self.sheet.redraw()
+            return
+        try:
+            deleted_ids = []
+            for row_idx in reversed(deleted_rows):
+                producto = self._productos.pop(row_idx)
+                del self._shown[row_idx]
+                if producto.get("id") is not None:
+                    deleted_ids.append(producto["id"])
+
+            # fila -> columna -> (texto nuevo, texto anterior)
+            changed = {}
+            added = (event["added"]["rows"] or {}).get("table") or {}
+            for row_idx in sorted(added):
+                new_product = {key: "" for key, _ in self.COLUMNS}
+                new_product["id"] = None
+                self._productos.insert(row_idx, new_product)
+                values = list(added[row_idx]) + [""] * (len(self.COLUMNS) - len(added[row_idx]))
+                self._shown.insert(row_idx, [""] * len(self.COLUMNS))
+                for col_idx, value in enumerate(values[:len(self.COLUMNS)]):
+                    if value not in (None, ""):
+                        changed.setdefault(row_idx, {})[col_idx] = (value, "")
+            for (row_idx, col_idx), old_value in (event["cells"]["table"] or {}).items():
+                if row_idx < len(self._productos) and col_idx < len(self.COLUMNS):
+                    changed.setdefault(row_idx, {})[col_idx] = (self.sheet.get_cell_data(row_idx, col_idx), old_value)
+
+            updates, creates, errors = self._validate_changes(changed)
+        except Exception as e:
+            print(f"Error al procesar el cambio masivo: {e}")
+            return
+        self._refresh_failed_rows(redraw=False)
+        self.sheet.redraw()
+        if errors:
+            detalle = "\n".join(errors[:10]) + (f"\n... y {len(errors) - 10} más" if len(errors) > 10 else "")
+            messagebox.showwarning("Valores inválidos", f"Se ignoraron {len(errors)} celdas:\n{detalle}")
+        if (updates or creates or deleted_ids) and self.controller and hasattr(self.controller, "apply_bulk_changes"):
+            self.controller.apply_bulk_changes(updates, creates, deleted_ids)
+
+    def _validate_changes(self, changed):
+        """Valida y aplica a `_productos` las celdas cambiadas. Devuelve (updates, creates, errores).
+
+        updates son (id, {columna: valor}); creates son los productos sin id
+        que ya tienen nombre. Las celdas inválidas (y el ID) vuelven a su texto anterior.
+        """
+        updates = []
+        creates = []
+        errors = []
+        for row_idx in sorted(changed):
+            producto = self._productos[row_idx]
+            data = {}
+            for col_idx, (raw, old_value) in changed[row_idx].items():
+                key, label = self.COLUMNS[col_idx]
+                # lo que quedó escrito en el sheet
+                self._shown[row_idx][col_idx] = raw
+                if key == "id":
+                    self.sheet.set_cell_data(row_idx, col_idx, old_value, redraw=False)
+                    self._shown[row_idx][col_idx] = old_value
+                    continue
+                try:
+                    data[key] = self._parse_value(key, raw)
+                except ValueError:
+                    errors.append(f"Fila {row_idx + 1}, {label}: '{raw}'")
+                    self.sheet.set_cell_data(row_idx, col_idx, old_value, redraw=False)
+                    self._shown[row_idx][col_idx] = old_value
+            if not data:
+                continue
+            producto.update(data)
+            self.patch_row(row_idx, redraw=False)
+            if producto.get("id") is not None:
+                updates.append((producto["id"], data))
+            elif producto.get("nombre"):
+                creates.append(producto)
+        return updates, creates, errors
+
+    def set_product_values(self, values):
+        """Actualiza en pantalla columnas de productos cambiadas en la base: {id: {columna: valor}}."""
+        for row_idx, p in enumerate(self._productos):
+            cambios = values.get(p.get("id"))
+            if cambios:
+                p.update(cambios)
+                self.patch_row(row_idx, redraw=False)
+        self.sheet.redraw()
+
+    def refresh_products(self, productos):
+        """Vuelve a mostrar las filas de estos productos (p. ej. al recibir su id)."""
+        ids = {id(p) for p in productos}
+        for row_idx, p in enumerate(self._productos):
+            if id(p) in ids:
+                self.patch_row(row_idx, redraw=False)
+        self.sheet.redraw()
+
+    def start_progress(self, text):
+        self.progress_label.configure(text=text)
+        self.progress_bar.set(0)
+        self.progress_label.pack(side="left", padx=(12, 6))
+        self.progress_bar.pack(side="left")
+
+    def set_progress(self, fraction):
+        self.progress_bar.set(min(1.0, max(0.0, fraction)))
+
+    def stop_progress(self):
+        self.progress_bar.pack_forget()
+        self.progress_label.pack_forget()
+
     
     def add_new_row(self):
         """Agrega una fila vacía al inicio del sheet para crear un nuevo producto."""
@@ -345,8 +651,10 @@ class ProductsView(ctk.CTkFrame):
         new_product["id"] = None  # Sin ID todavía
         self._productos.insert(0, new_product)
         
-        # Reconstruir la vista con el nuevo producto incluido
-        self.build_rows()
+        # Insertar solo la fila nueva
+        row = self._display_row(new_product)
+        self._insert_sheet_rows([list(row)], idx=0)
+        self._shown.insert(0, row)
         
         # Seleccionar la primera fila, columna "nombre" (segunda columna)
         self.sheet.see(0, 0)
@@ -374,22 +682,9 @@ class ProductsView(ctk.CTkFrame):
     def set_page(self, rows, page, page_size, total):
         """Recibe una página de resultados desde el controller y actualiza la vista."""
         try:
-            self._productos = list(rows or [])
             self._current_page = page
             self.PAGE_SIZE = page_size
-            self._total = total
-
-            total_pages = max(1, (total + page_size - 1) // page_size)
-            self.page_label.configure(text=f"Página {page+1} / {total_pages}")
-            # habilitar/deshabilitar botones
-            if page <= 0:
-                self.prev_btn.configure(state="disabled")
-            else:
-                self.prev_btn.configure(state="normal")
-            if page >= total_pages - 1:
-                self.next_btn.configure(state="disabled")
-            else:
-                self.next_btn.configure(state="normal")
+            self.set_total(total)
 
             # limpiar selección previa
             try:
@@ -401,20 +696,43 @@ class ProductsView(ctk.CTkFrame):
             self._selected_id = None
             self.btn_borrar.configure(state="disabled")
 
-            self.build_rows()
+            # al refrescar la misma página solo cambian algunas filas
+            self.apply_rows(rows)
         except Exception:
             pass
 
-    def _change_page(self, delta):
-        """Cambia la página relativa (delta = -1 o +1) y pide datos al controller."""
-        new_page = max(0, self._current_page + delta)
-        # limitar según total
+    def set_total(self, total):
+        """Actualiza el total de resultados (p. ej. tras altas o bajas) y los controles de página."""
+        self._total = total
+        total_pages = max(1, (total + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+        page = self._current_page
+        self.page_label.configure(text=f"Página {page+1} / {total_pages}")
+        # habilitar/deshabilitar botones
+        state_prev = "disabled" if page <= 0 else "normal"
+        state_next = "disabled" if page >= total_pages - 1 else "normal"
+        self.first_btn.configure(state=state_prev)
+        self.prev_btn.configure(state=state_prev)
+        self.next_btn.configure(state=state_next)
+        self.last_btn.configure(state=state_next)
+
+    def _change_page(self, delta=0, page=None):
+        """Cambia de página y pide datos al controller.
+
+        `delta` es relativo (-1 / +1); `page` es absoluta (0 = primera, -1 = última).
+        """
+        total_pages = 1
         try:
             total_pages = max(1, (self._total + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
-            if new_page >= total_pages:
-                new_page = total_pages - 1
         except Exception:
             pass
+        if page is None:
+            new_page = self._current_page + delta
+        elif page < 0:
+            new_page = total_pages - 1
+        else:
+            new_page = page
+        # limitar según total
+        new_page = max(0, min(new_page, total_pages - 1))
 
         if self.controller and hasattr(self.controller, "search_products"):
             try:
@@ -422,6 +740,113 @@ class ProductsView(ctk.CTkFrame):
             except Exception:
                 pass
 
+    # === Scroll continuo ===
+
+    def _on_toggle_infinite(self):
+        enabled = bool(self.infinite_switch.get())
+        self.set_infinite_mode(enabled)
+        if self.controller and hasattr(self.controller, "set_infinite_mode"):
+            self.controller.set_infinite_mode(enabled)
+
+    def set_infinite_mode(self, enabled):
+        """Alterna entre páginas de PAGE_SIZE filas y scroll continuo."""
+        self._infinite = enabled
+        state = "disabled" if enabled else "normal"
+        for widget in (self.first_btn, self.prev_btn, self.next_btn, self.last_btn, self.goto_entry):
+            widget.configure(state=state)
+        if enabled:
+            self.sheet.hide("y_scrollbar")
+            self.virtual_scroll.pack(side="right", fill="y", pady=10, before=self.sheet)
+        else:
+            self.virtual_scroll.pack_forget()
+            self.sheet.show("y_scrollbar")
+
+    def apply_window_change(self, kind, count, dropped, window):
+        """Refleja en el sheet un cambio de la ventana de filas (ver controllers/row_window.py).
+
+        Solo se insertan/borran las filas que cambiaron, manteniendo a la vista
+        la misma fila aunque se descarten filas de arriba.
+        """
+        self._productos = window.rows
+        self._total = window.total
+        if kind == "reset" or self.sheet.get_total_rows() != len(window.rows) - count + dropped:
+            self.build_rows()
+            self.sheet.see(0, 0, keep_xscroll=True, bottom_right_corner=False, check_cell_visibility=False)
+            self._update_virtual_scroll(window)
+            return
+        first_visible = self.sheet.visible_rows[0]
+        if kind == "append":
+            new_rows = [self._display_row(p) for p in window.rows[len(window.rows) - count:]]
+            self._insert_sheet_rows([list(r) for r in new_rows])
+            self._shown.extend(new_rows)
+            if dropped:
+                self._delete_sheet_rows(range(dropped))
+                del self._shown[:dropped]
+            first_visible = max(0, first_visible - dropped)
+        else:
+            new_rows = [self._display_row(p) for p in window.rows[:count]]
+            if dropped:
+                total_rows = self.sheet.get_total_rows()
+                self._delete_sheet_rows(range(total_rows - dropped, total_rows))
+                del self._shown[-dropped:]
+            self._insert_sheet_rows([list(r) for r in new_rows], idx=0)
+            self._shown[:0] = new_rows
+            first_visible += count
+        self._fit_nombre_width(new_rows, redraw=False)
+        self._refresh_failed_rows(redraw=False)
+        self.sheet.see(first_visible, 0, keep_xscroll=True, bottom_right_corner=False, check_cell_visibility=False, redraw=True)
+        self._update_virtual_scroll(window)
+
+    def _update_virtual_scroll(self, window=None):
+        window = window or getattr(self.controller, "_window", None)
+        if window is None or not window.total:
+            self.virtual_scroll.set(0.0, 1.0)
+            return
+        first, last = self.sheet.visible_rows
+        lo = (window.start + first) / window.total
+        hi = (window.start + last) / window.total
+        self.virtual_scroll.set(min(lo, 1.0), min(max(hi, lo), 1.0))
+
+    def _on_sheet_redrawn(self, event=None):
+        """Al desplazarse el sheet, pedir más filas si se acerca a un borde de la ventana."""
+        if not self._infinite:
+            return
+        first, last = self.sheet.visible_rows
+        if self.controller and hasattr(self.controller, "on_window_scroll"):
+            self.controller.on_window_scroll(first, last)
+        self._update_virtual_scroll()
+
+    def _on_virtual_scroll(self, *args):
+        """Comando de la barra virtual: flechas/rueda desplazan el sheet, arrastrar salta de posición."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            # esperar a que termine el arrastre antes de pedir la nueva zona
+            if self._jump_after_id:
+                self.after_cancel(self._jump_after_id)
+            fraction = float(args[1])
+            self.virtual_scroll.set(fraction, fraction)
+            self._jump_after_id = self.after(150, lambda: self._jump_to(fraction))
+        elif args[0] == "scroll":
+            first, last = self.sheet.visible_rows
+            step = int(args[1]) * (max(1, last - first) if args[2] == "pages" else 3)
+            row = max(0, min(first + step, self.sheet.get_total_rows() - 1))
+            self.sheet.see(row, 0, keep_xscroll=True, bottom_right_corner=False, check_cell_visibility=False)
+
+    def _jump_to(self, fraction):
+        self._jump_after_id = None
+        if self.controller and hasattr(self.controller, "on_window_jump"):
+            self.controller.on_window_jump(fraction)
+
+    def _on_goto_page(self):
+        """Salta al número de página escrito en el campo 'Ir a'."""
+        try:
+            page = int(self.goto_entry.get().strip()) - 1
+        except ValueError:
+            return
+        self.goto_entry.delete(0, "end")
+        self._change_page(page=max(0, page))
+
     def _on_delete(self):
         """Handler para el botón Borrar: confirma y delega al controller, luego actualiza la vista localmente."""
         if self._selected_id is None:
@@ -441,7 +866,7 @@ class ProductsView(ctk.CTkFrame):
 
         # también actualizar la lista local y la lista completa para mantener consistencia
         try:
-            self._productos = [p for p in self._productos if p.get("id") != self._selected_id]
+            self.apply_rows([p for p in self._productos if p.get("id") != self._selected_id])
         except Exception:
             pass
         try:
@@ -458,8 +883,5 @@ class ProductsView(ctk.CTkFrame):
         self._selected_widget = None
         self._selected_id = None
         self.btn_borrar.configure(state="disabled")
-
-        # reconstruir filas
-        self.build_rows()
     
 
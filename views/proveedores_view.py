@@ -1,6 +1,8 @@
 import customtkinter as ctk
 from tkinter import messagebox
 
+from views.virtual_grid import VirtualGrid
+
 
 class ProveedoresView(ctk.CTkFrame):
     """Vista de proveedores con grid en lugar de tksheet."""
@@ -22,8 +24,6 @@ class ProveedoresView(ctk.CTkFrame):
         # datos internos
         self._proveedores = []
         self._selected_proveedor = None
-        self._selected_row_idx = None
-        self._row_widgets = []
         self._editing_row = None
 
         # barra de herramientas
@@ -67,138 +67,52 @@ class ProveedoresView(ctk.CTkFrame):
         titulo = ctk.CTkLabel(self, text="Proveedores", font=ctk.CTkFont(size=22, weight="bold"))
         titulo.pack(anchor="nw", pady=(2, 8), padx=10)
 
-        # Grid container con scroll
-        grid_container = ctk.CTkFrame(self, fg_color="transparent")
-        grid_container.pack(fill="both", expand=True, padx=10, pady=(0, 10))
-
-        # Canvas y scrollbar
-        self.canvas = ctk.CTkCanvas(grid_container, bg="#2b2b2b", highlightthickness=0)
-        scrollbar = ctk.CTkScrollbar(grid_container, command=self.canvas.yview)
-        self.scrollable_grid = ctk.CTkFrame(self.canvas, fg_color="transparent")
-
-        self.scrollable_grid.grid_columnconfigure(0, weight=1)
-
-        self.scrollable_window = self.canvas.create_window((0, 0), window=self.scrollable_grid, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        # paginación (Anterior / Página / Siguiente), abajo de la grilla
+        self.pagination_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.pagination_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+        self.prev_btn = ctk.CTkButton(self.pagination_frame, text="Anterior", width=100, fg_color="#9e9e9e", hover_color="#7e7e7e", text_color="#ffffff")
+        self.prev_btn.pack(side="left", padx=(0, 6))
+        self.page_label = ctk.CTkLabel(self.pagination_frame, text="Página 0 / 0")
+        self.page_label.pack(side="left")
+        self.next_btn = ctk.CTkButton(self.pagination_frame, text="Siguiente", width=100, fg_color="#4CAF50", hover_color="#43A047", text_color="#ffffff")
+        self.next_btn.pack(side="left", padx=(6, 0))
 
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        # Ajustar tamaño del frame al canvas
-        def resize_scrollable_frame(event):
-            self.canvas.itemconfig(self.scrollable_window, width=event.width)
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        self.canvas.bind("<Configure>", resize_scrollable_frame)
-
-        # Crear header
-        self._create_grid_header()
+        # Grilla virtualizada: solo existen los widgets de las filas visibles
+        self.tabla = VirtualGrid(self, self.COLUMNS, on_select=self._on_row_select)
+        self.tabla.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
         # Cargar datos iniciales
         self.build_rows()
 
-    def _create_grid_header(self):
-        """Crea el encabezado de la tabla con grid."""
-        header_frame = ctk.CTkFrame(self.scrollable_grid, fg_color="#bfecc0", corner_radius=0)
-        header_frame.grid(row=0, column=0, sticky="ew", padx=0, pady=0)
-        
-        for i, (key, label, width) in enumerate(self.COLUMNS):
-            header_frame.grid_columnconfigure(i, minsize=width)
-            lbl = ctk.CTkLabel(
-                header_frame,
-                text=label,
-                font=ctk.CTkFont(size=11, weight="bold"),
-                text_color="#000000",
-                anchor="w"
-            )
-            lbl.grid(row=0, column=i, padx=10, pady=8, sticky="ew")
-
     def build_rows(self, proveedores=None):
-        """Carga los datos en el grid desde `self._proveedores` o `proveedores` si se provee."""
+        """Carga los datos en la grilla desde `self._proveedores` o `proveedores` si se provee."""
         if proveedores is not None:
             self._proveedores = list(proveedores)
+        self.tabla.set_rows(self._proveedores)
+        # la selección se conserva si el proveedor sigue en la lista
+        self._on_row_select(self.tabla.selected_row())
 
-        # Limpiar filas anteriores (excepto header en row 0)
-        for widget_list in self._row_widgets:
-            for widget in widget_list:
-                widget.destroy()
-        self._row_widgets.clear()
-        self._selected_row_idx = None
-        self._selected_proveedor = None
-
-        # Limitar a 50 registros
-        proveedores_display = self._proveedores[:50]
-
-        for idx, prov in enumerate(proveedores_display):
-            row_num = idx + 1  # Header está en row 0
-            row_frame = ctk.CTkFrame(self.scrollable_grid, fg_color="#f9f9f9" if idx % 2 == 0 else "#ffffff", corner_radius=0)
-            row_frame.grid(row=row_num, column=0, sticky="ew", padx=0, pady=0)
-
-            # Configurar columnas
-            for i, (key, label, width) in enumerate(self.COLUMNS):
-                row_frame.grid_columnconfigure(i, minsize=width)
-
-            row_widgets = []
-
-            # Nombre
-            nombre_val = prov.get("nombre", "")
-            lbl_nombre = ctk.CTkLabel(row_frame, text=str(nombre_val), anchor="w")
-            lbl_nombre.grid(row=0, column=0, padx=10, pady=8, sticky="ew")
-            row_widgets.append(lbl_nombre)
-
-            # Teléfono
-            telefono_val = prov.get("telefono", "")
-            lbl_telefono = ctk.CTkLabel(row_frame, text=str(telefono_val), anchor="w")
-            lbl_telefono.grid(row=0, column=1, padx=10, pady=8, sticky="ew")
-            row_widgets.append(lbl_telefono)
-
-            # Saldo
-            saldo_val = prov.get("saldo", "")
-            lbl_saldo = ctk.CTkLabel(row_frame, text=str(saldo_val), anchor="w")
-            lbl_saldo.grid(row=0, column=2, padx=10, pady=8, sticky="ew")
-            row_widgets.append(lbl_saldo)
-
-            # Hacer clickeable la fila para seleccionar
-            for widget in row_widgets:
-                widget.bind("<Button-1>", lambda e, r=idx, p=prov: self._on_row_select(r, p))
-
-            self._row_widgets.append(row_widgets)
-
-        # Actualizar scroll region
-        self.scrollable_grid.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-    def _on_row_select(self, row_idx, proveedor):
-        """Selecciona una fila visualmente y habilita botones."""
-        # Deseleccionar fila anterior
-        if self._selected_row_idx is not None and self._selected_row_idx < len(self._row_widgets):
-            for widget in self._row_widgets[self._selected_row_idx]:
-                widget.configure(text_color="black")
-
-        # Seleccionar nueva fila
-        self._selected_row_idx = row_idx
+    def _on_row_select(self, proveedor):
+        """Recuerda el proveedor elegido y habilita los botones."""
         self._selected_proveedor = proveedor
-
-        if row_idx < len(self._row_widgets):
-            for widget in self._row_widgets[row_idx]:
-                widget.configure(text_color="#2196F3")
-
-        self.btn_borrar.configure(state="normal")
-        self.btn_ver_saldo.configure(state="normal")
-        self.btn_editar.configure(state="normal")
+        state = "normal" if proveedor else "disabled"
+        self.btn_borrar.configure(state=state)
+        self.btn_ver_saldo.configure(state=state)
+        self.btn_editar.configure(state=state)
 
     def add_new_row(self):
-        """Inserta una fila editable en posición 1 con campos de entrada y botones Guardar/Cancelar."""
+        """Muestra una fila editable arriba de la grilla con campos de entrada y botones Guardar/Cancelar."""
         if self._editing_row is not None:
             messagebox.showwarning("Advertencia", "Ya hay una fila en edición")
             return
 
-        # Crear frame editable en row 1
-        edit_frame = ctk.CTkFrame(self.scrollable_grid, fg_color="#fff3cd", corner_radius=0)
-        edit_frame.grid(row=1, column=0, sticky="ew", padx=0, pady=0)
+        # Fila editable arriba de la grilla
+        edit_frame = ctk.CTkFrame(self, fg_color="#fff3cd", corner_radius=0)
+        edit_frame.pack(fill="x", padx=10, pady=(0, 6), before=self.tabla)
 
-        # Configurar columnas
+        # Configurar columnas (mismas proporciones que la grilla)
         for i, (key, label, width) in enumerate(self.COLUMNS):
-            edit_frame.grid_columnconfigure(i, minsize=width)
+            edit_frame.grid_columnconfigure(i, weight=width)
 
         # Nombre (editable)
         entry_nombre = ctk.CTkEntry(edit_frame, placeholder_text="Nombre")
@@ -214,8 +128,8 @@ class ProveedoresView(ctk.CTkFrame):
         entry_saldo.grid(row=0, column=2, padx=10, pady=8, sticky="ew")
 
         # Botones Guardar y Cancelar
-        btn_frame = ctk.CTkFrame(self.scrollable_grid, fg_color="transparent")
-        btn_frame.grid(row=2, column=0, sticky="w", padx=10, pady=5)
+        btn_frame = ctk.CTkFrame(edit_frame, fg_color="transparent")
+        btn_frame.grid(row=1, column=0, columnspan=len(self.COLUMNS), sticky="w", padx=5, pady=(0, 5))
 
         btn_guardar = ctk.CTkButton(btn_frame, text="Guardar", width=100, fg_color="#4CAF50", hover_color="#43A047")
         btn_guardar.pack(side="left", padx=5)
@@ -226,7 +140,6 @@ class ProveedoresView(ctk.CTkFrame):
         # Guardar referencias
         self._editing_row = {
             "edit_frame": edit_frame,
-            "btn_frame": btn_frame,
             "entries": {
                 "nombre": entry_nombre,
                 "telefono": entry_telefono,
@@ -234,18 +147,10 @@ class ProveedoresView(ctk.CTkFrame):
             }
         }
 
-        # Mover todas las filas existentes hacia abajo
-        for idx in range(len(self._row_widgets)):
-            row_num = idx + 3  # Header=0, edit=1, buttons=2, data starts at 3
-            frame_parent = self._row_widgets[idx][0].master
-            frame_parent.grid(row=row_num)
-
         # Configurar comandos
         btn_guardar.configure(command=self._on_guardar_nuevo_proveedor)
         btn_cancelar.configure(command=self._on_cancelar_nuevo_proveedor)
 
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
     def _on_guardar_nuevo_proveedor(self):
         """Valida y guarda el nuevo proveedor."""
         if self._editing_row is None:
@@ -285,14 +190,10 @@ class ProveedoresView(ctk.CTkFrame):
         if self._editing_row is None:
             return
 
-        # Destruir widgets
+        # Destruir widgets (los botones están dentro del frame)
         self._editing_row["edit_frame"].destroy()
-        self._editing_row["btn_frame"].destroy()
         self._editing_row = None
 
-        # Restaurar posiciones de filas
-        self.build_rows()
-
     def delete_selected(self):
         """Elimina el proveedor seleccionado delegando al controller si existe."""
         if self._selected_proveedor is None:
@@ -317,21 +218,19 @@ class ProveedoresView(ctk.CTkFrame):
         except Exception:
             pass
 
-        self._selected_proveedor = None
-        self.btn_borrar.configure(state="disabled")
-        self.btn_ver_saldo.configure(state="disabled")
-        self.btn_editar.configure(state="disabled")
         self.build_rows()
 
     def set_proveedores(self, proveedores_list):
-        """Recibe una lista de proveedores y recarga la vista."""
+        """Recibe una lista de proveedores y recarga la vista (la selección se conserva por id)."""
         self._proveedores = list(proveedores_list or [])
-        self._selected_proveedor = None
-        self.btn_borrar.configure(state="disabled")
-        self.btn_ver_saldo.configure(state="disabled")
-        self.btn_editar.configure(state="disabled")
         self.build_rows()
 
+    def update_pagination_info(self, current_page, total_pages, total):
+        """Actualiza el indicador de página y habilita/deshabilita los botones."""
+        self.page_label.configure(text=f"Página {current_page} / {total_pages}  ({total} proveedores)")
+        self.prev_btn.configure(state="disabled" if current_page <= 1 else "normal")
+        self.next_btn.configure(state="disabled" if current_page >= total_pages else "normal")
+
     def get_search_query(self):
         return self.search_entry.get().strip()
 
@@ -0,0 +1,226 @@
+import customtkinter as ctk
+from tksheet import Sheet
+
+
+class ReglasPreciosWindow(ctk.CTkToplevel):
+    """Ventana para editar las reglas de margen y recalcular los precios de venta."""
+
+    # opciones de redondeo: texto -> valor de reglas_precios.redondeo
+    REDONDEOS = {
+        "Escalonado": None,
+        "Sin redondeo": 0,
+        "Múltiplo de 5": 5,
+        "Múltiplo de 10": 10,
+        "Múltiplo de 50": 50,
+        "Múltiplo de 100": 100,
+        "Múltiplo de 1000": 1000,
+    }
+    TODAS = "(todas)"
+    TODOS = "(todos)"
+
+    def __init__(self, parent, controller=None, categorias=(), proveedores=()):
+        super().__init__(parent)
+        self.controller = controller
+
+        self.title("Reglas de precios")
+        self.geometry("900x680")
+        self.minsize(800, 560)
+        self.resizable(True, True)
+
+        self.transient(parent)
+        self.grab_set()
+
+        # nombre mostrado -> id (None = cualquiera)
+        self._categorias = {self.TODAS: None}
+        self._categorias.update({f"{c['nombre']} ({c['id']})": c["id"] for c in categorias})
+        self._proveedores = {self.TODOS: None}
+        self._proveedores.update({f"{p['nombre']} ({p['id']})": p["id"] for p in proveedores})
+        self.reglas = []
+        self.regla_seleccionada_idx = None
+
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """Configura la interfaz de usuario."""
+        header = ctk.CTkFrame(self, fg_color="#3F51B5", height=60)
+        header.pack(fill="x", padx=0, pady=0)
+        header.pack_propagate(False)
+        ctk.CTkLabel(
+            header,
+            text="Reglas de precios",
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="white"
+        ).pack(pady=15)
+
+        ctk.CTkLabel(
+            self,
+            text="Precio de venta = costo + margen. Se usa la regla más específica: "
+                 "categoría y proveedor, solo proveedor, solo categoría o la general.",
+            font=ctk.CTkFont(size=12),
+            text_color="gray",
+            wraplength=840,
+            justify="left",
+        ).pack(anchor="w", padx=20, pady=(10, 0))
+
+        # Alta / modificación de una regla
+        form = ctk.CTkFrame(self, fg_color="transparent")
+        form.pack(fill="x", padx=20, pady=(10, 5))
+
+        ctk.CTkLabel(form, text="Categoría:").grid(row=0, column=0, sticky="w", padx=(0, 6), pady=5)
+        self.option_categoria = ctk.CTkOptionMenu(form, values=list(self._categorias), width=200)
+        self.option_categoria.grid(row=0, column=1, sticky="w", padx=(0, 12), pady=5)
+
+        ctk.CTkLabel(form, text="Proveedor:").grid(row=0, column=2, sticky="w", padx=(0, 6), pady=5)
+        self.option_proveedor = ctk.CTkOptionMenu(form, values=list(self._proveedores), width=200)
+        self.option_proveedor.grid(row=0, column=3, sticky="w", padx=(0, 12), pady=5)
+
+        ctk.CTkLabel(form, text="Margen %:").grid(row=1, column=0, sticky="w", padx=(0, 6), pady=5)
+        self.entry_margen = ctk.CTkEntry(form, placeholder_text="Ej: 45", width=100)
+        self.entry_margen.grid(row=1, column=1, sticky="w", padx=(0, 12), pady=5)
+
+        ctk.CTkLabel(form, text="Redondeo:").grid(row=1, column=2, sticky="w", padx=(0, 6), pady=5)
+        self.option_redondeo = ctk.CTkOptionMenu(form, values=list(self.REDONDEOS), width=200)
+        self.option_redondeo.grid(row=1, column=3, sticky="w", padx=(0, 12), pady=5)
+
+        self.btn_guardar = ctk.CTkButton(form, text="Guardar regla", width=120, fg_color="#4CAF50", hover_color="#43A047")
+        self.btn_guardar.grid(row=0, column=4, padx=5, pady=5)
+        self.btn_borrar = ctk.CTkButton(form, text="Borrar regla", width=120, fg_color="#f44336", hover_color="#d32f2f")
+        self.btn_borrar.grid(row=1, column=4, padx=5, pady=5)
+
+        # Reglas cargadas
+        self.sheet_reglas = Sheet(
+            self,
+            headers=["Categoría", "Proveedor", "Margen %", "Redondeo"],
+            theme="dark",
+            height=170,
+        )
+        self.sheet_reglas.enable_bindings("single_select", "row_select", "arrowkeys", "column_width_resize")
+        self.sheet_reglas.pack(fill="x", padx=20, pady=(5, 10))
+        for col, width in enumerate((240, 240, 100, 160)):
+            self.sheet_reglas.column_width(column=col, width=width)
+        self.sheet_reglas.bind("<<SheetSelect>>", self._on_regla_select)
+
+        # Vista previa y aplicación
+        acciones = ctk.CTkFrame(self, fg_color="transparent")
+        acciones.pack(fill="x", padx=20, pady=(5, 5))
+        self.btn_preview = ctk.CTkButton(acciones, text="Vista previa", width=120, fg_color="#2196F3", hover_color="#1976D2")
+        self.btn_preview.pack(side="left")
+        self.btn_aplicar = ctk.CTkButton(
+            acciones,
+            text="Aplicar a los precios",
+            width=160,
+            fg_color="#FF5722",
+            hover_color="#E64A19",
+            font=ctk.CTkFont(size=13, weight="bold"),
+        )
+        self.btn_aplicar.pack(side="left", padx=10)
+        self.resumen_label = ctk.CTkLabel(acciones, text="", font=ctk.CTkFont(size=12), text_color="gray")
+        self.resumen_label.pack(side="left", padx=10)
+
+        # Ejemplos de precios que cambiarían
+        self.sheet_cambios = Sheet(
+            self,
+            headers=["ID", "Nombre", "Precio Actual", "Precio Nuevo"],
+            theme="dark",
+            height=200,
+        )
+        self.sheet_cambios.enable_bindings("single_select", "arrowkeys", "column_width_resize", "copy")
+        self.sheet_cambios.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+        for col, width in enumerate((80, 420, 150, 150)):
+            self.sheet_cambios.column_width(column=col, width=width)
+
+        botones_frame = ctk.CTkFrame(self, fg_color="transparent")
+        botones_frame.pack(fill="x", padx=20, pady=(5, 15))
+        ctk.CTkButton(
+            botones_frame,
+            text="Cerrar",
+            width=100,
+            fg_color="#9e9e9e",
+            hover_color="#7e7e7e",
+            command=self.destroy
+        ).pack(side="right")
+
+    @classmethod
+    def texto_redondeo(cls, redondeo):
+        for texto, valor in cls.REDONDEOS.items():
+            if valor == redondeo:
+                return texto
+        return f"Múltiplo de {redondeo}"
+
+    @staticmethod
+    def _formato_precio(valor):
+        try:
+            return f"${float(valor or 0):,.2f}"
+        except (TypeError, ValueError):
+            # hay precios cargados como texto
+            return str(valor)
+
+    def cargar_reglas(self, reglas):
+        """Muestra las reglas (ver ProductsModel.list_price_rules)."""
+        self.reglas = list(reglas)
+        self.regla_seleccionada_idx = None
+        self.sheet_reglas.set_sheet_data(
+            [
+                [
+                    r["categoria"] or (self.TODAS if r["id_categoria"] is None else str(r["id_categoria"])),
+                    r["proveedor"] or (self.TODOS if r["id_proveedor"] is None else str(r["id_proveedor"])),
+                    f"{r['margen']:g}",
+                    self.texto_redondeo(r["redondeo"]),
+                ]
+                for r in self.reglas
+            ],
+            reset_col_positions=False,
+        )
+
+    def _on_regla_select(self, event=None):
+        """Copia la regla seleccionada al formulario para modificarla."""
+        selected = self.sheet_reglas.get_currently_selected()
+        if not selected or selected.row is None or not 0 <= selected.row < len(self.reglas):
+            return
+        self.regla_seleccionada_idx = selected.row
+        regla = self.reglas[selected.row]
+        for nombre, valor in self._categorias.items():
+            if valor == regla["id_categoria"]:
+                self.option_categoria.set(nombre)
+        for nombre, valor in self._proveedores.items():
+            if valor == regla["id_proveedor"]:
+                self.option_proveedor.set(nombre)
+        self.entry_margen.delete(0, "end")
+        self.entry_margen.insert(0, f"{regla['margen']:g}")
+        self.option_redondeo.set(self.texto_redondeo(regla["redondeo"]))
+
+    def regla_ingresada(self):
+        """(id_categoria, id_proveedor, margen, redondeo) del formulario. El margen queda como texto."""
+        return (
+            self._categorias.get(self.option_categoria.get()),
+            self._proveedores.get(self.option_proveedor.get()),
+            self.entry_margen.get().strip(),
+            self.REDONDEOS.get(self.option_redondeo.get()),
+        )
+
+    def regla_seleccionada(self):
+        if self.regla_seleccionada_idx is None:
+            return None
+        return self.reglas[self.regla_seleccionada_idx]
+
+    def mostrar_resumen(self, resumen):
+        """Muestra el resultado de ProductsModel.apply_price_rules(dry_run=True)."""
+        if resumen is None:
+            self.resumen_label.configure(text="No se pudo calcular la vista previa")
+            return
+        self.resumen_label.configure(
+            text=f"{resumen['count']} de {resumen['matched']} precios cambian · "
+                 f"${resumen['before']:,.2f} → ${resumen['after']:,.2f}"
+        )
+        self.sheet_cambios.set_sheet_data(
+            [
+                [
+                    str(c["id"]),
+                    c["nombre"] or "",
+                    self._formato_precio(c["precio_anterior"]),
+                    self._formato_precio(c["precio_nuevo"]),
+                ]
+                for c in resumen["sample"]
+            ],
+            reset_col_positions=False,
+        )
@@ -114,6 +114,16 @@ class SaldosProveedoresView(ctk.CTkFrame):
         )
         self.btn_exportar_pdf.pack(fill="x", pady=5)
         
+        self.btn_exportar_movimientos = ctk.CTkButton(
+            botones_frame,
+            text="📊 Exportar Movimientos",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color="#607D8B",
+            hover_color="#546E7A",
+            height=40
+        )
+        self.btn_exportar_movimientos.pack(fill="x", pady=5)
+        
         # Columna derecha: Lista de movimientos con GRID
         right_column = ctk.CTkFrame(main_frame, fg_color="#2b2b2b", corner_radius=10)
         right_column.grid(row=0, column=1, sticky="nsew", padx=(10, 0))
@@ -1,6 +1,8 @@
 import customtkinter as ctk
 from tkinter import messagebox
 
+from views.virtual_grid import VirtualGrid
+
 
 class SubcategoriasView(ctk.CTkFrame):
     """Vista de subcategorías con grid en lugar de tksheet."""
@@ -18,8 +20,6 @@ class SubcategoriasView(ctk.CTkFrame):
         # datos locales
         self._subcategorias = list(subcategorias or [])
         self._selected_id = None
-        self._selected_row_idx = None
-        self._row_widgets = []
         self._editing_row = None
 
         # Acciones en una sola fila (más compacto)
@@ -42,131 +42,41 @@ class SubcategoriasView(ctk.CTkFrame):
         titulo = ctk.CTkLabel(self, text="Subcategorías", font=ctk.CTkFont(size=18, weight="bold"))
         titulo.pack(anchor="nw", pady=(6, 8), padx=10)
 
-        # Grid container con scroll
-        grid_container = ctk.CTkFrame(self, fg_color="transparent")
-        grid_container.pack(fill="both", expand=True, padx=10, pady=(0, 10))
-
-        # Canvas y scrollbar
-        self.canvas = ctk.CTkCanvas(grid_container, bg="#2b2b2b", highlightthickness=0)
-        scrollbar = ctk.CTkScrollbar(grid_container, command=self.canvas.yview)
-        self.scrollable_grid = ctk.CTkFrame(self.canvas, fg_color="transparent")
-
-        self.scrollable_grid.grid_columnconfigure(0, weight=1)
-
-        self.scrollable_window = self.canvas.create_window((0, 0), window=self.scrollable_grid, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        # Ajustar tamaño del frame al canvas
-        def resize_scrollable_frame(event):
-            self.canvas.itemconfig(self.scrollable_window, width=event.width)
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        self.canvas.bind("<Configure>", resize_scrollable_frame)
-
-        # Crear header
-        self._create_grid_header()
+        # Grilla virtualizada: solo existen los widgets de las filas visibles
+        self.tabla = VirtualGrid(self, self.COLUMNS, on_select=self._on_row_select)
+        self.tabla.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
         # Cargar datos iniciales
         self.build_rows()
 
-    def _create_grid_header(self):
-        """Crea el encabezado de la tabla con grid."""
-        header_frame = ctk.CTkFrame(self.scrollable_grid, fg_color="#bfecc0", corner_radius=0)
-        header_frame.grid(row=0, column=0, sticky="ew", padx=0, pady=0)
-        
-        for i, (key, label, width) in enumerate(self.COLUMNS):
-            header_frame.grid_columnconfigure(i, minsize=width)
-            lbl = ctk.CTkLabel(
-                header_frame,
-                text=label,
-                font=ctk.CTkFont(size=11, weight="bold"),
-                text_color="#000000",
-                anchor="w"
-            )
-            lbl.grid(row=0, column=i, padx=10, pady=8, sticky="ew")
-
     def build_rows(self, subcategorias=None):
-        """Carga los datos en el grid desde `self._subcategorias` o `subcategorias` si se provee."""
+        """Carga los datos en la grilla desde `self._subcategorias` o `subcategorias` si se provee."""
         if subcategorias is not None:
             self._subcategorias = list(subcategorias)
+        self.tabla.set_rows(self._subcategorias)
+        # la selección se conserva si la subcategoría sigue en la lista
+        self._on_row_select(self.tabla.selected_row())
 
-        # Limpiar filas anteriores (excepto header en row 0)
-        for widget_list in self._row_widgets:
-            for widget in widget_list:
-                widget.destroy()
-        self._row_widgets.clear()
-        self._selected_row_idx = None
-        self._selected_id = None
-
-        # Limitar a 50 registros
-        subcategorias_display = self._subcategorias[:50]
-
-        for idx, sub in enumerate(subcategorias_display):
-            row_num = idx + 1  # Header está en row 0
-            row_frame = ctk.CTkFrame(self.scrollable_grid, fg_color="#f9f9f9" if idx % 2 == 0 else "#ffffff", corner_radius=0)
-            row_frame.grid(row=row_num, column=0, sticky="ew", padx=0, pady=0)
-
-            # Configurar columnas
-            for i, (key, label, width) in enumerate(self.COLUMNS):
-                row_frame.grid_columnconfigure(i, minsize=width)
-
-            row_widgets = []
-
-            # ID
-            id_val = sub.get("id", "")
-            lbl_id = ctk.CTkLabel(row_frame, text=str(id_val) if id_val else "", anchor="w")
-            lbl_id.grid(row=0, column=0, padx=10, pady=8, sticky="ew")
-            row_widgets.append(lbl_id)
-
-            # Nombre
-            nombre_val = sub.get("nombre", "")
-            lbl_nombre = ctk.CTkLabel(row_frame, text=str(nombre_val), anchor="w")
-            lbl_nombre.grid(row=0, column=1, padx=10, pady=8, sticky="ew")
-            row_widgets.append(lbl_nombre)
-
-            # Hacer clickeable la fila para seleccionar
-            for widget in row_widgets:
-                widget.bind("<Button-1>", lambda e, r=idx, s_id=sub.get("id"): self._on_row_select(r, s_id))
-
-            self._row_widgets.append(row_widgets)
-
-        # Actualizar scroll region
-        self.scrollable_grid.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-    def _on_row_select(self, row_idx, sub_id):
-        """Selecciona una fila visualmente y habilita botones."""
-        # Deseleccionar fila anterior
-        if self._selected_row_idx is not None and self._selected_row_idx < len(self._row_widgets):
-            for widget in self._row_widgets[self._selected_row_idx]:
-                widget.configure(text_color="black")
-
-        # Seleccionar nueva fila
-        self._selected_row_idx = row_idx
-        self._selected_id = sub_id
-
-        if row_idx < len(self._row_widgets):
-            for widget in self._row_widgets[row_idx]:
-                widget.configure(text_color="#2196F3")
-
-        self.btn_borrar.configure(state="normal")
-        self.btn_editar.configure(state="normal")
+    def _on_row_select(self, sub):
+        """Recuerda la subcategoría elegida y habilita los botones."""
+        self._selected_id = sub.get("id") if sub else None
+        state = "normal" if sub else "disabled"
+        self.btn_borrar.configure(state=state)
+        self.btn_editar.configure(state=state)
 
     def add_new_row(self):
-        """Inserta una fila editable en posición 1 con campos de entrada y botones Guardar/Cancelar."""
+        """Muestra una fila editable arriba de la grilla con campos de entrada y botones Guardar/Cancelar."""
         if self._editing_row is not None:
             messagebox.showwarning("Advertencia", "Ya hay una fila en edición")
             return
 
-        # Crear frame editable en row 1
-        edit_frame = ctk.CTkFrame(self.scrollable_grid, fg_color="#fff3cd", corner_radius=0)
-        edit_frame.grid(row=1, column=0, sticky="ew", padx=0, pady=0)
+        # Fila editable arriba de la grilla
+        edit_frame = ctk.CTkFrame(self, fg_color="#fff3cd", corner_radius=0)
+        edit_frame.pack(fill="x", padx=10, pady=(0, 6), before=self.tabla)
 
-        # Configurar columnas
+        # Configurar columnas (mismas proporciones que la grilla)
         for i, (key, label, width) in enumerate(self.COLUMNS):
-            edit_frame.grid_columnconfigure(i, minsize=width)
+            edit_frame.grid_columnconfigure(i, weight=width)
 
         # ID (automático, no editable)
         lbl_id = ctk.CTkLabel(edit_frame, text="(Auto)", anchor="w", text_color="#666")
@@ -178,8 +88,8 @@ class SubcategoriasView(ctk.CTkFrame):
         entry_nombre.focus()
 
         # Botones Guardar y Cancelar
-        btn_frame = ctk.CTkFrame(self.scrollable_grid, fg_color="transparent")
-        btn_frame.grid(row=2, column=0, sticky="w", padx=10, pady=5)
+        btn_frame = ctk.CTkFrame(edit_frame, fg_color="transparent")
+        btn_frame.grid(row=1, column=0, columnspan=len(self.COLUMNS), sticky="w", padx=5, pady=(0, 5))
 
         btn_guardar = ctk.CTkButton(btn_frame, text="Guardar", width=100, fg_color="#4CAF50", hover_color="#43A047")
         btn_guardar.pack(side="left", padx=5)
@@ -190,24 +100,15 @@ class SubcategoriasView(ctk.CTkFrame):
         # Guardar referencias
         self._editing_row = {
             "edit_frame": edit_frame,
-            "btn_frame": btn_frame,
             "entries": {
                 "nombre": entry_nombre
             }
         }
 
-        # Mover todas las filas existentes hacia abajo
-        for idx in range(len(self._row_widgets)):
-            row_num = idx + 3  # Header=0, edit=1, buttons=2, data starts at 3
-            frame_parent = self._row_widgets[idx][0].master
-            frame_parent.grid(row=row_num)
-
         # Configurar comandos
         btn_guardar.configure(command=self._on_guardar_nueva_subcategoria)
         btn_cancelar.configure(command=self._on_cancelar_nueva_subcategoria)
 
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
     def _on_guardar_nueva_subcategoria(self):
         """Valida y guarda la nueva subcategoría."""
         if self._editing_row is None:
@@ -236,14 +137,10 @@ class SubcategoriasView(ctk.CTkFrame):
         if self._editing_row is None:
             return
 
-        # Destruir widgets
+        # Destruir widgets (los botones están dentro del frame)
         self._editing_row["edit_frame"].destroy()
-        self._editing_row["btn_frame"].destroy()
         self._editing_row = None
 
-        # Restaurar posiciones de filas
-        self.build_rows()
-
     def delete_selected(self):
         """Elimina la subcategoría seleccionada delegando al controller si existe."""
         if self._selected_id is None:
@@ -267,15 +164,9 @@ class SubcategoriasView(ctk.CTkFrame):
         except Exception:
             pass
 
-        self._selected_id = None
-        self.btn_borrar.configure(state="disabled")
-        self.btn_editar.configure(state="disabled")
         self.build_rows()
 
     def set_subcategories(self, subcategories_list):
-        """Recibe una lista de dicts con las subcategorías y recarga la vista."""
+        """Recibe una lista de dicts con las subcategorías y recarga la vista (la selección se conserva por id)."""
         self._subcategorias = list(subcategories_list or [])
-        self._selected_id = None
-        self.btn_borrar.configure(state="disabled")
-        self.btn_editar.configure(state="disabled")
         self.build_rows()
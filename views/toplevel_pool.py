@@ -0,0 +1,132 @@
+"""Ventanas secundarias armadas una vez y reutilizadas.
+
+Aumentar, Crear Boleta, Saldo y Subcategorías tienen decenas de widgets;
+crearlas en cada apertura y destruirlas al cerrar se nota en un día con
+movimiento. Cerrarlas ahora las oculta (`withdraw`) y la próxima apertura las
+vuelve a mostrar (`deiconify`) después de `reset()` y `bind_context(...)`.
+
+Si la ventana padre se destruye (p. ej. la pantalla salió del caché de
+pantallas) la ventana se destruye con ella y se arma de nuevo al pedirla.
+"""
+import customtkinter as ctk
+
+
+class PooledWindow:
+    """Mixin para CTkToplevel reutilizables.
+
+    Las subclases limpian su estado en `reset()` y reciben el contexto nuevo
+    (proveedor, controlador, ...) en `bind_context()`. El botón Cerrar y la X
+    de la ventana deben llamar a `ocultar()` en lugar de `destroy()`.
+    """
+
+    def _init_pool(self):
+        self._on_close = None
+        self.protocol("WM_DELETE_WINDOW", self.ocultar)
+
+    def reset(self):
+        """Deja la ventana como recién creada (la subclase la completa)."""
+
+    def bind_context(self, **context):
+        """Recibe el contexto de esta apertura (la subclase lo usa)."""
+        for name, value in context.items():
+            setattr(self, name, value)
+
+    def mostrar(self, on_close=None):
+        """Muestra la ventana modal sobre su padre. `on_close()` se llama al ocultarla."""
+        self._on_close = on_close
+        self.deiconify()
+        self.transient(self.master)
+        self.lift()
+        self.focus_set()
+        try:
+            self.grab_set()
+        except Exception:
+            # la ventana todavía no es visible: reintentar cuando lo sea
+            self.after(50, self._grab)
+
+    def _grab(self):
+        try:
+            if self.winfo_viewable():
+                self.grab_set()
+        except Exception:
+            pass
+
+    def ocultar(self):
+        try:
+            self.grab_release()
+        except Exception:
+            pass
+        self.withdraw()
+        on_close, self._on_close = self._on_close, None
+        if on_close:
+            on_close()
+
+
+class PooledToplevel(PooledWindow, ctk.CTkToplevel):
+    """CTkToplevel reutilizable para montar el controlador de otra pantalla adentro."""
+
+    def __init__(self, parent, title="", geometry=None, minsize=None):
+        super().__init__(parent)
+        self.title(title)
+        if geometry:
+            self.geometry(geometry)
+        if minsize:
+            self.minsize(*minsize)
+        self.resizable(True, True)
+        # controlador montado en la ventana y qué hacer al reutilizarla (los asigna quien la crea)
+        self.controller = None
+        self.on_reset = None
+        self._init_pool()
+
+    def reset(self):
+        if self.on_reset:
+            self.on_reset()
+
+
+class ToplevelPool:
+    """Una ventana armada por nombre."""
+
+    def __init__(self):
+        self._windows = {}
+
+    def acquire(self, name, parent, factory, **context):
+        """Devuelve la ventana `name` lista para mostrar con el contexto dado.
+
+        `factory()` la crea si no existe o si se armó sobre otro padre; si ya
+        estaba armada se limpia con `reset()`. En ambos casos recibe
+        `bind_context(**context)`.
+        """
+        window = self._windows.get(name)
+        if window is not None and not (self._alive(window) and window.master is parent):
+            self.discard(name)
+            window = None
+        if window is None:
+            window = factory()
+            self._windows[name] = window
+        else:
+            window.reset()
+        window.bind_context(**context)
+        return window
+
+    def discard(self, name):
+        window = self._windows.pop(name, None)
+        if window is not None and self._alive(window):
+            window.destroy()
+
+    @staticmethod
+    def _alive(window):
+        try:
+            return bool(window.winfo_exists())
+        except Exception:
+            return False
+
+
+_pool = None
+
+
+def get_toplevel_pool():
+    """Pool compartido por los controladores (solo se usa desde el hilo de Tk)."""
+    global _pool
+    if _pool is None:
+        _pool = ToplevelPool()
+    return _pool
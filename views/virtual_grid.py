@@ -0,0 +1,255 @@
+"""Grilla virtualizada compartida por las vistas de categorías, subcategorías y proveedores.
+
+Solo existen los widgets de las filas visibles (más una): al desplazarse o al
+recibir datos nuevos se reutilizan cambiándoles el texto y el color, sin crear
+ni destruir nada. Dibujar cuesta O(filas visibles) aunque la lista tenga miles
+de elementos.
+
+Las celdas se ubican con `place` en proporción al ancho de cada columna, así
+todas las filas quedan alineadas sin que el texto largo las ensanche. Los
+eventos `<Configure>` de un redimensionado se juntan en un solo recálculo.
+La selección se guarda por clave (id), así sobrevive a recargas y al scroll.
+"""
+import tkinter as tk
+
+import customtkinter as ctk
+
+
+class VirtualGrid(ctk.CTkFrame):
+    ROW_HEIGHT = 34
+    HEADER_HEIGHT = 36
+    WHEEL_ROWS = 3
+    RESIZE_DELAY_MS = 30
+
+    DEFAULT_STYLE = {
+        "header_bg": "#bfecc0",
+        "header_fg": "#000000",
+        "row_bg": ("#f9f9f9", "#ffffff"),
+        "row_fg": "#000000",
+        "selected_bg": None,  # None = mismo fondo de la fila
+        "selected_fg": "#2196F3",
+        "body_bg": "#ffffff",
+    }
+
+    def __init__(self, parent, columns, key="id", on_select=None, style=None, **kwargs):
+        """`columns` es una lista de (clave, título, ancho); los anchos se usan como proporciones.
+
+        `key` es el campo que identifica a cada fila (o una función fila -> id).
+        `on_select(fila)` se llama al elegir una fila con el mouse o el teclado.
+        """
+        self.style = dict(self.DEFAULT_STYLE, **(style or {}))
+        super().__init__(parent, fg_color=self.style["body_bg"], corner_radius=0, **kwargs)
+        self.columns = list(columns)
+        self._key = key if callable(key) else (lambda row, field=key: row.get(field))
+        self.on_select = on_select
+
+        total = sum(width for _, _, width in self.columns) or 1
+        self._cells_x = []
+        x = 0.0
+        for _, _, width in self.columns:
+            self._cells_x.append((x, width / total))
+            x += width / total
+
+        self.rows = []
+        self.selected_id = None
+        self._first = 0  # índice de la primera fila visible
+        self._visible = 0
+        self._pool = []  # [(frame, [labels], {estado mostrado})]
+        self._resize_job = None
+        self._body_height = 0
+
+        self._build_header()
+        body_frame = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        body_frame.pack(fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(body_frame, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        # frame de tk común: recibe el foco y las teclas directamente
+        self.body = tk.Frame(body_frame, bg=self.style["body_bg"], highlightthickness=0, takefocus=1)
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.bind("<Configure>", self._on_configure)
+        self._bind_scroll(self.body)
+        for sequence in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+            self.body.bind(sequence, self._on_key)
+
+    # --- datos y selección ---
+
+    def set_rows(self, rows, keep_selection=True):
+        """Reemplaza las filas mostradas. Conserva la selección si la fila sigue estando."""
+        self.rows = list(rows or [])
+        if not keep_selection or self.find(self.selected_id) is None:
+            self.selected_id = None
+        self._first = min(self._first, self._max_first())
+        self._render()
+
+    def find(self, row_id):
+        """Índice de la fila con ese id, o None."""
+        if row_id is None:
+            return None
+        for idx, row in enumerate(self.rows):
+            if self._key(row) == row_id:
+                return idx
+        return None
+
+    def selected_row(self):
+        idx = self.find(self.selected_id)
+        return self.rows[idx] if idx is not None else None
+
+    def select(self, row_id, notify=False, see=True):
+        """Selecciona la fila con ese id (None quita la selección)."""
+        self.selected_id = row_id
+        if see and row_id is not None:
+            self.see(row_id)
+        self._render()
+        if notify and self.on_select:
+            self.on_select(self.selected_row())
+
+    def see(self, row_id):
+        """Desplaza lo justo para que la fila con ese id quede visible."""
+        idx = self.find(row_id)
+        if idx is None:
+            return
+        visible = max(1, self._visible - 1)
+        if idx < self._first:
+            self._scroll_to(idx)
+        elif idx >= self._first + visible:
+            self._scroll_to(idx - visible + 1)
+
+    # --- dibujo ---
+
+    def _build_header(self):
+        header = ctk.CTkFrame(self, fg_color=self.style["header_bg"], corner_radius=0, height=self.HEADER_HEIGHT)
+        header.pack(fill="x")
+        font = ctk.CTkFont(size=12, weight="bold")
+        for (_, label, _), (x, width) in zip(self.columns, self._cells_x):
+            ctk.CTkLabel(
+                header, text=label, font=font, text_color=self.style["header_fg"], anchor="w"
+            ).place(relx=x, relwidth=width, x=8, rely=0.5, anchor="w")
+
+    def _make_row(self):
+        slot = len(self._pool)
+        frame = ctk.CTkFrame(self.body, corner_radius=0, height=self.ROW_HEIGHT, fg_color=self.style["row_bg"][0])
+        labels = []
+        for x, width in self._cells_x:
+            label = ctk.CTkLabel(frame, text="", anchor="w", text_color=self.style["row_fg"])
+            label.place(relx=x, relwidth=width, x=8, rely=0.5, anchor="w")
+            labels.append(label)
+        for widget in [frame] + labels:
+            widget.bind("<Button-1>", lambda e, s=slot: self._on_click(s))
+            self._bind_scroll(widget)
+        self._pool.append((frame, labels, {}))
+
+    def _render(self):
+        """Vuelca en los widgets del pool las filas visibles; solo cambia lo que difiere."""
+        while len(self._pool) < self._visible:
+            self._make_row()
+        style = self.style
+        for slot, (frame, labels, shown) in enumerate(self._pool):
+            idx = self._first + slot
+            if slot >= self._visible or idx >= len(self.rows):
+                if shown.get("placed"):
+                    frame.place_forget()
+                    shown["placed"] = False
+                continue
+            row = self.rows[idx]
+            selected = self.selected_id is not None and self._key(row) == self.selected_id
+            bg = style["row_bg"][idx % 2]
+            if selected and style["selected_bg"]:
+                bg = style["selected_bg"]
+            fg = style["selected_fg"] if selected else style["row_fg"]
+            if shown.get("bg") != bg:
+                frame.configure(fg_color=bg)
+                shown["bg"] = bg
+            texts = [self._text(row.get(field)) for field, _, _ in self.columns]
+            for i, (label, text) in enumerate(zip(labels, texts)):
+                if shown.get(i) != text:
+                    label.configure(text=text)
+                    shown[i] = text
+            if shown.get("fg") != fg:
+                for label in labels:
+                    label.configure(text_color=fg)
+                shown["fg"] = fg
+            if not shown.get("placed"):
+                frame.place(x=0, y=slot * self.ROW_HEIGHT, relwidth=1)
+                shown["placed"] = True
+        self._update_scrollbar()
+
+    @staticmethod
+    def _text(value):
+        return "" if value is None else str(value)
+
+    # --- scroll y tamaño ---
+
+    def _on_configure(self, event):
+        # un redimensionado genera muchos <Configure>: recalcular una sola vez al final
+        self._body_height = event.height
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(self.RESIZE_DELAY_MS, self._apply_resize)
+
+    def _apply_resize(self):
+        self._resize_job = None
+        # una fila más para la que queda cortada abajo (el alto del evento ya viene escalado)
+        row_height = max(1, round(self._apply_widget_scaling(self.ROW_HEIGHT)))
+        visible = max(1, self._body_height // row_height + 1)
+        if visible != self._visible:
+            self._visible = visible
+            self._first = min(self._first, self._max_first())
+            self._render()
+
+    def _max_first(self):
+        # la última fila entera visible tiene que poder llegar abajo
+        return max(0, len(self.rows) - max(1, self._visible - 1))
+
+    def _scroll_to(self, first):
+        first = max(0, min(int(first), self._max_first()))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if not total:
+            self.scrollbar.set(0, 1)
+            return
+        shown = max(1, self._visible - 1)
+        self.scrollbar.set(self._first / total, min(1.0, (self._first + shown) / total))
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(round(float(amount) * len(self.rows)))
+        elif action == "scroll":
+            step = max(1, self._visible - 2) if unit == "pages" else 1
+            self._scroll_to(self._first + int(amount) * step)
+
+    def _bind_scroll(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", lambda e: self._scroll_to(self._first - self.WHEEL_ROWS))
+        widget.bind("<Button-5>", lambda e: self._scroll_to(self._first + self.WHEEL_ROWS))
+
+    def _on_wheel(self, event):
+        steps = -event.delta // 120 if abs(event.delta) >= 120 else (-1 if event.delta > 0 else 1)
+        self._scroll_to(self._first + steps * self.WHEEL_ROWS)
+
+    # --- interacción ---
+
+    def _on_click(self, slot):
+        idx = self._first + slot
+        if idx < len(self.rows):
+            self.body.focus_set()
+            self.select(self._key(self.rows[idx]), notify=True, see=False)
+
+    def _on_key(self, event):
+        if not self.rows:
+            return
+        idx = self.find(self.selected_id)
+        page = max(1, self._visible - 2)
+        moves = {"Up": -1, "Down": 1, "Prior": -page, "Next": page}
+        if event.keysym == "Home":
+            idx = 0
+        elif event.keysym == "End":
+            idx = len(self.rows) - 1
+        elif idx is None:
+            idx = self._first
+        else:
+            idx = max(0, min(len(self.rows) - 1, idx + moves.get(event.keysym, 0)))
+        self.select(self._key(self.rows[idx]), notify=True)